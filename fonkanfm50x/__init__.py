@@ -1,13 +1,74 @@
-from .interface import FonkanUHF
-from .types import RFIDRegion, AvailableBaudRates, EPCMemoryBank
-from .exceptions import TagGenericException, UnexpectedReaderResponseException
-
-__all__ = [
-	"FonkanUHF",
-    "EPCMemoryBank",
-	"RFIDRegion",
-	"AvailableBaudRates",
-	"TagGenericException",
-	"UnexpectedReaderResponseException",
-    "epcglobal"
-]
\ No newline at end of file
+import importlib
+
+# typing.TYPE_CHECKING without importing typing (recognised by type checkers by its name)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .interface import FonkanUHF
+    from .aio import AsyncFonkanUHF
+    from .multireader import MultiReaderInventory, TagEvent
+    from .dedup import TagDeduplicator, TagSighting
+    from .tagread import TagRead
+    from .metrics import ReaderMetrics
+    from .continuous import ContinuousInventory, OverflowPolicy
+    from .journal import TagJournal, JournalRecord
+    from .memcache import TagMemoryCache
+    from .trigger import TriggeredInventory
+    from .powersweep import PowerSweep
+    from .distinct import HyperLogLog, DistinctTagCounter
+    from .scheduler import ReaderScheduler, CommandPriority
+    from .tagfilter import TagFilter, SelectMask, EPCPrefixIndex
+    from .types import RFIDRegion, AvailableBaudRates, EPCMemoryBank
+    from .exceptions import TagGenericException, UnexpectedReaderResponseException
+    from . import epcglobal
+    from . import epcdecode
+
+# Exported name -> submodule. Submodules are only imported on first access, so tools that only need
+# e.g. epcglobal do not pay for serial, fastcrc, asyncio and the whole reader interface.
+_EXPORTS = {
+	"FonkanUHF": "interface",
+	"AsyncFonkanUHF": "aio",
+	"MultiReaderInventory": "multireader",
+	"TagEvent": "multireader",
+	"TagDeduplicator": "dedup",
+	"TagSighting": "dedup",
+	"TagRead": "tagread",
+	"ReaderMetrics": "metrics",
+	"ContinuousInventory": "continuous",
+	"OverflowPolicy": "continuous",
+	"TagJournal": "journal",
+	"JournalRecord": "journal",
+	"TagMemoryCache": "memcache",
+	"TriggeredInventory": "trigger",
+	"PowerSweep": "powersweep",
+	"HyperLogLog": "distinct",
+	"DistinctTagCounter": "distinct",
+	"ReaderScheduler": "scheduler",
+	"CommandPriority": "scheduler",
+	"TagFilter": "tagfilter",
+	"SelectMask": "tagfilter",
+	"EPCPrefixIndex": "tagfilter",
+	"EPCMemoryBank": "types",
+	"RFIDRegion": "types",
+	"AvailableBaudRates": "types",
+	"TagGenericException": "exceptions",
+	"UnexpectedReaderResponseException": "exceptions",
+	"epcglobal": None,
+	"epcdecode": None,
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name = _EXPORTS[name]
+    if module_name is None:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache it: later accesses are plain module attribute lookups
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,17 +1,21 @@
 
 from fonkanfm50x import FonkanUHF, AvailableBaudRates, RFIDRegion, EPCMemoryBank, TagGenericException
-from fonkanfm50x.epcglobal import TagModelParser
+from fonkanfm50x.epcglobal import shared_parser
+from fonkanfm50x.dedup import TagDeduplicator
 
 if __name__ == '__main__':
-    tag_parser = TagModelParser()
+    tag_parser = shared_parser()
 
     with FonkanUHF(start_power=25,#
                     baud_rate=AvailableBaudRates.BAUD_38400,
+                    use_tuned_baud_rate=True, # rate found by reader.autotune_baud_rate(), if it was run on this port
                     region=RFIDRegion.EU,
                     debug=False
                    ) as reader:
         print(f"Connected to reader id: {reader.get_reader_id()} | Firmware version: {reader.get_reader_firmware()} | Region: {reader.get_region()} | Power: {reader.get_power_level()} dBm")
-        found_tag_ids = set()
+        # Report each tag once per presence in the field, with bounded memory for long runs
+        found_tags = TagDeduplicator(window=60)
+        found_count = 0
         try:
             while True:
                 # Read tag ids one by one:
@@ -29,21 +33,19 @@ if __name__ == '__main__':
 
                 # Read multiple tag ids:
                 try:
-                    for tag in reader.read_many_tag_id():
-                        if tag not in found_tag_ids:
-                            found_tag_ids.add(tag)
-                            print(f"{len(found_tag_ids)}: Found new tag {tag_parser.interpret_TID_data(tag)}")
+                    for sighting in found_tags.filter(reader.read_many_tag_id()):
+                        found_count += 1
+                        print(f"{found_count}: Found new tag {tag_parser.interpret_TID_data(sighting.epc)}")
                 except TagGenericException as e:
                     print(f"Error reading tag: {e}")
                     continue
 
                 # Read multiple tag ids manually via memory multiband:
                 # try:
-                #     for tag, mem in reader.read_multi_tag_memory_multiband(bank=EPCMemoryBank.TID, address=0, length=6, slot_q=3):
-                #         if tag not in found_tag_ids:
-                #             found_tag_ids.add(tag)
-                #             print(f"{len(found_tag_ids)}: Found new tag {tag_parser.interpret_TID_data(tag)}")
-                #             # print(f"New tag found {tag} (total found: {len(found_tag_ids)}) with data {mem}")
+                #     for sighting in found_tags.filter(reader.read_multi_tag_memory_multiband(bank=EPCMemoryBank.TID, address=0, length=6, slot_q=3)):
+                #         found_count += 1
+                #         print(f"{found_count}: Found new tag {tag_parser.interpret_TID_data(sighting.epc)}")
+                #         # print(f"New tag found {sighting.epc} with data {sighting.data}")
                 # except TagGenericException as e:
                 #     print(f"Error reading tag memory: {type(e)}: {e}")
         except KeyboardInterrupt:
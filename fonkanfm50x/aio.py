@@ -0,0 +1,442 @@
+import asyncio
+import serial
+import time
+from typing import AsyncGenerator, Callable, TypeVar
+
+from .types import RFIDRegion, AvailableBaudRates, EPCMemoryBank
+from .framing import FrameBuffer
+from .interface import FonkanUHF, GPIOPin, Steps, STEP_READ, STEP_WRITE, STEP_SLEEP
+from .qcontrol import AdaptiveQController
+from .metrics import ReaderMetrics
+from .exceptions import UnexpectedReaderResponseException, TagGenericException
+
+T = TypeVar('T')
+
+class AsyncFonkanUHF:
+    """
+    asyncio version of FonkanUHF.
+    Waits for readiness on the serial file descriptor (loop.add_reader) instead of polling with a serial timeout,
+    so several readers can share one event loop with other I/O.
+
+    async with AsyncFonkanUHF(serial_port='/dev/ttyACM0') as reader:
+        async for tag in reader.read_many_tag_id():
+            print(tag)
+    """
+
+    # Response parsing is shared with the blocking class
+    _parse_region = staticmethod(FonkanUHF._parse_region)
+    _parse_gpio_pins = staticmethod(FonkanUHF._parse_gpio_pins)
+    _build_gpio_argument = staticmethod(FonkanUHF._build_gpio_argument)
+    _parse_firmware = staticmethod(FonkanUHF._parse_firmware)
+    _parse_tag_id_response = FonkanUHF._parse_tag_id_response
+    _parse_tag_memory_response = FonkanUHF._parse_tag_memory_response
+    _tag_memory_multiband_result = FonkanUHF._tag_memory_multiband_result
+    _until_frame = FonkanUHF._until_frame
+    _raise_tag_error = FonkanUHF._raise_tag_error
+    _slot_q_argument = staticmethod(FonkanUHF._slot_q_argument)
+    # So are the command exchanges, run by _run_steps
+    _connect_steps = FonkanUHF._connect_steps
+    _command_steps = FonkanUHF._command_steps
+    _send_command_steps = FonkanUHF._send_command_steps
+    _probe_steps = FonkanUHF._probe_steps
+    _wait_until_ready_steps = FonkanUHF._wait_until_ready_steps
+    _is_ready = FonkanUHF._is_ready
+    _get_region_steps = FonkanUHF._get_region_steps
+    _set_region_steps = FonkanUHF._set_region_steps
+    _get_power_level_steps = FonkanUHF._get_power_level_steps
+    _set_power_level_steps = FonkanUHF._set_power_level_steps
+    _change_baud_rate_steps = FonkanUHF._change_baud_rate_steps
+    _get_reader_id_steps = FonkanUHF._get_reader_id_steps
+
+    def __init__(self,
+              serial_port: str = '/dev/ttyACM0',
+              start_power: int = 25,
+              baud_rate: AvailableBaudRates = AvailableBaudRates.BAUD_38400,
+              region: RFIDRegion = RFIDRegion.EU,
+              response_timeout: float = 0.1,
+              debug: bool = False,
+              metrics: ReaderMetrics | None = None):
+        """
+        response_timeout: seconds to wait for the next response frame before giving up on it
+        metrics: record latencies, retries, errors and inventory rounds into it (off when None)
+        """
+        self.serial_port = serial_port
+        self.start_power = start_power
+        self.baud_rate = baud_rate
+        self.region = region
+        self.response_timeout = response_timeout
+        self.debug = debug
+        self.metrics = metrics
+        self.ser: serial.Serial | None = None
+        self._frames = FrameBuffer()
+        self._frame_ready: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._frame_ready = asyncio.Event()
+        # Non-blocking serial port: reads only happen when the event loop reports the fd as readable
+        self.ser = serial.Serial(
+            port=self.serial_port,
+            baudrate=self.baud_rate.to_int(),
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            bytesize=serial.EIGHTBITS,
+            timeout=0,
+        )
+        self._loop.add_reader(self.ser.fileno(), self._on_readable)
+
+        try:
+            await self._run_steps(self._connect_steps())
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def close(self):
+        if self.ser:
+            try:
+                if self.ser.is_open:
+                    self._loop.remove_reader(self.ser.fileno())
+                    self.ser.close()
+            finally:
+                self.ser = None
+                self._frames.clear()
+
+    ####################################################################
+    # Internal
+    ####################################################################
+
+    def _on_readable(self):
+        try:
+            data = self.ser.read(self.ser.in_waiting or 1)
+        except serial.SerialException:
+            # Port went away (unplugged), stop watching it. Pending reads will time out.
+            self._loop.remove_reader(self.ser.fileno())
+            return
+        if data:
+            self._frames.feed(data)
+            self._frame_ready.set()
+
+    async def _run_steps(self, steps: Steps[T]) -> T:
+        """
+        Run a generator of I/O steps (see interface.STEP_WRITE) on the serial port and return its result.
+        An exception raised by a step is thrown into the generator.
+        """
+        send, value = steps.send, None
+        while True:
+            try:
+                step, argument = send(value)
+            except StopIteration as stop:
+                return stop.value
+            send = steps.send
+            try:
+                if step == STEP_READ:
+                    value = await self._read_response(argument)
+                elif step == STEP_WRITE:
+                    value = self._write_command(argument)
+                elif step == STEP_SLEEP:
+                    value = await asyncio.sleep(argument)
+                else:
+                    value = self._change_serial_connection_baud_rate(argument)
+            except Exception as e:
+                send, value = steps.throw, e
+
+    def _change_serial_connection_baud_rate(self, baud_rate: AvailableBaudRates):
+        if not self.ser:
+            raise RuntimeError("Serial port not initialized. Use 'async with' first.")
+
+        self._loop.remove_reader(self.ser.fileno())
+        self.ser.close()
+        self.ser.baudrate = baud_rate.to_int()
+        self.ser.open()
+        self._frames.clear()
+        self.metrics.discard_pending() if self.metrics is not None else None
+        self._loop.add_reader(self.ser.fileno(), self._on_readable)
+
+    async def send_command(self, command: str):
+        await self._run_steps(self._send_command_steps(command))
+
+    def _write_command(self, command: str):
+        if not self.ser:
+            raise RuntimeError("Serial port not initialized. Use 'async with' first.")
+        print(f">: {command.encode()}") if self.debug else None
+        # Commands are a few bytes, they fit in the tty output buffer without blocking
+        data = f"\n{command}\r".encode()
+        self.ser.write(data)
+        self.metrics.command_sent(command, len(data)) if self.metrics is not None else None
+
+    async def _read_response(self, timeout: float | None = None) -> str | None:
+        deadline = self._loop.time() + (self.response_timeout if timeout is None else timeout)
+        response = self._frames.next_frame()
+        while response is None:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            self._frame_ready.clear()
+            try:
+                await asyncio.wait_for(self._frame_ready.wait(), remaining)
+            except TimeoutError:
+                break
+            response = self._frames.next_frame()
+        self.metrics.frame_received(response) if self.metrics is not None else None
+
+        decoded = response.decode('utf-8', errors='ignore') if response is not None else ''
+        print(f"<: {decoded}") if self.debug else None
+
+        if decoded == '':
+            return None
+        else:
+            return decoded
+
+    async def send_command_and_get_response(self, command: str, handle_error: Callable[[str, str], None] | None = None) -> str:
+        return await self._run_steps(self._command_steps(command, handle_error))
+
+    async def send_command_and_get_response_until(self, command: str, terminator: str, on_error: Callable[[TagGenericException], None] | None = None) -> AsyncGenerator[str, None]:
+        """
+        Yield responses of command until terminator is found. Tag error frames are handled as in FonkanUHF.
+        """
+        deferred_error: TagGenericException | None = None
+        def handle_tag_error(error: TagGenericException):
+            nonlocal deferred_error
+            if on_error is not None:
+                on_error(error)
+            elif deferred_error is None:
+                deferred_error = error
+
+        try:
+            res = await self.send_command_and_get_response(command)
+        except TagGenericException as e:
+            handle_tag_error(e)
+        else:
+            if res == terminator or res is None:
+                return
+            else:
+                yield res
+
+        while True:
+            res = await self._read_response()
+            if res is None:
+                break
+            res = self._until_frame(command, res, handle_tag_error)
+            if res is None:
+                continue
+
+            yield res
+
+            if res == terminator:
+                break
+
+        if deferred_error is not None:
+            raise deferred_error
+
+    async def _probe(self, command: str) -> str | None:
+        """
+        One round-trip with a timeout scaled to the baud rate, without retries.
+        Returns the stripped response without echo, or None if there was no answer or not an echo.
+        """
+        return await self._run_steps(self._probe_steps(command))
+
+    async def _wait_until_ready(self, command: str, is_ready: Callable[[str], bool] = lambda res: True):
+        await self._run_steps(self._wait_until_ready_steps(command, is_ready))
+
+    ####################################################################
+    # Configuration
+    ####################################################################
+
+    async def get_region(self) -> RFIDRegion:
+        return await self._run_steps(self._get_region_steps())
+
+    async def set_region(self, region: RFIDRegion):
+        await self._run_steps(self._set_region_steps(region))
+
+    async def get_power_level(self) -> int:
+        return await self._run_steps(self._get_power_level_steps())
+
+    async def set_power_level(self, power_level: int):
+        await self._run_steps(self._set_power_level_steps(power_level))
+
+    async def change_baud_rate(self, baud_rate: AvailableBaudRates):
+        await self._run_steps(self._change_baud_rate_steps(baud_rate))
+
+    async def apply_config(self, power_level: int | None = None, region: RFIDRegion | None = None, baud_rate: AvailableBaudRates | None = None) -> dict[str, float]:
+        """
+        Apply the given settings, sending only those that differ from the reader's current ones.
+        Returns the seconds taken by each step run: 'read' (current settings), 'power_level', 'region', 'baud_rate'
+        """
+        timings: dict[str, float] = {}
+        started = time.perf_counter()
+        current_power = await self.get_power_level() if power_level is not None else None
+        current_region = await self.get_region() if region is not None else None
+        if power_level is not None or region is not None:
+            timings['read'] = time.perf_counter() - started
+
+        if power_level is not None and current_power not in (power_level, power_level & 0xFF):
+            step_started = time.perf_counter()
+            await self.set_power_level(power_level)
+            timings['power_level'] = time.perf_counter() - step_started
+        if region is not None and current_region != region:
+            step_started = time.perf_counter()
+            await self.set_region(region)
+            timings['region'] = time.perf_counter() - step_started
+        # Baud rate last, so the other settings go through on the known rate
+        if baud_rate is not None and self.ser.baudrate != baud_rate.to_int():
+            step_started = time.perf_counter()
+            await self.change_baud_rate(baud_rate)
+            timings['baud_rate'] = time.perf_counter() - step_started
+        print(f"apply_config: {timings}") if self.debug else None
+        return timings
+
+    ####################################################################
+    # GPIO Control
+    ####################################################################
+
+    async def get_gpio_configuration(self) -> dict[GPIOPin, bool]:
+        """
+        Get GPIO pin configuration as input/output: pin: output(True)/input(False)
+        """
+        res = await self.send_command_and_get_response("N6,00")
+        return self._parse_gpio_pins(res)
+
+    async def configure_gpio(self, config: dict[GPIOPin, bool]):
+        """
+        Configure GPIO pin as input or output: pin: output(True)/input(False)
+        """
+        current_config = await self.get_gpio_configuration()
+        if current_config == config:
+            return
+        current_config.update(config)
+
+        await self.send_command(f"N7,{self._build_gpio_argument(current_config)}")
+
+    async def read_gpio_pins(self) -> dict[GPIOPin, bool]:
+        """
+        Read GPIO pin levels: pin: high(True)/low(False)
+        """
+        res = await self.send_command_and_get_response("N8,00")
+        return self._parse_gpio_pins(res)
+
+    async def write_gpio_pins(self, levels: dict[GPIOPin, bool]):
+        """
+        Write GPIO pin levels: pin: high(True)/low(False)
+        """
+        await self.send_command(f"N9,{self._build_gpio_argument(levels)}")
+
+    ####################################################################
+    # Status commands
+    ####################################################################
+
+    async def get_reader_firmware(self) -> str:
+        res = await self.send_command_and_get_response("V")
+        if res is None:
+            raise UnexpectedReaderResponseException("No response from get firmware command")
+        return self._parse_firmware(res)
+
+    async def get_reader_id(self) -> str:
+        return await self._run_steps(self._get_reader_id_steps())
+
+    ####################################################################
+    # Tag Operations
+    ####################################################################
+
+    async def read_tag_id(self) -> str | None:
+        """
+        Display tag EPC ID
+        """
+        res = await self.send_command_and_get_response("Q")
+        if res is None:
+            raise UnexpectedReaderResponseException("No response from read tag command")
+        elif res == '':
+            return None
+        else:
+            return self._parse_tag_id_response(res)
+
+    async def _read_inventory_round(self, command: str, parse: Callable[[str], T], q_controller: AdaptiveQController | None) -> AsyncGenerator[T, None]:
+        """
+        Run one U inventory round, yielding parsed replies. Errors are raised once the whole round has been read.
+        """
+        started = time.perf_counter()
+        tags = 0
+        crc_failures = 0
+        collisions = 0
+        deferred_error: Exception | None = None
+
+        def on_error(error: TagGenericException):
+            nonlocal collisions, deferred_error
+            collisions += 1
+            deferred_error = deferred_error or error
+
+        async for res in self.send_command_and_get_response_until(command, terminator="", on_error=on_error):
+            if res == "":
+                continue
+            try:
+                parsed = parse(res)
+            except RuntimeWarning as e:
+                crc_failures += 1
+                deferred_error = deferred_error or e
+                continue
+            except TagGenericException as e:
+                tags += 1
+                deferred_error = deferred_error or e
+                continue
+            tags += 1
+            yield parsed
+
+        duration = time.perf_counter() - started
+        if q_controller is not None:
+            q_controller.update(tags, crc_failures, collisions, duration)
+        self.metrics.inventory_round(tags, duration) if self.metrics is not None else None
+        if deferred_error is not None:
+            raise deferred_error
+
+    async def read_many_tag_id(self, slot_q: int | AdaptiveQController | None = None) -> AsyncGenerator[str, None]:
+        """
+        Display tag EPC ID. Multiple at the same time if present.
+        slot_q: Q-value of the round, or an AdaptiveQController choosing it from previous rounds
+        """
+        slot_q, q_controller = self._slot_q_argument(slot_q)
+
+        async for tag in self._read_inventory_round(f"U{slot_q}", self._parse_tag_id_response, q_controller):
+            yield tag
+
+    async def read_tag_memory(self, bank: EPCMemoryBank, address: int, length: int) -> str | None:
+        """
+        Read tag memory
+        bank: reserved/EPC/TID/User
+        address: word address: 0-> 3FFF
+        length: read word length: 1->1E
+        """
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
+
+        res = await self.send_command_and_get_response(f"R{bank.value},{address:X},{length:X}")
+        if res == '':
+            return None
+        else:
+            return res
+
+    async def read_tag_memory_multiband(self, bank: EPCMemoryBank, address: int, length: int) -> tuple[str, str] | None:
+        """
+        Read tag memory, multiband. Returns EPC & data
+        """
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
+
+        res = await self.send_command_and_get_response(f"Q,R{bank.value},{address:X},{length:X}")
+        return self._tag_memory_multiband_result(res)
+
+    async def read_multi_tag_memory_multiband(self, bank: EPCMemoryBank, address: int, length: int, slot_q: int | AdaptiveQController | None = None) -> AsyncGenerator[tuple[str, str], None]:
+        """
+        Read tag memory, multiband, multi-tag. Returns EPC & data
+        """
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
+
+        slot_q, q_controller = self._slot_q_argument(slot_q)
+
+        async for tag in self._read_inventory_round(f"U{slot_q},R{bank.value},{address:X},{length:X}", self._parse_tag_memory_response, q_controller):
+            yield tag
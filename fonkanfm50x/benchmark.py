@@ -0,0 +1,1183 @@
+"""
+Throughput and latency benchmarks of FonkanUHF against the FM50x emulator.
+No hardware needed. Results are printed and optionally written as JSON to track regressions
+(correctness is checked by the test suite in tests/, not here):
+
+uv run python3 -m fonkanfm50x.benchmark --json bench.json
+uv run python3 -m fonkanfm50x.benchmark --only read_many_tag_id --tags 200 --baud 115200
+"""
+import argparse
+import contextlib
+import glob
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+
+from .interface import FonkanUHF, GPIOPin
+from .emulator import FM50xEmulator, SimulatedTag
+from .dedup import TagDeduplicator
+from .qcontrol import AdaptiveQController
+from .epcglobal import TagModelParser
+from .epcdecode import EPCScheme, PARTITION_TABLES, REFERENCE_LOW_BIT, decode_epc, decode_array, decode_many
+from .tagread import parse_tag_frame
+from .encoder import BulkEncoder, EncodeJob
+from .metrics import ReaderMetrics
+from .continuous import ContinuousInventory, OverflowPolicy
+from .journal import TagJournal
+from .capture import ReplaySerial
+from .memcache import TagMemoryCache
+from .trigger import TriggeredInventory
+from .powersweep import PowerSweep
+from .distinct import HyperLogLog, DistinctTagCounter
+from .scheduler import ReaderScheduler, CommandPriority
+from .multireader import MultiReaderInventory
+from .tagfilter import SelectMask, EPCPrefixIndex, TagFilter
+from .types import AvailableBaudRates, EPCMemoryBank, LockField, LockAction, RFIDRegion
+from .exceptions import TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException
+
+BENCHMARKS: dict[str, Callable[[argparse.Namespace], dict]] = {}
+
+def benchmark(name: str):
+    def register(function: Callable[[argparse.Namespace], dict]):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+def _emulator(args: argparse.Namespace, **kwargs) -> FM50xEmulator:
+    rng = random.Random(args.seed)
+    kwargs.setdefault('baud_rate', args.baud)
+    return FM50xEmulator(tags=[SimulatedTag.random(rng) for _ in range(args.tags)], seed=args.seed, **kwargs)
+
+def _latency_summary(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        'n': len(samples),
+        'median_ms': statistics.median(samples) * 1000,
+        'p95_ms': samples[math.ceil(0.95 * len(samples)) - 1] * 1000,
+        'max_ms': samples[-1] * 1000,
+    }
+
+def _inventory_rate(read_round: Callable[[], Iterable], duration: float) -> dict:
+    """
+    read_round: returns the generator of one inventory round, yielding EPCs
+    """
+    reads = 0
+    rounds = 0
+    errors = 0
+    unique = set()
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        rounds += 1
+        try:
+            for epc in read_round():
+                reads += 1
+                unique.add(epc)
+        except (TagGenericException, RuntimeWarning):
+            # Tags of the round were still counted, the error is raised at its end
+            errors += 1
+    elapsed = time.perf_counter() - start
+    return {
+        'duration_s': elapsed,
+        'rounds': rounds,
+        'round_errors': errors,
+        'reads': reads,
+        'unique_tags': len(unique),
+        'tags_per_s': reads / elapsed,
+        'rounds_per_s': rounds / elapsed,
+    }
+
+def _inventory_rate_rounds(read_round: Callable[[], Iterable], rounds: int) -> int:
+    """
+    Reads of a fixed number of inventory rounds
+    """
+    reads = 0
+    for _ in range(rounds):
+        try:
+            for _ in read_round():
+                reads += 1
+        except (TagGenericException, RuntimeWarning):
+            pass
+    return reads
+
+####################################################################
+# Benchmarks
+####################################################################
+
+@benchmark('connect_warm')
+def bench_connect_warm(args: argparse.Namespace) -> dict:
+    """
+    Connect when the reader already runs at the requested baud rate
+    """
+    samples = []
+    with _emulator(args) as emulator:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud):
+                samples.append(time.perf_counter() - start)
+    return _latency_summary(samples)
+
+@benchmark('connect_cold')
+def bench_connect_cold(args: argparse.Namespace) -> dict:
+    """
+    Connect when the reader was left on another baud rate: baud rate search plus baud rate change
+    """
+    other = AvailableBaudRates.BAUD_230400 if args.baud != AvailableBaudRates.BAUD_230400 else AvailableBaudRates.BAUD_4800
+    samples = []
+    with _emulator(args) as emulator:
+        for _ in range(args.repeat):
+            emulator.baud_rate = other
+            start = time.perf_counter()
+            with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud):
+                samples.append(time.perf_counter() - start)
+    return {'reader_baud_rate': other.to_int(), **_latency_summary(samples)}
+
+@benchmark('connect_fast')
+def bench_connect_fast(args: argparse.Namespace) -> dict:
+    """
+    fast_connect: cold (empty connection cache, reader on another baud rate and power) and warm (cache filled)
+    """
+    other = AvailableBaudRates.BAUD_230400 if args.baud != AvailableBaudRates.BAUD_230400 else AvailableBaudRates.BAUD_4800
+    cold = []
+    warm = []
+    with _emulator(args) as emulator, tempfile.TemporaryDirectory() as directory:
+        for i in range(args.repeat):
+            cache_path = f"{directory}/connections-{i}.json"
+            emulator.baud_rate = other
+            emulator.power = 20
+            start = time.perf_counter()
+            with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud, fast_connect=True, connection_cache_path=cache_path):
+                cold.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud, fast_connect=True, connection_cache_path=cache_path):
+                warm.append(time.perf_counter() - start)
+    return {'cold': _latency_summary(cold), 'warm': _latency_summary(warm)}
+
+@benchmark('command_latency')
+def bench_command_latency(args: argparse.Namespace) -> dict:
+    results = {}
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        for command in ('V', 'S', 'N0,00', 'N4,00', 'Q'):
+            samples = []
+            for _ in range(args.repeat * 10):
+                start = time.perf_counter()
+                reader.send_command_and_get_response(command)
+                samples.append(time.perf_counter() - start)
+            results[command] = _latency_summary(samples)
+    return results
+
+@benchmark('apply_config')
+def bench_apply_config(args: argparse.Namespace) -> dict:
+    """
+    apply_config step timings: power, region and baud rate changed together, then runtime power changes
+    (readiness probing instead of the former fixed 0.3 s wait per setting)
+    """
+    start_rate = AvailableBaudRates.BAUD_38400 if args.baud != AvailableBaudRates.BAUD_38400 else AvailableBaudRates.BAUD_115200
+    with _emulator(args, baud_rate=start_rate) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=start_rate) as reader:
+        all_settings = reader.apply_config(power_level=20, region=RFIDRegion.US, baud_rate=args.baud)
+        unchanged = reader.apply_config(power_level=20, region=RFIDRegion.US, baud_rate=args.baud)
+        samples = []
+        for i in range(args.repeat * 4):
+            start = time.perf_counter()
+            reader.apply_config(power_level=15 + i % 2 * 5)
+            samples.append(time.perf_counter() - start)
+    return {
+        'all_settings_ms': {step: seconds * 1000 for step, seconds in all_settings.items()},
+        'unchanged_ms': {step: seconds * 1000 for step, seconds in unchanged.items()},
+        'power_change': _latency_summary(samples),
+    }
+
+@benchmark('read_many_tag_id')
+def bench_read_many_tag_id(args: argparse.Namespace) -> dict:
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        return _inventory_rate(lambda: reader.read_many_tag_id(args.q), args.duration)
+
+@benchmark('read_multi_tag_memory_multiband')
+def bench_read_multi_tag_memory_multiband(args: argparse.Namespace) -> dict:
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        return _inventory_rate(
+            lambda: (epc for epc, _ in reader.read_multi_tag_memory_multiband(EPCMemoryBank.TID, 0, 6, args.q)),
+            args.duration,
+        )
+
+@benchmark('multi_reader')
+def bench_multi_reader(args: argparse.Namespace) -> dict:
+    """
+    MultiReaderInventory over 1, 2 and 4 emulated readers, each with its own tags: merged tags/s and the
+    speedup over one reader (linear scaling: speedup equal to the number of readers)
+    """
+    results = {}
+    single = None
+    for count in (1, 2, 4):
+        emulators = [
+            FM50xEmulator(tags=[SimulatedTag.random(random.Random(args.seed + i)) for _ in range(args.tags)],
+                          reader_id=f"{i:08d}", baud_rate=args.baud, seed=args.seed + i)
+            for i in range(count)
+        ]
+        with contextlib.ExitStack() as stack:
+            for emulator in emulators:
+                stack.enter_context(emulator)
+            readers = [FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) for emulator in emulators]
+            with MultiReaderInventory(readers, slot_q=args.q) as inventory:
+                # Connections run in parallel in the workers: wait for every reader before measuring
+                while len(inventory.reader_ids) < count:
+                    time.sleep(0.01)
+                while inventory.get(timeout=0) is not None:
+                    pass
+                per_reader = {emulator.reader_id: 0 for emulator in emulators}
+                start = time.perf_counter()
+                while time.perf_counter() - start < args.duration:
+                    event = inventory.get(timeout=0.1)
+                    if event is not None:
+                        per_reader[event.reader_id] += 1
+                elapsed = time.perf_counter() - start
+        rate = sum(per_reader.values()) / elapsed
+        single = single or rate
+        results[f"readers_{count}"] = {
+            'tags_per_s': rate,
+            'speedup': rate / single,
+            'per_reader_tags_per_s': [reads / elapsed for reads in per_reader.values()],
+        }
+    return results
+
+@benchmark('continuous')
+def bench_continuous(args: argparse.Namespace) -> dict:
+    """
+    Inventory with a slow consumer: plain generator, where the reader waits while the consumer works,
+    versus ContinuousInventory. 'io' waits 20 ms per tag (database, network, terminal),
+    'cpu' spins 2 ms per tag while holding the GIL.
+    """
+    def io_work(read):
+        time.sleep(0.02)
+
+    def cpu_work(read):
+        end = time.perf_counter() + 0.002
+        while time.perf_counter() < end:
+            pass
+
+    results = {}
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        for work_name, process in (('io', io_work), ('cpu', cpu_work)):
+            def generator_round():
+                for read in reader.read_many_tag_reads(args.q):
+                    process(read)
+                    yield read.epc
+            generator = _inventory_rate(generator_round, args.duration)
+            results[f"{work_name}_generator"] = {
+                'rounds_per_s': generator['rounds_per_s'],
+                'reads_per_s': generator['tags_per_s'],
+                'processed_per_s': generator['tags_per_s'],
+            }
+
+            for overflow in (OverflowPolicy.DROP_OLDEST, OverflowPolicy.BLOCK):
+                processed = 0
+                start = time.perf_counter()
+                with ContinuousInventory(reader, slot_q=args.q, overflow=overflow, capacity=256) as inventory:
+                    while time.perf_counter() - start < args.duration:
+                        for read in inventory.get_batch(timeout=0.1):
+                            process(read)
+                            processed += 1
+                elapsed = time.perf_counter() - start
+                results[f"{work_name}_{overflow.name.lower()}"] = {
+                    'rounds_per_s': inventory.rounds / elapsed,
+                    'reads_per_s': inventory.buffer.written / elapsed,
+                    'processed_per_s': processed / elapsed,
+                    'dropped': inventory.dropped,
+                }
+    return results
+
+@benchmark('metrics_overhead')
+def bench_metrics_overhead(args: argparse.Namespace) -> dict:
+    """
+    Inventory rate without and with a ReaderMetrics attached, and the cost of the hooks per command/frame
+    """
+    results = {}
+    for name, metrics in (('off', None), ('on', ReaderMetrics())):
+        with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud, metrics=metrics) as reader:
+            results[name] = _inventory_rate(
+                lambda: (epc for epc, _ in reader.read_multi_tag_memory_multiband(EPCMemoryBank.TID, 0, 6, args.q)),
+                args.duration,
+            )
+
+    metrics = ReaderMetrics()
+    frame = b"U3000E2801160600002098B2D0B7C1A2B,RE2801160200062F2A4C7"
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        metrics.command_sent("U6,R2,0,6", 11)
+        metrics.frame_received(frame)
+        metrics.frame_received(frame)
+    results['us_per_command_and_2_frames'] = (time.perf_counter() - start) / n * 1e6
+    return results
+
+@benchmark('replay')
+def bench_replay(args: argparse.Namespace) -> dict:
+    """
+    Capture inventory rounds from the emulator, then replay them as fast as possible through the str
+    (read_many_tag_id) and bytes (read_many_tag_reads) parsing paths: both send the same U commands
+    """
+    rounds = 50
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/session.fmcap"
+        with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud, capture_path=path) as reader:
+            start = time.perf_counter()
+            live = _inventory_rate_rounds(lambda: reader.read_many_tag_id(args.q), rounds)
+            live_elapsed = time.perf_counter() - start
+        results['live'] = {'seconds': live_elapsed, 'reads': live, 'capture_bytes': os.path.getsize(path)}
+
+        for name, read_round in (('str', lambda reader: reader.read_many_tag_id(args.q)),
+                                 ('bytes', lambda reader: (read.epc_hex for read in reader.read_many_tag_reads(args.q)))):
+            samples = []
+            for _ in range(args.repeat):
+                with FonkanUHF(baud_rate=args.baud, transport=ReplaySerial(path)) as reader:
+                    start = time.perf_counter()
+                    reads = _inventory_rate_rounds(lambda: read_round(reader), rounds)
+                    samples.append(time.perf_counter() - start)
+            results[f"replay_{name}"] = {
+                'seconds': min(samples),
+                'reads': reads,
+                'tags_per_s': reads / min(samples),
+                'speedup': live_elapsed / min(samples),
+            }
+    return results
+
+@benchmark('memory_cache')
+def bench_memory_cache(args: argparse.Namespace) -> dict:
+    """
+    Conveyor: the same tags stay in the field. TID reads with read_multi_tag_memory_multiband on every round
+    versus a U round plus TagMemoryCache reads of new EPCs only
+    """
+    results = {}
+    for name in ('multiband', 'cache'):
+        metrics = ReaderMetrics()
+        with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud, metrics=metrics) as reader:
+            cache = TagMemoryCache(reader)
+            if name == 'multiband':
+                read_round = lambda: reader.read_multi_tag_memory_multiband(EPCMemoryBank.TID, 0, 6, args.q)
+            else:
+                read_round = lambda: cache.read_many(EPCMemoryBank.TID, 0, 6, args.q)
+            metrics.reset()
+            rate = _inventory_rate(read_round, args.duration)
+        results[name] = {
+            'reads_per_s': rate['tags_per_s'],
+            'rounds_per_s': rate['rounds_per_s'],
+            'unique_tags': rate['unique_tags'],
+            'bytes_in_per_read': metrics.bytes_in / rate['reads'] if rate['reads'] else None,
+            **({'hit_rate': cache.hit_rate} if name == 'cache' else {}),
+        }
+    return results
+
+@benchmark('gpio_trigger')
+def bench_gpio_trigger(args: argparse.Namespace) -> dict:
+    """
+    Photo-eye gated inventory: 1 s idle, then 5 triggers held 0.3 s, 0.4 s apart.
+    A loop alternating N8 and U rounds versus TriggeredInventory (10 ms polls, 0.1 s hold):
+    trigger to first read latency (from the pin edge) and link duty cycle while idle and overall
+    """
+    pin = GPIOPin.GPIO_14
+
+    def scenario(emulator: FM50xEmulator, busy_time: Callable[[], float]) -> tuple[list[float], float]:
+        edges = []
+        idle_started = busy_time()
+        time.sleep(1.0)
+        idle_busy = busy_time() - idle_started
+        for _ in range(5):
+            edges.append(time.perf_counter())
+            emulator.set_gpio_input(pin.value, True)
+            time.sleep(0.3)
+            emulator.set_gpio_input(pin.value, False)
+            time.sleep(0.4)
+        return edges, idle_busy
+
+    def latencies(edges: list[float], reads: list[float]) -> dict:
+        samples = [min(read for read in reads if read >= edge) - edge for edge in edges if any(read >= edge for read in reads)]
+        return _latency_summary(samples) if samples else {}
+
+    results = {}
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        reader.configure_gpio({pin: False})
+
+        # Hand-written loop: poll the pin before every round, back to back
+        reads: list[float] = []
+        busy = [0.0]
+        stop = threading.Event()
+        def poll_loop():
+            while not stop.is_set():
+                started = time.perf_counter()
+                active = reader.read_gpio_pins()[pin]
+                if active:
+                    try:
+                        for _ in reader.read_many_tag_id(args.q):
+                            reads.append(time.perf_counter())
+                    except (TagGenericException, RuntimeWarning):
+                        pass
+                busy[0] += time.perf_counter() - started
+        start = time.perf_counter()
+        worker = threading.Thread(target=poll_loop)
+        worker.start()
+        edges, idle_busy = scenario(emulator, lambda: busy[0])
+        stop.set()
+        worker.join()
+        elapsed = time.perf_counter() - start
+        results['poll_loop'] = {
+            'trigger_to_first_read': latencies(edges, reads),
+            'idle_duty_cycle': idle_busy,
+            'duty_cycle': busy[0] / elapsed,
+            'reads': len(reads),
+        }
+
+        reads = []
+        trigger = TriggeredInventory(reader, pin, poll_interval=0.01, hold=0.1, slot_q=args.q,
+                                     on_read=lambda epc: reads.append(time.perf_counter()))
+        with trigger:
+            time.sleep(0.1) # let it configure the pins
+            edges, idle_busy = scenario(emulator, lambda: trigger.busy_time)
+        results['triggered'] = {
+            'trigger_to_first_read': latencies(edges, reads),
+            'idle_duty_cycle': idle_busy,
+            'duty_cycle': trigger.duty_cycle,
+            'reads': len(reads),
+            'bursts': len(trigger.bursts),
+        }
+    return results
+
+@benchmark('power_sweep')
+def bench_power_sweep(args: argparse.Namespace) -> dict:
+    """
+    Pallets passing by: every 0.5 s 5 tags (-2 ~ 25 dB activation power) enter the field and stay 3 s,
+    swept over 25/20/15/10/5/0 dB for 8 s. A fixed sweep (3 rounds per level, high to low) versus
+    PowerSweep (rounds while productive, levels ordered by yield): arrival to first read latency,
+    and the share of tags whose lowest power was found
+    """
+    levels = [25, 20, 15, 10, 5, 0]
+
+    def run(emulator: FM50xEmulator, sweep: PowerSweep) -> dict:
+        rng = random.Random(args.seed)
+        arrivals: dict[str, float] = {}
+        expected: dict[str, int] = {}
+        first_reads: dict[str, float] = {}
+        stop = threading.Event()
+
+        def pallets():
+            batches = []
+            while not stop.wait(0.5):
+                batch = [SimulatedTag.random(rng) for _ in range(5)]
+                with emulator.lock:
+                    if len(batches) == 6:
+                        for tag in batches.pop(0):
+                            emulator.tags.remove(tag)
+                    emulator.tags.extend(batch)
+                    now = time.perf_counter()
+                batches.append(batch)
+                for tag in batch:
+                    tag.min_power = rng.randint(-2, 25)
+                    epc = tag.epc.hex().upper()
+                    arrivals[epc] = now
+                    expected[epc] = min(level for level in levels if level >= tag.min_power)
+
+        with emulator.lock:
+            emulator.tags.clear()
+        worker = threading.Thread(target=pallets)
+        worker.start()
+        for epc, _ in sweep.run(duration=8.0):
+            first_reads.setdefault(epc, time.perf_counter())
+        stop.set()
+        worker.join()
+        latencies = [first_reads[epc] - arrivals[epc] for epc in first_reads if epc in arrivals]
+        return {
+            'tags': len(arrivals),
+            'found': len(first_reads),
+            'arrival_to_first_read': _latency_summary(latencies),
+            'min_power_right': sum(sweep.min_power.get(epc) == power for epc, power in expected.items()) / len(expected),
+            'cycles': sweep.cycles,
+            'rounds': sweep.rounds,
+            'switch_time_s': sweep.switch_time,
+        }
+
+    results = {}
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        for name, sweep in (
+                ('fixed', PowerSweep(reader, levels, slot_q=args.q, patience=3, max_rounds=3, reorder=False)),
+                ('adaptive', PowerSweep(reader, levels, slot_q=args.q)),
+        ):
+            results[name] = run(emulator, sweep)
+    return results
+
+@benchmark('distinct_count')
+def bench_distinct_count(args: argparse.Namespace) -> dict:
+    """
+    HyperLogLog distinct tag counts (precision 12, exact up to 256) versus exact sets:
+    relative error over 20 random populations per size, adds/s, merge and serialized size,
+    and a DistinctTagCounter of 4 doors x 24 hourly buckets rolled up into the day
+    """
+    rng = random.Random(args.seed)
+    results = {}
+    for size in (100, 1_000, 5_000, 20_000, 100_000):
+        errors = []
+        for _ in range(20 if size < 100_000 else 5):
+            sketch = HyperLogLog()
+            for _ in range(size):
+                sketch.add_hash(rng.getrandbits(64))
+            errors.append(sketch.count() / size - 1)
+        results[f"error_{size}"] = {
+            'mean_pct': statistics.mean(errors) * 100,
+            'stdev_pct': statistics.pstdev(errors) * 100,
+            'max_abs_pct': max(abs(error) for error in errors) * 100,
+        }
+    results['standard_error_pct'] = HyperLogLog(exact_threshold=0).standard_error * 100
+
+    epcs = [rng.randbytes(12).hex().upper() for _ in range(200_000)]
+    exact = set()
+    start = time.perf_counter()
+    for epc in epcs:
+        exact.add(epc)
+    exact_elapsed = time.perf_counter() - start
+    sketch = HyperLogLog()
+    start = time.perf_counter()
+    sketch.update(epcs)
+    elapsed = time.perf_counter() - start
+    other = HyperLogLog()
+    other.update(epcs[:1000])
+    start = time.perf_counter()
+    sketch | other
+    merge_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(100):
+        sketch.count()
+    count_elapsed = (time.perf_counter() - start) / 100
+    encoded = sketch.to_bytes()
+    results['throughput'] = {
+        'adds_per_s': len(epcs) / elapsed,
+        'exact_set_adds_per_s': len(epcs) / exact_elapsed,
+        'merge_ms': merge_elapsed * 1000,
+        'count_ms': count_elapsed * 1000,
+        'serialized_bytes': len(encoded),
+        'exact_set_bytes': sys.getsizeof(exact) + sum(sys.getsizeof(epc) for epc in exact),
+    }
+
+    clock = [0.0]
+    counter = DistinctTagCounter(clock=lambda: clock[0])
+    doors = [f"door-{door}" for door in range(4)]
+    passing = 0
+    for hour in range(24):
+        clock[0] = hour * 3600.0
+        for door in doors:
+            # Each pallet passes 2 doors in the hour
+            hour_epcs = epcs[passing:passing + 1500]
+            list(counter.count_many(hour_epcs, reader_id=door))
+            passing += 750
+    expected_day = len(set(epcs[:passing + 750]))
+    results['counter'] = {
+        'sketches': len(counter),
+        'serialized_bytes': len(counter.to_bytes()),
+        'day_count': counter.counts(bucket_seconds=86400)[0.0],
+        'day_expected': expected_day,
+        'door_0_hour_0': counter.counts('door-0')[0.0],
+    }
+    return results
+
+@benchmark('shared_reader')
+def bench_shared_reader(args: argparse.Namespace) -> dict:
+    """
+    Two threads inventory back to back while another reads the GPIO pins every 20 ms, for 3 s:
+    all calling the reader directly, through a lock, or through ReaderScheduler (one of the inventories
+    being its continuous inventory).
+    GPIO call latency, failed calls and inventory reads/s. Then scheduler fairness: two threads
+    flooding NORMAL jobs, and a LOW job submitted during a flood of HIGH jobs (max_wait 0.5 s).
+    """
+    duration = 3.0
+
+    def contention(call: Callable[[Callable[[FonkanUHF], object], CommandPriority], object], reader: FonkanUHF, inventory: Callable[[Callable[[str], None]], None] | None = None) -> dict:
+        stop = threading.Event()
+        reads = [0]
+        errors = {'inventory': 0, 'gpio': 0}
+        latencies = []
+
+        def count_read(epc: str):
+            reads[0] += 1
+
+        def inventory_loop():
+            while not stop.is_set():
+                try:
+                    call(lambda reader: [count_read(epc) for epc in reader.read_many_tag_id(args.q)], CommandPriority.LOW)
+                except (TagGenericException, RuntimeWarning):
+                    pass
+                except Exception:
+                    errors['inventory'] += 1
+
+        def gpio_loop():
+            while not stop.wait(0.02):
+                started = time.perf_counter()
+                try:
+                    levels = call(FonkanUHF.read_gpio_pins, CommandPriority.HIGH)
+                    if set(levels) != set(GPIOPin):
+                        raise ValueError(levels)
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    errors['gpio'] += 1
+
+        threads = [threading.Thread(target=gpio_loop), threading.Thread(target=inventory_loop)]
+        if inventory is None:
+            threads.append(threading.Thread(target=inventory_loop))
+        else:
+            inventory(count_read)
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return {
+            'gpio_latency': _latency_summary(latencies) if latencies else {},
+            'errors': errors,
+            'tags_per_s': reads[0] / duration,
+        }
+
+    results = {}
+    # A fresh reader per case: unsynchronized calls leave replies of interleaved rounds queued on the link,
+    # which the next connection would take for answers to its probes
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        results['unsynchronized'] = contention(lambda function, priority: function(reader), reader)
+    with _emulator(args) as emulator, FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        lock = threading.Lock()
+        def locked(function, priority):
+            with lock:
+                return function(reader)
+        results['lock'] = contention(locked, reader)
+    with _emulator(args) as emulator:
+        with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader, ReaderScheduler(reader, max_wait=0.5) as scheduler:
+            results['scheduler'] = contention(lambda function, priority: scheduler.submit(function, priority).result(), reader,
+                                              lambda on_tag: scheduler.start_inventory(on_tag, args.q))
+            scheduler.stop_inventory()
+
+            # Fairness within a priority: two threads flooding the same kind of job
+            done = {'a': 0, 'b': 0}
+            stop = threading.Event()
+            def flood(name: str):
+                while not stop.is_set():
+                    scheduler.get_power_level(CommandPriority.NORMAL).result()
+                    done[name] += 1
+            threads = [threading.Thread(target=flood, args=(name,)) for name in done]
+            for thread in threads:
+                thread.start()
+            time.sleep(1.0)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            results['fairness_normal_jobs'] = done
+
+            # Starvation: a LOW job behind a continuous flood of HIGH jobs (always some queued)
+            stop.clear()
+            def flood_high():
+                while not stop.is_set():
+                    futures = [scheduler.read_gpio_pins() for _ in range(4)]
+                    for future in futures:
+                        future.result()
+            threads = [threading.Thread(target=flood_high) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.2)
+            started = time.perf_counter()
+            scheduler.submit(FonkanUHF.get_reader_id, CommandPriority.LOW).result()
+            results['low_job_under_high_flood_s'] = time.perf_counter() - started
+            stop.set()
+            for thread in threads:
+                thread.join()
+    return results
+
+@benchmark('baud_autotune')
+def bench_baud_autotune(args: argparse.Namespace) -> dict:
+    """
+    Link garbling bytes above 115200 baud (poor USB adapter): autotune_baud_rate time and choice, inventory
+    goodput (reads with a valid CRC per second) at --baud, at the chosen rate and at 230400, and the rate a
+    later fast connect with use_tuned_baud_rate comes up at
+    """
+    error_rates = {AvailableBaudRates.BAUD_115200: 1e-5, AvailableBaudRates.BAUD_230400: 2e-3}
+
+    def goodput(reader: FonkanUHF) -> dict:
+        reads = 0
+        round_errors = 0
+        link_errors = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            try:
+                for _ in reader.read_many_tag_id(args.q):
+                    reads += 1
+            except (TagGenericException, RuntimeWarning):
+                round_errors += 1
+            except (UnexpectedReaderResponseException, ReaderCommandNotSupportedException, ValueError, IndexError):
+                link_errors += 1
+                reader._discard_input()
+        elapsed = time.perf_counter() - start
+        return {'reads_per_s': reads / elapsed, 'round_errors': round_errors, 'link_errors': link_errors}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, _emulator(args, byte_error_rates=error_rates) as emulator:
+        cache_path = f"{directory}/connections.json"
+        with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud, connection_cache_path=cache_path) as reader:
+            start = time.perf_counter()
+            report = reader.autotune_baud_rate(slot_q=args.q)
+            results['autotune_s'] = time.perf_counter() - start
+            results['selected'] = report.selected.to_int()
+            results['trials'] = {
+                trial.baud_rate.to_int(): {'frames_per_s': trial.frames_per_second, 'error_rate': trial.error_rate}
+                for trial in report.trials
+            }
+            for rate in dict.fromkeys([args.baud, report.selected, AvailableBaudRates.BAUD_230400]):
+                reader._switch_baud_rate(rate, fallback=report.selected)
+                results[f"inventory_{rate.to_int()}"] = goodput(reader)
+        with FonkanUHF(serial_port=emulator.port, fast_connect=True, use_tuned_baud_rate=True, connection_cache_path=cache_path) as reader:
+            results['reconnect_baud'] = reader.ser.baudrate
+    return results
+
+@benchmark('memory_range')
+def bench_memory_range(args: argparse.Namespace) -> dict:
+    """
+    read_tag_memory_range of a 512 word USER bank from one tag, by number of outstanding commands,
+    over a link adding the 16 ms latency timer of common USB-UART bridges to every reply
+    """
+    rng = random.Random(args.seed)
+    tag = SimulatedTag.random(rng)
+    tag.user = rng.randbytes(1024)
+    results = {}
+    with FM50xEmulator(tags=[tag], baud_rate=args.baud, link_latency=0.016, seed=args.seed) as emulator, \
+            FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+        for max_outstanding in (1, 2, 4, 8):
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                reader.read_tag_memory_range(EPCMemoryBank.USER, 0, 512, max_outstanding=max_outstanding)
+                samples.append(time.perf_counter() - start)
+            results[f"max_outstanding_{max_outstanding}"] = _latency_summary(samples)
+    return results
+
+@benchmark('encode')
+def bench_encode(args: argparse.Namespace) -> dict:
+    """
+    BulkEncoder over every simulated tag: new EPC, 16 USER words and an access password, verified, then locked.
+    Pipelined jobs versus one command per round-trip, over a link with a 16 ms USB-UART latency timer
+    """
+    results = {}
+    for pipeline in (False, True):
+        rng = random.Random(args.seed)
+        with _emulator(args, link_latency=0.016) as emulator, \
+                FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+            encoder = BulkEncoder(reader, pipeline=pipeline)
+            jobs = [
+                EncodeJob(
+                    target=tag.epc.hex().upper(),
+                    epc=rng.randbytes(12).hex().upper(),
+                    user=rng.randbytes(32).hex().upper(),
+                    new_password=rng.getrandbits(32),
+                    lock={LockField.EPC: LockAction.LOCK, LockField.USER: LockAction.LOCK, LockField.ACCESS_PASSWORD: LockAction.LOCK},
+                )
+                for tag in emulator.tags
+            ]
+            list(encoder.encode(jobs))
+            results['pipelined' if pipeline else 'sequential'] = {
+                'tags_per_minute': encoder.tags_per_minute,
+                'encoded': encoder.encoded,
+                'failure_codes': dict(encoder.failure_codes),
+            }
+    return results
+
+@benchmark('auto_q')
+def bench_auto_q(args: argparse.Namespace) -> dict:
+    """
+    Convergence of AdaptiveQController for tag populations of 1 to 500, compared with the reader's default Q
+    """
+    results = {}
+    for population in (1, 10, 50, 200, 500):
+        rng = random.Random(args.seed)
+        tags = [SimulatedTag.random(rng) for _ in range(population)]
+        with FM50xEmulator(tags=tags, baud_rate=AvailableBaudRates.BAUD_230400, seed=args.seed) as emulator, \
+                FonkanUHF(serial_port=emulator.port, baud_rate=AvailableBaudRates.BAUD_230400) as reader:
+            q_control = AdaptiveQController()
+            q_trace = []
+            for _ in range(args.rounds):
+                q_trace.append(q_control.q)
+                try:
+                    list(reader.read_many_tag_id(q_control))
+                except (TagGenericException, RuntimeWarning):
+                    pass
+            # Settled throughput at the chosen Q versus the default Q
+            settled = _inventory_rate(lambda: reader.read_many_tag_id(q_control), args.duration)
+            default = _inventory_rate(lambda: reader.read_many_tag_id(), args.duration)
+        results[population] = {
+            'q_trace': q_trace,
+            'final_q': q_control.q,
+            'population_estimate': q_control.population_estimate,
+            'auto_tags_per_s': settled['tags_per_s'],
+            'default_q_tags_per_s': default['tags_per_s'],
+        }
+    return results
+
+@benchmark('tid_decode')
+def bench_tid_decode(args: argparse.Namespace) -> dict:
+    """
+    TagModelParser decode cost per TID: distinct TIDs (cache misses) and a conveyor-like repeating population
+    """
+    rng = random.Random(args.seed)
+    population = [SimulatedTag.random(rng).tid.hex().upper() for _ in range(max(args.tags, 1))]
+    distinct = [SimulatedTag.random(rng).tid.hex().upper() for _ in range(20_000)]
+    repeated = [rng.choice(population) for _ in range(200_000)]
+
+    results = {}
+    for name, tids in (('distinct', distinct), ('repeated', repeated)):
+        parser = TagModelParser()
+        start = time.perf_counter()
+        parser.interpret_many(tids)
+        results[f"{name}_us_per_tid"] = (time.perf_counter() - start) / len(tids) * 1e6
+    return results
+
+def _random_epc(rng: random.Random) -> str:
+    """
+    Random well-formed 96 bit EPC of a supported scheme
+    """
+    scheme = rng.choice(list(EPCScheme))
+    partition = rng.randrange(7)
+    company_bits, company_digits, reference_bits, reference_digits = PARTITION_TABLES[scheme][partition]
+    low = REFERENCE_LOW_BIT[scheme]
+    value = scheme.value << 88 | rng.randrange(8) << 85 | partition << 82
+    value |= rng.randrange(min(10 ** company_digits, 1 << company_bits)) << (low + reference_bits)
+    value |= rng.randrange(min(10 ** reference_digits, 1 << reference_bits)) << low
+    if low == 38:
+        value |= rng.getrandbits(38)
+    return f"{value:024X}"
+
+@benchmark('epc_decode')
+def bench_epc_decode(args: argparse.Namespace) -> dict:
+    """
+    EPC decoding: EPCs per second decoding one at a time, in a NumPy batch (objects and columns only)
+    and in a process pool
+    """
+    results = {}
+    rng = random.Random(args.seed)
+    epcs = [_random_epc(rng) for _ in range(200_000)]
+    for name, decode in (
+        ('single', lambda epcs: [decode_epc(epc) for epc in epcs]),
+        ('batch', decode_many),
+        ('columns', decode_array),
+    ):
+        start = time.perf_counter()
+        decode(epcs)
+        results[f"{name}_epcs_per_s"] = len(epcs) / (time.perf_counter() - start)
+
+    backlog = epcs * 5
+    processes = min(os.cpu_count() or 1, 4)
+    start = time.perf_counter()
+    decode_many(backlog)
+    results['backlog_batch_epcs_per_s'] = len(backlog) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    decode_many(backlog, processes=processes)
+    results[f"backlog_{processes}_processes_epcs_per_s"] = len(backlog) / (time.perf_counter() - start)
+    return results
+
+@benchmark('tag_filter')
+def bench_tag_filter(args: argparse.Namespace) -> dict:
+    """
+    Mixed field of 300 tags, 30 of them SGTINs of one company prefix on a 100k EPC watch-list: relevant reads/s
+    and time until all 30 were read, filtering on the host only versus a TagFilter selecting the company prefix
+    on the reader (on firmware applying T to inventories, and on one applying it to access commands only).
+    Then the watch-list index: build time, memory and lookups/s, and against scanning 1000 prefixes.
+    """
+    rng = random.Random(args.seed)
+    company, partition = 614141, 5
+
+    def sgtin(serial: int) -> str:
+        value = 0x30 << 88 | 1 << 85 | partition << 82 | company << 58 | rng.randrange(10 ** 6) << 38 | serial
+        return f"{value:024X}"
+
+    relevant = [sgtin(serial) for serial in range(30)]
+    watch_list = relevant + [sgtin(serial) for serial in range(30, 100_000)]
+    tags = [SimulatedTag.random(rng) for _ in range(300)]
+    for tag, epc in zip(tags, relevant + [_random_epc(rng) for _ in range(270)]):
+        tag.epc = bytes.fromhex(epc)
+    index = EPCPrefixIndex(watch_list)
+    relevant_set = set(relevant)
+    tag_filter = TagFilter(SelectMask.company_prefix(f"{company:07d}"), index)
+
+    def run(read_round: Callable[[AdaptiveQController], Iterable[str]]) -> dict:
+        q_controller = AdaptiveQController()
+        reads = 0
+        seen = set()
+        complete: float | None = None
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            try:
+                for epc in read_round(q_controller):
+                    if epc in relevant_set:
+                        reads += 1
+                        seen.add(epc)
+            except (TagGenericException, RuntimeWarning):
+                pass
+            if complete is None and len(seen) == len(relevant):
+                complete = time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        return {'relevant_reads_per_s': reads / elapsed, 'relevant_seen': len(seen), 'all_relevant_s': complete}
+
+    results = {}
+    for name, gates, use_filter in (('host_only', False, False), ('select', True, True), ('select_not_applied', False, True)):
+        with FM50xEmulator(tags=tags, baud_rate=args.baud, seed=args.seed, select_gates_inventory=gates) as emulator:
+            with FonkanUHF(serial_port=emulator.port, baud_rate=args.baud) as reader:
+                if use_filter:
+                    results[name] = run(lambda q: reader.read_many_tag_id(q, tag_filter=tag_filter))
+                else:
+                    results[name] = run(lambda q: index.filter(reader.read_many_tag_id(q)))
+
+    lookups = [rng.choice(watch_list) if i % 2 else _random_epc(rng) for i in range(200_000)]
+    start = time.perf_counter()
+    built = EPCPrefixIndex(watch_list)
+    build = time.perf_counter() - start
+    tracemalloc.start()
+    measured = EPCPrefixIndex(watch_list)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+    start = time.perf_counter()
+    matched = sum(1 for _ in built.filter(lookups))
+    results['index'] = {
+        'entries': len(built),
+        'build_ms': build * 1000,
+        'bytes_per_entry': size / len(built),
+        'lookups_per_s': len(lookups) / (time.perf_counter() - start),
+        'matched': matched,
+    }
+    prefixes = [f"30{rng.getrandbits(40):010X}" for _ in range(1000)] + [relevant[0][:12]]
+    prefix_index = EPCPrefixIndex(prefixes)
+    sample = lookups[:20_000]
+    start = time.perf_counter()
+    for epc in sample:
+        any(epc.startswith(prefix) for prefix in prefixes)
+    scan = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in prefix_index.filter(sample):
+        pass
+    results['prefixes_1000'] = {
+        'scan_lookups_per_s': len(sample) / scan,
+        'index_lookups_per_s': len(sample) / (time.perf_counter() - start),
+    }
+    return results
+
+@benchmark('startup')
+def bench_startup(args: argparse.Namespace) -> dict:
+    """
+    Fresh interpreter per sample (median of --repeat): import time of the package, of the reader interface,
+    and of epcglobal plus the first TID decode, with the precompiled MDID table or indexing the JSON
+    """
+    snippets = {
+        'import_package': "import fonkanfm50x",
+        'import_interface': "from fonkanfm50x import FonkanUHF",
+        'first_decode_table': "from fonkanfm50x.epcglobal import shared_parser; shared_parser().interpret_TID_data('E2801105200000000000000000')",
+        'first_decode_json': "from fonkanfm50x.epcglobal import TagModelParser; TagModelParser(table_path=None).interpret_TID_data('E2801105200000000000000000')",
+        'parser_table': "from fonkanfm50x.epcglobal import TagModelParser; import time; t = time.perf_counter(); TagModelParser()",
+        'parser_json': "from fonkanfm50x.epcglobal import TagModelParser; import time; t = time.perf_counter(); TagModelParser(table_path=None)",
+    }
+    project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for name, snippet in snippets.items():
+        # t is reset by the parser_* snippets to time the constructor alone
+        code = f"import time; t = time.perf_counter(); {snippet}; print(time.perf_counter() - t)"
+        samples = [
+            float(subprocess.run([sys.executable, '-c', code], cwd=project, capture_output=True, text=True, check=True).stdout)
+            for _ in range(args.repeat)
+        ]
+        results[f"{name}_ms"] = statistics.median(samples) * 1000
+    return results
+
+@benchmark('tag_parse')
+def bench_tag_parse(args: argparse.Namespace) -> dict:
+    """
+    Per-tag cost of the str parsing path (read_multi_tag_memory_multiband) versus the bytes path (TagRead),
+    from frames as the FrameBuffer returns them: time, bytes kept per record and transient peak per parse
+    """
+    rng = random.Random(args.seed)
+    tags = [SimulatedTag.random(rng) for _ in range(10_000)]
+    frames = [f"U{tag.pc_epc_crc},R{tag.tid.hex().upper()}".encode() for tag in tags]
+    reader = FonkanUHF()
+
+    def str_path(frame: bytes):
+        # What _read_response and send_command_and_get_response_until do before parsing
+        res = frame.decode('utf-8', errors='ignore').strip()[1:]
+        return reader._parse_tag_memory_response(res)
+
+    def bytes_path(frame: bytes):
+        return parse_tag_frame(frame, time.monotonic())
+
+    results = {}
+    for name, parse in (('str', str_path), ('bytes', bytes_path)):
+        start = time.perf_counter()
+        for frame in frames:
+            parse(frame)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        parsed = [parse(frame) for frame in frames]
+        retained, _ = tracemalloc.get_traced_memory()
+        del parsed
+        transient = 0
+        for frame in frames:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            parse(frame)
+            transient += tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+        results[name] = {
+            'us_per_tag': elapsed / len(frames) * 1e6,
+            'retained_bytes_per_tag': retained / len(frames),
+            'peak_bytes_per_parse': transient / len(frames),
+        }
+    return results
+
+@benchmark('dedup')
+def bench_dedup(args: argparse.Namespace) -> dict:
+    """
+    De-duplication of a simulated multi-day stream of distinct tags: throughput and cache size
+    """
+    clock = [0.0]
+    dedup = TagDeduplicator(window=60, max_entries=10_000, clock=lambda: clock[0])
+    reads = 1_000_000
+    peak_entries = 0
+    emitted = 0
+    start = time.perf_counter()
+    for i in range(reads):
+        # ~10 tags/s for ~28 hours, every tag read 5 times in a row
+        clock[0] = i * 0.1
+        if dedup.seen(f"{i // 5:024X}") is not None:
+            emitted += 1
+        peak_entries = max(peak_entries, len(dedup))
+    elapsed = time.perf_counter() - start
+    return {'reads': reads, 'emitted': emitted, 'peak_entries': peak_entries, 'reads_per_s': reads / elapsed}
+
+@benchmark('journal')
+def bench_journal(args: argparse.Namespace) -> dict:
+    """
+    Journaling 200k multiband reads (EPC + 6 word TID) as text lines versus TagJournal (append() per read, and
+    append_many() per round of 32 reads), each without fsync and with an fsync per group of 256 reads, size on
+    disk, and looking up the reads of one EPC
+    """
+    rng = random.Random(args.seed)
+    tags = [SimulatedTag.random(rng) for _ in range(max(args.tags, 1))]
+    reads = [(tag.epc.hex().upper(), tag.tid.hex().upper()) for tag in tags]
+    n = 200_000
+    group = 256
+    target = reads[0][0]
+    round_reads = 32
+    rounds = [[reads[i % len(reads)] for i in range(first, first + round_reads)] for first in range(0, n, round_reads)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for fsync in (False, True):
+            path = f"{directory}/reads-{fsync}.txt"
+            start = time.perf_counter()
+            with open(path, 'w') as f:
+                for i in range(n):
+                    epc, tid = reads[i % len(reads)]
+                    f.write(f"{time.time()},01234567,{epc},{tid}\n")
+                    if (i + 1) % group == 0:
+                        f.flush()
+                        os.fsync(f.fileno()) if fsync else None
+            elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            with open(path) as f:
+                found = sum(1 for line in f if line.split(',')[2] == target)
+            results['text_fsync' if fsync else 'text'] = {
+                'reads_per_s': n / elapsed,
+                'bytes_per_read': os.path.getsize(path) / n,
+                'epc_query_ms': (time.perf_counter() - start) * 1000,
+                'epc_matches': found,
+            }
+
+            journal_path = f"{directory}/journal-{fsync}"
+            with TagJournal(journal_path, reader_id='01234567', group_records=group, fsync=fsync) as journal:
+                start = time.perf_counter()
+                for i in range(n):
+                    epc, tid = reads[i % len(reads)]
+                    journal.append(epc, tid)
+                    if i == n - n // 100:
+                        mark = time.time()
+                journal.flush()
+                elapsed = time.perf_counter() - start
+                size = sum(os.path.getsize(segment) for segment in glob.glob(f"{journal_path}/*.fmj"))
+                start = time.perf_counter()
+                found = sum(1 for _ in journal.query(epc=target))
+                epc_query = time.perf_counter() - start
+                start = time.perf_counter()
+                recent = sum(1 for _ in journal.query(start=mark))
+                time_query = time.perf_counter() - start
+            start = time.perf_counter()
+            TagJournal(journal_path).close()
+            reopen = time.perf_counter() - start
+            results['journal_fsync' if fsync else 'journal'] = {
+                'reads_per_s': n / elapsed,
+                'bytes_per_read': size / n,
+                'epc_query_ms': epc_query * 1000,
+                'epc_matches': found,
+                'last_1pct_query_ms': time_query * 1000,
+                'last_1pct_matches': recent,
+                'reopen_ms': reopen * 1000,
+            }
+
+            with TagJournal(f"{directory}/journal-many-{fsync}", reader_id='01234567', group_records=group, fsync=fsync) as journal:
+                start = time.perf_counter()
+                for round_reads in rounds:
+                    journal.append_many(round_reads)
+                journal.flush()
+                elapsed = time.perf_counter() - start
+                found = sum(1 for _ in journal.query(epc=target))
+            results['journal_many_fsync' if fsync else 'journal_many'] = {
+                'reads_per_s': n / elapsed,
+                'epc_matches': found,
+            }
+    return results
+
+####################################################################
+# CLI
+####################################################################
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(prog="python -m fonkanfm50x.benchmark", description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help="run only this benchmark (repeatable)")
+    parser.add_argument('--tags', type=int, default=20, help="simulated tags in the RF field")
+    parser.add_argument('--baud', type=lambda rate: AvailableBaudRates[f"BAUD_{rate}"], default=AvailableBaudRates.BAUD_38400, help="link baud rate, e.g. 115200")
+    parser.add_argument('--q', type=int, default=None, help="slot Q-value for inventory rounds")
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per throughput benchmark")
+    parser.add_argument('--rounds', type=int, default=20, help="inventory rounds per population for auto_q")
+    parser.add_argument('--repeat', type=int, default=5, help="repetitions per latency benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results to PATH ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'tags': args.tags, 'baud': args.baud.to_int(), 'q': args.q, 'duration_s': args.duration, 'repeat': args.repeat, 'seed': args.seed},
+        'results': {},
+    }
+    # Library progress prints must not end up in the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        for name in args.only or BENCHMARKS:
+            print(f"running {name}...")
+            report['results'][name] = result = BENCHMARKS[name](args)
+            print(f"{name}: {json.dumps(result)}")
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+import gzip
+import struct
+import time
+from typing import BinaryIO, NamedTuple
+
+import serial
+
+from .exceptions import ReplayDivergedException
+
+CAPTURE_MAGIC = b'FM50XCAP'
+CAPTURE_VERSION = 1
+# magic, version, capture start (wall clock)
+CAPTURE_HEADER = struct.Struct('<8sHd')
+# seconds since the capture started, event kind, data length
+EVENT_HEADER = struct.Struct('<dBI')
+
+EVENT_WRITE = 0 # bytes written to the reader
+EVENT_READ = 1 # bytes returned by a read, empty when it timed out
+EVENT_BAUD = 2 # serial baud rate changed, data is the rate in ASCII
+
+class CaptureEvent(NamedTuple):
+    time: float # seconds since the capture started
+    kind: int
+    data: bytes
+
+def _open_capture(path: str, mode: str) -> BinaryIO:
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+def load_capture(path: str) -> list[CaptureEvent]:
+    """
+    Events of a capture file written by CaptureSerial (gzip compressed if the name ends with .gz)
+    """
+    with _open_capture(path, 'rb') as f:
+        raw = f.read()
+    if len(raw) < CAPTURE_HEADER.size:
+        raise ValueError(f"{path} is not a capture file")
+    magic, version, _ = CAPTURE_HEADER.unpack_from(raw)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError(f"{path} is not a version {CAPTURE_VERSION} capture file")
+
+    events = []
+    offset = CAPTURE_HEADER.size
+    while offset + EVENT_HEADER.size <= len(raw):
+        timestamp, kind, length = EVENT_HEADER.unpack_from(raw, offset)
+        offset += EVENT_HEADER.size
+        if offset + length > len(raw):
+            # Capture cut short (crash): keep the complete events
+            break
+        events.append(CaptureEvent(timestamp, kind, raw[offset:offset + length]))
+        offset += length
+    return events
+
+class CaptureSerial:
+    """
+    Wrap a serial.Serial and record every write, every read (with what it returned, including timeouts)
+    and baud rate changes, timestamped, to a compact binary file. Everything else is passed through.
+    Used by FonkanUHF(capture_path=...).
+    """
+
+    def __init__(self, ser: serial.Serial, path: str):
+        self._ser = ser
+        self.path = path
+        self._file = _open_capture(path, 'wb')
+        self._started = time.perf_counter()
+        self._file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+        self._record(EVENT_BAUD, str(ser.baudrate).encode())
+
+    def __getattr__(self, name):
+        return getattr(self._ser, name)
+
+    def _record(self, kind: int, data: bytes):
+        if self._file is None:
+            return
+        self._file.write(EVENT_HEADER.pack(time.perf_counter() - self._started, kind, len(data)))
+        self._file.write(data)
+
+    @property
+    def timeout(self) -> float | None:
+        return self._ser.timeout
+
+    @timeout.setter
+    def timeout(self, value: float | None):
+        self._ser.timeout = value
+
+    @property
+    def baudrate(self) -> int:
+        return self._ser.baudrate
+
+    @baudrate.setter
+    def baudrate(self, value: int):
+        self._ser.baudrate = value
+        self._record(EVENT_BAUD, str(value).encode())
+
+    def write(self, data: bytes) -> int | None:
+        self._record(EVENT_WRITE, bytes(data))
+        return self._ser.write(data)
+
+    def read(self, size: int = 1) -> bytes:
+        data = self._ser.read(size)
+        self._record(EVENT_READ, data)
+        return data
+
+    def close_capture(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ReplaySerial:
+    """
+    Serial port stand-in feeding a capture back to an unmodified FonkanUHF:
+    FonkanUHF(transport=ReplaySerial('dock-door.fmcap')) runs against the recorded reader.
+
+    Every write is matched with the next recorded write (ReplayDivergedException if it differs and strict);
+    reads return the recorded chunks in order, up to the next recorded write. Without realtime they are
+    returned at once, including recorded timeouts. With realtime each chunk is held back until it is as late
+    after the preceding write as it was in the capture.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, strict: bool = True):
+        self.path = path
+        self.port = f"replay:{path}"
+        self.realtime = realtime
+        self.strict = strict
+        self.events = load_capture(path)
+        self.baudrate = int(self.events[0].data) if self.events and self.events[0].kind == EVENT_BAUD else 38400
+        self.timeout: float | None = None
+        self.is_open = True
+        self.skipped_reads = 0 # recorded reads the code did not consume before its next write
+        self._cursor = 0
+        self._chunk = b''
+        self._write_capture_time = 0.0
+        self._write_time = time.perf_counter()
+
+    def open(self):
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    @property
+    def done(self) -> bool:
+        """
+        Every recorded write was replayed
+        """
+        return not any(event.kind == EVENT_WRITE for event in self.events[self._cursor:])
+
+    def _skip_baud_events(self):
+        while self._cursor < len(self.events) and self.events[self._cursor].kind == EVENT_BAUD:
+            self._cursor += 1
+
+    def write(self, data: bytes) -> int:
+        while self._cursor < len(self.events) and self.events[self._cursor].kind != EVENT_WRITE:
+            if self.events[self._cursor].kind == EVENT_READ:
+                self.skipped_reads += 1
+            self._cursor += 1
+        if self._cursor == len(self.events):
+            raise ReplayDivergedException(f"Write {bytes(data)!r} after the end of the capture")
+        event = self.events[self._cursor]
+        if self.strict and event.data != data:
+            raise ReplayDivergedException(f"Wrote {bytes(data)!r}, the capture has {event.data!r} (event {self._cursor})")
+        self._cursor += 1
+        self._chunk = b''
+        self._write_capture_time = event.time
+        self._write_time = time.perf_counter()
+        return len(data)
+
+    def _due(self, event: CaptureEvent) -> float:
+        return self._write_time + (event.time - self._write_capture_time)
+
+    def _next_chunk(self, wait: bool) -> bytes | None:
+        """
+        Data of the next recorded read, None if there is none before the next write (or, not waiting, not due yet)
+        """
+        self._skip_baud_events()
+        if self._cursor == len(self.events) or self.events[self._cursor].kind != EVENT_READ:
+            return None
+        event = self.events[self._cursor]
+        if self.realtime:
+            delay = self._due(event) - time.perf_counter()
+            if delay > 0:
+                if not wait:
+                    return None
+                time.sleep(delay)
+        self._cursor += 1
+        return event.data
+
+    @property
+    def in_waiting(self) -> int:
+        if self._chunk:
+            return len(self._chunk)
+        self._skip_baud_events()
+        if self._cursor == len(self.events) or self.events[self._cursor].kind != EVENT_READ:
+            return 0
+        event = self.events[self._cursor]
+        if self.realtime and self._due(event) > time.perf_counter():
+            return 0
+        return len(event.data)
+
+    def read(self, size: int = 1) -> bytes:
+        if not self._chunk:
+            chunk = self._next_chunk(wait=True)
+            if not chunk:
+                # Recorded timeout, or the code waits for more than the reader sent
+                if chunk is None and self.realtime and self.timeout:
+                    time.sleep(self.timeout)
+                return b''
+            self._chunk = chunk
+        data, self._chunk = self._chunk[:size], self._chunk[size:]
+        return data
+
+    def reset_input_buffer(self):
+        self._chunk = b''
+
+    def reset_output_buffer(self):
+        pass
+
+    def flush(self):
+        pass
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import time
+
+from .types import RFIDRegion, AvailableBaudRates
+
+def default_cache_path() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'fonkanfm50x', 'connections.json')
+
+class ConnectionCache:
+    """
+    Small JSON file remembering, per serial port, the last working baud rate and reader settings,
+    so FonkanUHF(fast_connect=True) can skip the baud rate search and redundant configuration.
+
+    {"/dev/ttyACM0": {"reader_id": "01234567", "baud_rate": 4, "power": 25, "region": 5, "updated": 1700000000.0}}
+
+    FonkanUHF.autotune_baud_rate adds the rate it chose ("tuned_baud_rate") and its measurements ("autotune").
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or default_cache_path()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            # Missing or corrupt cache only costs a slower connect
+            return {}
+
+    def get(self, serial_port: str) -> dict | None:
+        return self._load().get(serial_port)
+
+    def known_baud_rates(self) -> list[AvailableBaudRates]:
+        """
+        Baud rates of all cached readers, most recently used first
+        """
+        entries = sorted(self._load().values(), key=lambda entry: entry.get('updated', 0), reverse=True)
+        rates = []
+        for entry in entries:
+            try:
+                rate = AvailableBaudRates(entry['baud_rate'])
+            except (KeyError, ValueError):
+                continue
+            if rate not in rates:
+                rates.append(rate)
+        return rates
+
+    def tuned_baud_rate(self, serial_port: str) -> AvailableBaudRates | None:
+        """
+        Baud rate chosen by FonkanUHF.autotune_baud_rate for serial_port, None if it was never tuned
+        """
+        try:
+            return AvailableBaudRates((self.get(serial_port) or {})['tuned_baud_rate'])
+        except (KeyError, ValueError):
+            return None
+
+    def update(self, serial_port: str, **values):
+        """
+        Merge values (reader_id, baud_rate, power, region...) into the entry of serial_port
+        """
+        data = self._load()
+        entry = data.setdefault(serial_port, {})
+        for key, value in values.items():
+            if isinstance(value, (AvailableBaudRates, RFIDRegion)):
+                value = value.value
+            entry[key] = value
+        entry['updated'] = time.time()
+        self._save(data)
+
+    def forget(self, serial_port: str):
+        data = self._load()
+        if data.pop(serial_port, None) is not None:
+            self._save(data)
+
+    def _save(self, data: dict):
+        # Write to a temporary file and rename, so a crash never leaves a half written cache
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=directory, prefix='.connections-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
@@ -0,0 +1,296 @@
+import threading
+from enum import Enum
+from typing import Callable, Iterator
+
+import serial
+
+from .interface import FonkanUHF
+from .qcontrol import AdaptiveQController
+from .tagread import TagRead
+from .types import EPCMemoryBank
+from .exceptions import TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException
+
+MAX_READER_ERRORS = 5 # rounds in a row lost to garbled or missing replies before the producer gives up
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = 0 # overwrite the oldest unread reads, counted in dropped
+    BLOCK = 1 # pause the inventory until the consumer catches up
+
+class TagRingBuffer:
+    """
+    Fixed size single producer / single consumer ring of TagRead, without locks.
+
+    The producer only advances _head and _refused, the consumer only _tail and _dropped: every counter has
+    a single writer. Each slot holds (sequence number, read), stored in one list assignment, so the consumer
+    detects slots the producer overwrote (DROP_OLDEST) while it was reading them and counts them as dropped
+    instead of returning a newer read twice.
+    The Events are only used to sleep while the ring is empty (consumer) or full (producer, BLOCK).
+    """
+
+    def __init__(self, capacity: int = 4096, overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.overflow = overflow
+        self._slots: list[tuple[int, TagRead] | None] = [None] * capacity
+        self._head = 0 # reads written
+        self._tail = 0 # reads consumed or dropped
+        self._dropped = 0 # overwritten reads found by the consumer
+        self._refused = 0 # reads the producer gave up on when stopped while waiting for room (BLOCK)
+        self._readable = threading.Event()
+        self._writable = threading.Event()
+
+    def __len__(self) -> int:
+        return min(self._head - self._tail, self.capacity)
+
+    @property
+    def written(self) -> int:
+        return self._head
+
+    @property
+    def dropped(self) -> int:
+        # Overwritten reads the consumer did not get to yet are counted too
+        return self._dropped + self._refused + max(self._head - self._tail - self.capacity, 0)
+
+    def put(self, read: TagRead, stop: threading.Event | None = None) -> bool:
+        """
+        Producer side. Returns False if stop was set while waiting for room (BLOCK), the read is then dropped.
+        """
+        head = self._head
+        if self.overflow == OverflowPolicy.BLOCK:
+            while head - self._tail >= self.capacity:
+                self._writable.clear()
+                if head - self._tail < self.capacity:
+                    break
+                if stop is not None and stop.is_set():
+                    self._refused += 1
+                    return False
+                self._writable.wait(0.1)
+        self._slots[head % self.capacity] = (head, read)
+        self._head = head + 1
+        if not self._readable.is_set():
+            self._readable.set()
+        return True
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Consumer side: wait until a read is available. Returns False on timeout.
+        """
+        if self._head != self._tail:
+            return True
+        self._readable.clear()
+        if self._head != self._tail:
+            return True
+        return self._readable.wait(timeout) and self._head != self._tail
+
+    def get_batch(self, max_items: int | None = None) -> list[TagRead]:
+        """
+        Consumer side: take up to max_items reads (all available by default), without waiting
+        """
+        head = self._head
+        tail = self._tail
+        if head - tail > self.capacity:
+            self._dropped += head - tail - self.capacity
+            tail = head - self.capacity
+        end = head if max_items is None else min(head, tail + max_items)
+        slots = self._slots
+        capacity = self.capacity
+        batch = []
+        for sequence in range(tail, end):
+            entry = slots[sequence % capacity]
+            if entry[0] == sequence:
+                batch.append(entry[1])
+            else:
+                # Overwritten by a newer read while we were copying
+                self._dropped += 1
+        self._tail = end
+        if self.overflow == OverflowPolicy.BLOCK:
+            self._writable.set()
+        return batch
+
+class ContinuousInventory:
+    """
+    Keep the reader inventorying while the application processes tags: a producer thread runs
+    U rounds back to back and pushes the TagRead records into a TagRingBuffer. Consume them through
+    iteration, get_batch() or callbacks registered with on_tag() (run on a dispatcher thread).
+    Use either callbacks or iteration/get_batch: the ring has a single consumer.
+
+    The reader must be connected and is owned by the producer thread until stop().
+
+    with FonkanUHF() as reader, ContinuousInventory(reader, slot_q=4) as inventory:
+        for read in inventory:
+            print(read.epc_hex)
+    """
+
+    def __init__(self,
+              reader: FonkanUHF,
+              slot_q: int | AdaptiveQController | None = None,
+              capacity: int = 4096,
+              overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+              memory: tuple[EPCMemoryBank, int, int] | None = None):
+        """
+        slot_q: Q-value of the rounds, or an AdaptiveQController
+        capacity: reads held in the ring buffer
+        overflow: what the producer does when the consumer is capacity reads behind
+        memory: (bank, address, length) to read along with the EPC of every tag (multiband rounds)
+        """
+        self.reader = reader
+        self.slot_q = slot_q
+        self.memory = memory
+        self.buffer = TagRingBuffer(capacity, overflow)
+        self.rounds = 0
+        self.round_errors = 0
+        self.reader_errors = 0 # rounds lost to a garbled or missing reply, the line drained after each
+        self.callback_errors = 0
+        self.error: BaseException | None = None # serial/reader failure that stopped the producer
+        self._callbacks: list[Callable[[TagRead], None]] = []
+        self._stop = threading.Event()
+        self._producer: threading.Thread | None = None
+        self._dispatcher: threading.Thread | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        self._producer = threading.Thread(target=self._produce, name=f"fm50x-inventory-{self.reader.serial_port}", daemon=True)
+        self._producer.start()
+        if self._callbacks:
+            self._start_dispatcher()
+
+    def stop(self, timeout: float | None = 5.0):
+        """
+        Stop after the current round. Reads still in the buffer can be consumed afterwards;
+        callbacks are run for them before the dispatcher exits.
+        """
+        self._stop.set()
+        if self._producer is not None:
+            self._producer.join(timeout)
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout)
+            self._dispatcher = None
+
+    @property
+    def running(self) -> bool:
+        return self._producer is not None and self._producer.is_alive()
+
+    @property
+    def dropped(self) -> int:
+        return self.buffer.dropped
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'rounds': self.rounds,
+            'round_errors': self.round_errors,
+            'reader_errors': self.reader_errors,
+            'reads': self.buffer.written,
+            'dropped': self.buffer.dropped,
+            'pending': len(self.buffer),
+            'callback_errors': self.callback_errors,
+        }
+
+    ####################################################################
+    # Consumers
+    ####################################################################
+
+    def get_batch(self, max_items: int | None = None, timeout: float | None = None) -> list[TagRead]:
+        """
+        Reads available now, waiting up to timeout for the first one. Empty list on timeout.
+        """
+        if not self.buffer.wait(timeout):
+            return []
+        return self.buffer.get_batch(max_items)
+
+    def __iter__(self) -> Iterator[TagRead]:
+        """
+        Reads as they arrive. Ends once the producer stopped and the buffer is drained.
+        """
+        if self._callbacks:
+            raise RuntimeError("Reads are consumed by the registered callbacks")
+        while True:
+            batch = self.get_batch(timeout=0.1)
+            if batch:
+                yield from batch
+            elif not self.running and not len(self.buffer):
+                return
+
+    def on_tag(self, callback: Callable[[TagRead], None]):
+        """
+        Call callback(read) for every read, from the dispatcher thread. A slow callback makes the
+        buffer fill up, never the inventory wait (unless overflow is BLOCK).
+        """
+        self._callbacks.append(callback)
+        if self.running and self._dispatcher is None:
+            self._start_dispatcher()
+
+    def _start_dispatcher(self):
+        self._dispatcher = threading.Thread(target=self._dispatch, name=f"fm50x-dispatch-{self.reader.serial_port}", daemon=True)
+        self._dispatcher.start()
+
+    def _dispatch(self):
+        while True:
+            batch = self.get_batch(timeout=0.1)
+            if not batch and not self.running and not len(self.buffer):
+                return
+            for read in batch:
+                for callback in self._callbacks:
+                    try:
+                        callback(read)
+                    except Exception as e:
+                        self.callback_errors += 1
+                        print(f"Tag callback {callback} failed: {e}") if self.reader.debug else None
+
+    ####################################################################
+    # Producer
+    ####################################################################
+
+    def _read_round(self) -> Iterator[TagRead]:
+        if self.memory is None:
+            return self.reader.read_many_tag_reads(self.slot_q)
+        bank, address, length = self.memory
+        return self.reader.read_multi_tag_memory_reads(bank, address, length, self.slot_q)
+
+    def _produce(self):
+        put = self.buffer.put
+        stop = self._stop
+        reader_errors = 0 # in a row
+        while not stop.is_set():
+            try:
+                # Always finish the round, even when stopping: its replies are already on the line
+                for read in self._read_round():
+                    put(read, stop)
+                self.rounds += 1
+                reader_errors = 0
+            except (TagGenericException, RuntimeWarning) as e:
+                # Collisions and CRC failures only lose the current round
+                self.rounds += 1
+                self.round_errors += 1
+                reader_errors = 0
+                print(f"Error reading tag: {e}") if self.reader.debug else None
+            except UnexpectedReaderResponseException as e:
+                # Garbled or missing reply: drop the rest of the round and go on, unless the reader stopped answering
+                self.rounds += 1
+                self.reader_errors += 1
+                reader_errors += 1
+                print(f"Inventory on {self.reader.serial_port} lost a round: {e}") if self.reader.debug else None
+                if reader_errors >= MAX_READER_ERRORS:
+                    self.error = e
+                    return
+                try:
+                    self.reader._discard_input()
+                except (serial.SerialException, OSError) as e:
+                    self.error = e
+                    return
+            except (serial.SerialException, OSError, ReaderCommandNotSupportedException) as e:
+                self.error = e
+                print(f"Inventory on {self.reader.serial_port} failed: {e}") if self.reader.debug else None
+                return
@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generator, Iterable, NamedTuple
+
+class TagSighting(NamedTuple):
+    """
+    Presence of a tag in the field, from its first read (first_seen) to its latest one (last_seen).
+    seen()/filter() emit one on the first read (first_seen == last_seen, count 1) and, with refresh, again
+    while the tag stays (the presence so far). The whole presence goes to on_expire once the EPC leaves.
+    """
+    epc: str
+    first_seen: float
+    last_seen: float
+    count: int # reads of this EPC within the current presence
+    data: str | None = None # memory data, for read_multi_tag_memory_multiband reads
+
+class TagDeduplicator:
+    """
+    Suppress EPCs already seen within the last `window` seconds.
+
+    Entries live in an OrderedDict kept in last-seen order, so expiry only ever pops from the front
+    (O(1) amortized per read) and memory is capped at max_entries however many distinct tags pass.
+
+    A tag is reported as soon as it is first read, before its presence is over: that sighting only carries
+    the first read. With refresh, a tag still being read is reported again every refresh seconds, with its
+    first and last seen and read count so far. The final presence goes to on_expire, called when the tag
+    has been absent for the window (or is evicted), and expire_all() at shutdown for the tags still present.
+
+    dedup = TagDeduplicator(window=60)
+    for sighting in dedup.filter(reader.read_many_tag_id()):
+        print(f"New tag {sighting.epc}")
+    """
+
+    def __init__(self,
+              window: float = 60,
+              max_entries: int = 100_000,
+              on_expire: Callable[[TagSighting], None] | None = None,
+              refresh: float | None = None,
+              clock: Callable[[], float] = time.monotonic):
+        """
+        window: seconds an EPC must be absent before it is reported again
+        max_entries: hard cap on tracked EPCs. When full, the least recently seen EPC is dropped early
+        on_expire: called with the whole presence (first/last seen, read count) when an EPC leaves the cache
+        refresh: seconds after which a tag still present is reported again, None to only report its arrival
+        clock: time source for all timestamps
+        """
+        assert window > 0, "Window must be positive"
+        assert max_entries > 0, "max_entries must be positive"
+        assert refresh is None or refresh > 0, "refresh must be positive"
+        self.window = window
+        self.max_entries = max_entries
+        self.on_expire = on_expire
+        self.refresh = refresh
+        self.clock = clock
+        # epc -> [first_seen, last_seen, count, last reported], least recently seen first
+        self._entries: OrderedDict[str, list] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, epc: str) -> bool:
+        return epc in self._entries
+
+    def expire(self, now: float | None = None):
+        """
+        Drop EPCs not seen within the window
+        """
+        if now is None:
+            now = self.clock()
+        deadline = now - self.window
+        entries = self._entries
+        while entries:
+            epc, entry = next(iter(entries.items()))
+            if entry[1] > deadline:
+                break
+            del entries[epc]
+            if self.on_expire:
+                self.on_expire(TagSighting(epc, entry[0], entry[1], entry[2]))
+
+    def seen(self, epc: str, data: str | None = None, now: float | None = None) -> TagSighting | None:
+        """
+        Record a read of epc. Returns a sighting if the EPC was not seen within the window (of this first
+        read only) or, with refresh, was last reported at least refresh seconds ago (the presence so far).
+        Otherwise None.
+        """
+        if now is None:
+            now = self.clock()
+        self.expire(now)
+
+        entry = self._entries.get(epc)
+        if entry is not None:
+            entry[1] = now
+            entry[2] += 1
+            self._entries.move_to_end(epc)
+            if self.refresh is not None and now - entry[3] >= self.refresh:
+                entry[3] = now
+                return TagSighting(epc, entry[0], now, entry[2], data)
+            return None
+
+        if len(self._entries) >= self.max_entries:
+            evicted, entry = self._entries.popitem(last=False)
+            if self.on_expire:
+                self.on_expire(TagSighting(evicted, entry[0], entry[1], entry[2]))
+        self._entries[epc] = [now, now, 1, now]
+        return TagSighting(epc, now, now, 1, data)
+
+    def filter(self, reads: Iterable[str | tuple[str, str]]) -> Generator[TagSighting, None, None]:
+        """
+        De-duplication stage for the inventory generators. Accepts EPCs (read_many_tag_id)
+        or (EPC, data) tuples (read_multi_tag_memory_multiband).
+        """
+        for read in reads:
+            if isinstance(read, str):
+                sighting = self.seen(read)
+            else:
+                sighting = self.seen(read[0], read[1])
+            if sighting is not None:
+                yield sighting
+
+    def expire_all(self):
+        """
+        End every presence now, passing each to on_expire (e.g. at shutdown)
+        """
+        entries = self._entries
+        while entries:
+            epc, entry = entries.popitem(last=False)
+            if self.on_expire:
+                self.on_expire(TagSighting(epc, entry[0], entry[1], entry[2]))
+
+    def clear(self):
+        """
+        Forget every EPC, without calling on_expire
+        """
+        self._entries.clear()
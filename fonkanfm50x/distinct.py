@@ -0,0 +1,423 @@
+import hashlib
+import math
+import struct
+import time
+from array import array
+from typing import Callable, Generator, Iterable, TypeVar
+
+from .tagread import TagRead
+
+T = TypeVar('T')
+
+SKETCH_MAGIC = b'FHLL'
+SKETCH_VERSION = 1
+# magic, version, precision, exact (1) or registers (0), exact threshold, number of exact hashes
+SKETCH_HEADER = struct.Struct('<4sBBBII')
+COUNTER_MAGIC = b'FTCN'
+# magic, version, bucket seconds, precision, exact threshold, sketches
+COUNTER_HEADER = struct.Struct('<4sBdBII')
+# reader ID length, bucket start, sketch length
+COUNTER_ENTRY = struct.Struct('<HqI')
+
+ALPHA_INF = 1 / (2 * math.log(2))
+
+def epc_hash(epc: str | bytes | TagRead) -> int:
+    """
+    64 bit hash of an EPC, the same for its hex str, its bytes and its TagRead, and across processes
+    """
+    if isinstance(epc, TagRead):
+        epc = epc.epc
+    elif isinstance(epc, str):
+        epc = bytes.fromhex(epc)
+    return int.from_bytes(hashlib.blake2b(epc, digest_size=8).digest(), 'little')
+
+class HyperLogLog:
+    """
+    Distinct EPC count in fixed memory: 2^precision one byte registers (4 kB at the default precision 12),
+    with a standard error of 1.04 / sqrt(2^precision), 1.6% at precision 12.
+    Up to exact_threshold distinct EPCs the sketch keeps their 64 bit hashes instead, and counts exactly.
+
+    Sketches of the same precision merge losslessly: the count of a merge is the count of the union.
+
+    sketch = HyperLogLog()
+    for epc in sketch.count_many(reader.read_many_tag_id()):
+        ...
+    print(len(sketch))
+    """
+
+    def __init__(self, precision: int = 12, exact_threshold: int = 256):
+        """
+        precision: log2 of the number of registers (4 ~ 18)
+        exact_threshold: distinct EPCs counted exactly before switching to the registers (0: never exact)
+        """
+        assert 4 <= precision <= 18, "precision must be between 4 and 18"
+        assert 0 <= exact_threshold, "exact_threshold must not be negative"
+        self.precision = precision
+        self.exact_threshold = exact_threshold
+        self._exact: set[int] | None = set() if exact_threshold > 0 else None
+        self._registers: bytearray | None = None if exact_threshold > 0 else bytearray(1 << precision)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __repr__(self):
+        return f"HyperLogLog(precision={self.precision}, exact={self.exact}, count={self.count()})"
+
+    def __or__(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        merged = self.copy()
+        merged.merge(other)
+        return merged
+
+    @property
+    def exact(self) -> bool:
+        return self._exact is not None
+
+    @property
+    def standard_error(self) -> float:
+        """
+        Relative standard error of count(), 0 while exact
+        """
+        return 0.0 if self.exact else 1.04 / math.sqrt(1 << self.precision)
+
+    def copy(self) -> 'HyperLogLog':
+        sketch = HyperLogLog(self.precision, self.exact_threshold)
+        sketch._exact = set(self._exact) if self._exact is not None else None
+        sketch._registers = bytearray(self._registers) if self._registers is not None else None
+        return sketch
+
+    def _to_registers(self):
+        self._registers = bytearray(1 << self.precision)
+        hashes, self._exact = self._exact, None
+        for h in hashes:
+            self._add_register(h)
+
+    def _add_register(self, h: int):
+        # Low bits pick the register, the rank is the position of the lowest set bit of the rest
+        index = h & ((1 << self.precision) - 1)
+        rest = h >> self.precision
+        rank = ((rest & -rest).bit_length() if rest else 65 - self.precision)
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def add_hash(self, h: int):
+        if self._exact is not None:
+            self._exact.add(h)
+            if len(self._exact) > self.exact_threshold:
+                self._to_registers()
+        else:
+            self._add_register(h)
+
+    def add(self, epc: str | bytes | TagRead):
+        self.add_hash(epc_hash(epc))
+
+    def update(self, epcs: Iterable[str | bytes | TagRead]):
+        epcs = iter(epcs)
+        for epc in epcs:
+            self.add(epc)
+            if self._registers is not None:
+                break
+        # Registers: same as add(), with everything bound to locals
+        registers = self._registers
+        p = self.precision
+        index_mask = (1 << p) - 1
+        saturated = 65 - p
+        blake2b = hashlib.blake2b
+        from_bytes = int.from_bytes
+        fromhex = bytes.fromhex
+        for epc in epcs:
+            if isinstance(epc, str):
+                epc = fromhex(epc)
+            elif isinstance(epc, TagRead):
+                epc = epc.epc
+            h = from_bytes(blake2b(epc, digest_size=8).digest(), 'little')
+            rest = h >> p
+            rank = (rest & -rest).bit_length() if rest else saturated
+            index = h & index_mask
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count_many(self, reads: Iterable[T]) -> Generator[T, None, None]:
+        """
+        Count the reads of an inventory round while passing them through:
+        EPCs (read_many_tag_id), (EPC, data) tuples (read_multi_tag_memory_multiband) or TagRead
+        """
+        for read in reads:
+            self.add(read[0] if isinstance(read, tuple) else read)
+            yield read
+
+    def merge(self, other: 'HyperLogLog'):
+        """
+        Add other's EPCs to this sketch
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge precision {other.precision} into precision {self.precision}")
+        if other._exact is not None:
+            for h in other._exact:
+                self.add_hash(h)
+            return
+        if self._exact is not None:
+            self._to_registers()
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    @staticmethod
+    def _sigma(x: float) -> float:
+        if x == 1:
+            return math.inf
+        y = 1.0
+        z = x
+        while True:
+            x *= x
+            previous = z
+            z += x * y
+            y += y
+            if z == previous:
+                return z
+
+    @staticmethod
+    def _tau(x: float) -> float:
+        if x == 0 or x == 1:
+            return 0.0
+        y = 1.0
+        z = 1 - x
+        while True:
+            x = math.sqrt(x)
+            previous = z
+            y *= 0.5
+            z -= (1 - x) ** 2 * y
+            if z == previous:
+                return z / 3
+
+    def count(self) -> int:
+        """
+        Ertl's improved estimator (2017) over the register histogram: unbiased from a few EPCs to 2^64,
+        without the linear counting switch and bias tables of HyperLogLog++
+        """
+        if self._exact is not None:
+            return len(self._exact)
+        m = 1 << self.precision
+        q = 64 - self.precision
+        histogram = [self._registers.count(rank) for rank in range(q + 2)]
+        if histogram[0] == m:
+            return 0
+        z = m * self._tau(1 - histogram[q + 1] / m)
+        for rank in range(q, 0, -1):
+            z = 0.5 * (z + histogram[rank])
+        z += m * self._sigma(histogram[0] / m)
+        return round(ALPHA_INF * m * m / z)
+
+    ####################################################################
+    # Serialization
+    ####################################################################
+
+    def to_bytes(self) -> bytes:
+        """
+        Header, then the exact hashes (8 bytes each) or the registers packed 6 bits each
+        (3 kB at precision 12)
+        """
+        if self._exact is not None:
+            header = SKETCH_HEADER.pack(SKETCH_MAGIC, SKETCH_VERSION, self.precision, 1, self.exact_threshold, len(self._exact))
+            return header + array('Q', sorted(self._exact)).tobytes()
+        header = SKETCH_HEADER.pack(SKETCH_MAGIC, SKETCH_VERSION, self.precision, 0, self.exact_threshold, 0)
+        registers = self._registers
+        packed = bytearray()
+        for i in range(0, len(registers), 4):
+            value = registers[i] | registers[i + 1] << 6 | registers[i + 2] << 12 | registers[i + 3] << 18
+            packed += value.to_bytes(3, 'little')
+        return header + bytes(packed)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        if len(data) < SKETCH_HEADER.size:
+            raise ValueError("Not a HyperLogLog sketch")
+        magic, version, precision, exact, exact_threshold, hashes = SKETCH_HEADER.unpack_from(data)
+        if magic != SKETCH_MAGIC or version != SKETCH_VERSION:
+            raise ValueError(f"Not a version {SKETCH_VERSION} HyperLogLog sketch")
+        sketch = cls(precision, exact_threshold)
+        body = memoryview(data)[SKETCH_HEADER.size:]
+        if exact:
+            if len(body) != hashes * 8:
+                raise ValueError("Truncated HyperLogLog sketch")
+            values = array('Q')
+            values.frombytes(body)
+            sketch._exact = set(values)
+            sketch._registers = None
+            return sketch
+        m = 1 << precision
+        if len(body) != m * 3 // 4:
+            raise ValueError("Truncated HyperLogLog sketch")
+        registers = bytearray(m)
+        for i in range(0, m, 4):
+            value = int.from_bytes(body[i * 3 // 4:i * 3 // 4 + 3], 'little')
+            registers[i] = value & 0x3F
+            registers[i + 1] = value >> 6 & 0x3F
+            registers[i + 2] = value >> 12 & 0x3F
+            registers[i + 3] = value >> 18
+        sketch._exact = None
+        sketch._registers = registers
+        return sketch
+
+class DistinctTagCounter:
+    """
+    Distinct tags per reader and per time bucket (an hour by default), one HyperLogLog sketch each,
+    for dashboards like "tags through each door per hour". Roll-ups (per day, over all doors) merge
+    the bucket sketches, so memory only grows with readers x buckets kept, never with the tags.
+
+    counter = DistinctTagCounter(bucket_seconds=3600, retention=7 * 86400)
+    for epc in counter.count_many(reader.read_many_tag_id(), reader_id='door-1'):
+        ...
+    counter.counts(reader_id='door-1')  # {hour start: distinct tags}
+    counter.count(start=midnight, end=midnight + 86400)  # distinct tags of the day, all doors
+    """
+
+    def __init__(self,
+              bucket_seconds: float = 3600,
+              precision: int = 12,
+              exact_threshold: int = 256,
+              retention: float | None = None,
+              clock: Callable[[], float] = time.time):
+        """
+        bucket_seconds: width of the time buckets, aligned on the epoch (UTC hours by default)
+        precision, exact_threshold: of every bucket's HyperLogLog
+        retention: drop buckets that ended more than this many seconds ago (None keeps them)
+        clock: wall clock time source for the bucket of each read
+        """
+        assert bucket_seconds > 0, "bucket_seconds must be positive"
+        self.bucket_seconds = bucket_seconds
+        self.precision = precision
+        self.exact_threshold = exact_threshold
+        self.retention = retention
+        self.clock = clock
+        # (reader ID, bucket number) -> sketch
+        self._sketches: dict[tuple[str, int], HyperLogLog] = {}
+        self._oldest_bucket: int | None = None
+
+    def __len__(self) -> int:
+        """
+        Sketches held
+        """
+        return len(self._sketches)
+
+    def _bucket(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.bucket_seconds)
+
+    def _sketch(self, reader_id: str, bucket: int) -> HyperLogLog:
+        sketch = self._sketches.get((reader_id, bucket))
+        if sketch is None:
+            sketch = self._sketches[(reader_id, bucket)] = HyperLogLog(self.precision, self.exact_threshold)
+            if self.retention is not None:
+                self.expire()
+        return sketch
+
+    def expire(self, now: float | None = None):
+        """
+        Drop the buckets older than retention
+        """
+        if self.retention is None:
+            return
+        oldest = self._bucket((self.clock() if now is None else now) - self.retention)
+        if self._oldest_bucket is not None and oldest <= self._oldest_bucket:
+            return
+        self._oldest_bucket = oldest
+        for key in [key for key in self._sketches if key[1] < oldest]:
+            del self._sketches[key]
+
+    def add(self, epc: str | bytes | TagRead, reader_id: str = '', timestamp: float | None = None):
+        """
+        timestamp: wall clock time of the read, now if None (TagRead timestamps are monotonic, not used)
+        """
+        self._sketch(reader_id, self._bucket(self.clock() if timestamp is None else timestamp)).add(epc)
+
+    def count_many(self, reads: Iterable[T], reader_id: str = '') -> Generator[T, None, None]:
+        """
+        Count the reads of an inventory round while passing them through:
+        EPCs (read_many_tag_id), (EPC, data) tuples (read_multi_tag_memory_multiband) or TagRead
+        """
+        # One bucket lookup per round, not per read
+        sketch = self._sketch(reader_id, self._bucket(self.clock()))
+        for read in reads:
+            sketch.add(read[0] if isinstance(read, tuple) else read)
+            yield read
+
+    def _matching(self, reader_ids: Iterable[str] | None, start: float | None, end: float | None) -> list[tuple[tuple[str, int], HyperLogLog]]:
+        reader_ids = set(reader_ids) if reader_ids is not None else None
+        first = self._bucket(start) if start is not None else None
+        last = math.ceil(end / self.bucket_seconds) if end is not None else None
+        return [
+            (key, sketch) for key, sketch in self._sketches.items()
+            if (reader_ids is None or key[0] in reader_ids)
+            and (first is None or key[1] >= first)
+            and (last is None or key[1] < last)
+        ]
+
+    def sketch(self, reader_ids: Iterable[str] | None = None, start: float | None = None, end: float | None = None) -> HyperLogLog:
+        """
+        Merge of the buckets of reader_ids (all if None) overlapping [start, end)
+        """
+        merged = HyperLogLog(self.precision, self.exact_threshold)
+        for _, sketch in self._matching(reader_ids, start, end):
+            merged.merge(sketch)
+        return merged
+
+    def count(self, reader_ids: Iterable[str] | None = None, start: float | None = None, end: float | None = None) -> int:
+        """
+        Distinct tags of reader_ids (all if None) in the buckets overlapping [start, end)
+        """
+        return self.sketch(reader_ids, start, end).count()
+
+    def counts(self, reader_id: str | None = None, bucket_seconds: float | None = None) -> dict[float, int]:
+        """
+        Distinct tags per bucket start time, of one reader or all (None). bucket_seconds rolls buckets up
+        into wider ones (a multiple of the counter's bucket_seconds, e.g. 86400 for days).
+        """
+        width = self.bucket_seconds if bucket_seconds is None else bucket_seconds
+        ratio = round(width / self.bucket_seconds)
+        assert ratio >= 1 and math.isclose(ratio * self.bucket_seconds, width), "bucket_seconds must be a multiple of the counter's"
+        rolled: dict[int, HyperLogLog] = {}
+        for (_, bucket), sketch in self._matching(None if reader_id is None else [reader_id], None, None):
+            merged = rolled.get(bucket // ratio)
+            if merged is None:
+                merged = rolled[bucket // ratio] = HyperLogLog(self.precision, self.exact_threshold)
+            merged.merge(sketch)
+        return {bucket * width: sketch.count() for bucket, sketch in sorted(rolled.items())}
+
+    def readers(self) -> list[str]:
+        return sorted({reader_id for reader_id, _ in self._sketches})
+
+    def merge(self, other: 'DistinctTagCounter'):
+        """
+        Add the sketches of another counter (another process or site) with the same buckets
+        """
+        if other.bucket_seconds != self.bucket_seconds:
+            raise ValueError(f"Cannot merge {other.bucket_seconds} s buckets into {self.bucket_seconds} s buckets")
+        for (reader_id, bucket), sketch in other._sketches.items():
+            self._sketch(reader_id, bucket).merge(sketch)
+
+    def to_bytes(self) -> bytes:
+        parts = [COUNTER_HEADER.pack(COUNTER_MAGIC, SKETCH_VERSION, self.bucket_seconds, self.precision, self.exact_threshold, len(self._sketches))]
+        for (reader_id, bucket), sketch in self._sketches.items():
+            encoded_id = reader_id.encode()
+            encoded_sketch = sketch.to_bytes()
+            parts += [COUNTER_ENTRY.pack(len(encoded_id), bucket, len(encoded_sketch)), encoded_id, encoded_sketch]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **kwargs) -> 'DistinctTagCounter':
+        """
+        kwargs: retention and clock of the counter
+        """
+        if len(data) < COUNTER_HEADER.size:
+            raise ValueError("Not a tag counter")
+        magic, version, bucket_seconds, precision, exact_threshold, entries = COUNTER_HEADER.unpack_from(data)
+        if magic != COUNTER_MAGIC or version != SKETCH_VERSION:
+            raise ValueError(f"Not a version {SKETCH_VERSION} tag counter")
+        counter = cls(bucket_seconds, precision, exact_threshold, **kwargs)
+        offset = COUNTER_HEADER.size
+        for _ in range(entries):
+            id_length, bucket, sketch_length = COUNTER_ENTRY.unpack_from(data, offset)
+            offset += COUNTER_ENTRY.size
+            reader_id = bytes(data[offset:offset + id_length]).decode()
+            offset += id_length
+            sketch = HyperLogLog.from_bytes(data[offset:offset + sketch_length])
+            offset += sketch_length
+            counter._sketches[(reader_id, bucket)] = sketch
+        return counter
@@ -0,0 +1,581 @@
+import array
+import fcntl
+import os
+import pty
+import queue
+import random
+import select
+import termios
+import threading
+import time
+import tty
+from dataclasses import dataclass, field
+from fastcrc import crc16
+
+from .types import RFIDRegion, AvailableBaudRates, EPCMemoryBank, LockField, LockAction
+
+TCGETS2 = 0x802C542A # Linux ioctl, used by pyserial for non-standard baud rates (14400)
+
+_TERMIOS_SPEEDS = {
+    getattr(termios, f"B{rate.to_int()}"): rate.to_int()
+    for rate in AvailableBaudRates
+    if hasattr(termios, f"B{rate.to_int()}")
+}
+
+@dataclass
+class SimulatedTag:
+    """
+    A tag in the emulated RF field. Memory banks are raw bytes, words are 2 bytes.
+    """
+    epc: bytes
+    tid: bytes = b'\xE2\x80\x11\x05\x20\x00\x00\x00\x00\x00\x00\x00'
+    user: bytes = bytes(64)
+    reserved: bytes = bytes(8) # kill + access password
+    locked_banks: set[EPCMemoryBank] = field(default_factory=set) # read locked
+    lock_actions: dict[LockField, LockAction] = field(default_factory=lambda: {LockField.TID: LockAction.PERMANENT_LOCK})
+    min_power: int = -2 # lowest reader power level (dB) the tag is energized at, higher the further it is
+
+    @property
+    def pc(self) -> int:
+        # EPC length in words lives in the top 5 bits of the PC word
+        return (len(self.epc) // 2) << 11
+
+    @property
+    def pc_epc_crc(self) -> str:
+        """
+        EPC as replied by the reader: PC+EPC+CRC16
+        """
+        raw = self.pc.to_bytes(2, 'big') + self.epc
+        return (raw + crc16.genibus(raw).to_bytes(2, 'big')).hex().upper()
+
+    def memory(self, bank: EPCMemoryBank) -> bytes:
+        if bank == EPCMemoryBank.EPC:
+            # EPC bank: CRC16 + PC + EPC
+            raw = self.pc.to_bytes(2, 'big') + self.epc
+            return crc16.genibus(raw).to_bytes(2, 'big') + raw
+        elif bank == EPCMemoryBank.TID:
+            return self.tid
+        elif bank == EPCMemoryBank.USER:
+            return self.user
+        else:
+            return self.reserved
+
+    @property
+    def kill_password(self) -> int:
+        return int.from_bytes(self.reserved[0:4])
+
+    @property
+    def access_password(self) -> int:
+        return int.from_bytes(self.reserved[4:8])
+
+    def write(self, bank: EPCMemoryBank, address: int, data: bytes):
+        """
+        Write words at address. The EPC bank takes up to a 128 bit EPC, its length following the written PC word.
+        Raises IndexError past the end of the bank
+        """
+        memory = bytearray(self.memory(bank))
+        capacity = 4 + max(len(self.epc), 16) if bank == EPCMemoryBank.EPC else len(memory)
+        if address * 2 + len(data) > capacity:
+            raise IndexError(address)
+        memory.extend(bytes(capacity - len(memory)))
+        memory[address * 2:address * 2 + len(data)] = data
+        if bank == EPCMemoryBank.EPC:
+            # The CRC word is computed by the tag, not written
+            epc_length = (int.from_bytes(memory[2:4]) >> 11) * 2
+            self.epc = bytes(memory[4:4 + epc_length])
+        elif bank == EPCMemoryBank.TID:
+            self.tid = bytes(memory)
+        elif bank == EPCMemoryBank.USER:
+            self.user = bytes(memory)
+        else:
+            self.reserved = bytes(memory)
+
+    @classmethod
+    def random(cls, rng: random.Random, epc_words: int = 6) -> 'SimulatedTag':
+        tid = b'\xE2\x80\x11\x05' + rng.randbytes(8)
+        return cls(epc=rng.randbytes(epc_words * 2), tid=tid, user=rng.randbytes(64))
+
+class FM50xEmulator:
+    """
+    Software FM50x reader speaking the ASCII protocol of docs/FM50x_protocol.md on a pseudo-terminal.
+    Point FonkanUHF at emulator.port to run it without hardware.
+
+    Timing is modelled on the emulated baud rate (10 bits per byte on the wire) and on Gen2 air time:
+    every inventory slot costs empty/collision/reply time, so Q-value choices behave like on a real field.
+    The emulator only answers when the host side of the pty is set to its current baud rate, which
+    makes the baud rate search of FonkanUHF.__enter__ run as it does against a real reader.
+
+    with FM50xEmulator(tags=[SimulatedTag.random(rng) for _ in range(20)]) as emulator:
+        with FonkanUHF(serial_port=emulator.port) as reader:
+            print(list(reader.read_many_tag_id()))
+    """
+
+    def __init__(self,
+              tags: list[SimulatedTag] | None = None,
+              reader_id: str = '01234567',
+              firmware: str = '0102,FM50x emulator',
+              baud_rate: AvailableBaudRates = AvailableBaudRates.BAUD_38400,
+              power: int = 25,
+              region: RFIDRegion = RFIDRegion.EU,
+              default_q: int = 4,
+              empty_slot_time: float = 0.0003,
+              collision_slot_time: float = 0.0008,
+              reply_slot_time: float = 0.0025,
+              write_word_time: float = 0.006,
+              collision_error_rate: float = 0.1,
+              setting_busy_time: float = 0.05,
+              link_latency: float = 0.0,
+              byte_error_rates: dict[AvailableBaudRates, float] | None = None,
+              select_gates_inventory: bool = False,
+              model_timing: bool = True,
+              seed: int | None = None):
+        """
+        tags: tag population currently in the RF field
+        default_q: Q-value used by U when no slot q is given
+        *_slot_time: air time in seconds of an empty, collided or successfully replied inventory slot
+        write_word_time: air time in seconds of writing one word (W)
+        collision_error_rate: probability that a collided slot is reported as an 'E' error frame
+        setting_busy_time: seconds the reader ignores commands after N1/N5/NA settings
+        link_latency: seconds each reply spends in the serial link (e.g. a USB-UART latency timer) before the host
+            sees it. The reader keeps handling queued commands meanwhile, as a real one does.
+        byte_error_rates: per baud rate, probability that a byte is garbled on the link (a long cable or a poor
+            USB adapter fails at the higher rates). A garbled command is answered with X; a garbled reply has a
+            character changed, or is lost if its framing was hit.
+        select_gates_inventory: apply the last T select to inventories (U, Q) too, as Gen2 readers sending a
+            Select before each Query do. By default it only gates access commands (R, W, L, K).
+        model_timing: False answers as fast as possible (no baud rate or air time delays)
+        """
+        self.tags: list[SimulatedTag] = list(tags) if tags is not None else []
+        self.reader_id = reader_id
+        self.firmware = firmware
+        self.baud_rate = baud_rate
+        self.power = power
+        self.region = region
+        self.default_q = default_q
+        self.empty_slot_time = empty_slot_time
+        self.collision_slot_time = collision_slot_time
+        self.reply_slot_time = reply_slot_time
+        self.write_word_time = write_word_time
+        self.collision_error_rate = collision_error_rate
+        self.setting_busy_time = setting_busy_time
+        self.link_latency = link_latency
+        self.byte_error_rates = dict(byte_error_rates or {})
+        self.select_gates_inventory = select_gates_inventory
+        self.model_timing = model_timing
+        self.rng = random.Random(seed)
+        self.commands_received = 0
+        self.garbled_frames = 0
+        self.lock = threading.RLock() # guards tags and settings against the serving thread
+
+        self._master_fd: int | None = None
+        self._slave_fd: int | None = None
+        self._thread: threading.Thread | None = None
+        self._delivery_thread: threading.Thread | None = None
+        self._outbox: queue.Queue[tuple[float, bytes]] = queue.Queue()
+        self._stop = threading.Event()
+        self._clock = 0.0
+        self._busy_until = 0.0
+        self._select: tuple[EPCMemoryBank, int, int, int] | None = None # bank, bit address, bit length, bits (T)
+        self._password: int | None = None # one time access password (P)
+        self.gpio_outputs = 0 # GPIO pin bits (GPIOPin values) configured as outputs (N6/N7)
+        self.gpio_levels = 0 # GPIO pin bits currently high (N8/N9, set_gpio_input)
+        # Not self.lock: the serving thread holds it through whole inventory rounds
+        self._gpio_lock = threading.Lock()
+        self.port: str | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def start(self):
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._master_fd)
+        self.port = os.ttyname(self._slave_fd)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, name="fm50x-emulator", daemon=True)
+        self._thread.start()
+        self._delivery_thread = threading.Thread(target=self._deliver, name="fm50x-emulator-link", daemon=True)
+        self._delivery_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for thread in (self._thread, self._delivery_thread):
+            if thread:
+                thread.join()
+        self._thread = self._delivery_thread = None
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self._master_fd = self._slave_fd = None
+
+    def set_gpio_input(self, pin: int, high: bool):
+        """
+        Drive an input pin from the outside, like a photo-eye would. pin: GPIOPin value (bit)
+        """
+        with self._gpio_lock:
+            self.gpio_levels = self.gpio_levels | pin if high else self.gpio_levels & ~pin
+
+    ####################################################################
+    # Line handling
+    ####################################################################
+
+    def _host_baud_rate(self) -> int | None:
+        # The pty pair shares one termios, so the host side settings are visible on the master
+        speed = termios.tcgetattr(self._master_fd)[5]
+        if speed in _TERMIOS_SPEEDS:
+            return _TERMIOS_SPEEDS[speed]
+        try:
+            buf = array.array('i', [0] * 64)
+            fcntl.ioctl(self._master_fd, TCGETS2, buf)
+            return buf[10]
+        except OSError:
+            return None
+
+    def _serve(self):
+        buffer = b''
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._master_fd], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._master_fd, 4096)
+            except OSError:
+                # Host side closed, wait for it to reopen
+                time.sleep(0.01)
+                continue
+            self._advance(len(data))
+            buffer += data
+            while b'\r' in buffer:
+                line, buffer = buffer.split(b'\r', 1)
+                self._handle_line(line)
+
+    def _advance(self, n_bytes: int = 0, air_time: float = 0.0):
+        """
+        Move the emulated clock by the wire time of n_bytes plus air_time, sleeping until it is reached
+        """
+        if not self.model_timing:
+            return
+        now = time.perf_counter()
+        self._clock = max(self._clock, now) + n_bytes * 10 / self.baud_rate.to_int() + air_time
+        if self._clock > now:
+            time.sleep(self._clock - now)
+
+    def _garbled(self, n_bytes: int) -> bool:
+        """
+        Whether a frame of n_bytes is hit by a link error at the current baud rate
+        """
+        error_rate = self.byte_error_rates.get(self.baud_rate, 0.0)
+        if error_rate <= 0 or self.rng.random() >= 1 - (1 - error_rate) ** n_bytes:
+            return False
+        self.garbled_frames += 1
+        return True
+
+    def _reply(self, frame: str):
+        data = f"\n{frame}\r\n".encode()
+        self._advance(len(data))
+        if self._garbled(len(data)):
+            position = self.rng.randrange(len(data))
+            if data[position] in b'\r\n':
+                # Framing lost: the host never sees this reply
+                return
+            replacement = self.rng.choice([digit for digit in b'0123456789ABCDEF' if digit != data[position]])
+            data = data[:position] + bytes([replacement]) + data[position + 1:]
+        if self.model_timing and self.link_latency > 0:
+            self._outbox.put((time.perf_counter() + self.link_latency, data))
+        else:
+            os.write(self._master_fd, data)
+
+    def _deliver(self):
+        """
+        Write delayed replies (link_latency) in order once their delivery time is reached
+        """
+        while not self._stop.is_set():
+            try:
+                deliver_at, data = self._outbox.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            delay = deliver_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            os.write(self._master_fd, data)
+
+    def _handle_line(self, line: bytes):
+        host_rate = self._host_baud_rate()
+        if host_rate is not None and host_rate != self.baud_rate.to_int():
+            # Wrong baud rate on the host side: the reader only sees noise
+            return
+        if time.perf_counter() < self._busy_until:
+            # Still applying a previous setting
+            return
+        command = line.decode('ascii', errors='replace').strip()
+        if not command:
+            return
+        self.commands_received += 1
+        if self._garbled(len(line) + 2):
+            # The reader does not understand a garbled command
+            self._reply('X')
+            return
+        with self.lock:
+            try:
+                self._handle_command(command)
+            except (ValueError, IndexError):
+                self._reply('X')
+
+    ####################################################################
+    # Commands
+    ####################################################################
+
+    def _handle_command(self, command: str):
+        letter = command[0]
+        if letter == 'V' and len(command) == 1:
+            self._reply(f"V{self.firmware}")
+        elif letter == 'S' and len(command) == 1:
+            self._reply(f"S{self.reader_id}")
+        elif letter == 'N':
+            self._handle_setting(command)
+        elif letter == 'Q':
+            self._handle_single_read(command)
+        elif letter == 'U':
+            self._handle_multi_read(command)
+        elif letter == 'R':
+            bank, address, length = self._parse_memory_arguments(command[1:])
+            tag = self._singulate(self._selected_tags())
+            if tag is None:
+                self._reply('R')
+            else:
+                self._reply(self._read_memory(tag, bank, address, length, 'R'))
+            self._password = None
+        elif letter in 'TPWLK':
+            self._handle_access(command)
+        else:
+            self._reply('X')
+
+    def _handle_setting(self, command: str):
+        setting, value = command[1:].split(',')
+        if setting == '0':
+            self._reply(f"N{self.power & 0xFF:02X}")
+        elif setting == '1':
+            power = int(value, 16)
+            if power > 0x7F:
+                power -= 0x100
+            if not -2 <= power <= 25:
+                raise ValueError(power)
+            self.power = power
+            self._reply(f"N{value}")
+            self._busy_until = time.perf_counter() + self.setting_busy_time
+        elif setting == '4':
+            self._reply(f"N{self.region.value:02X}")
+        elif setting == '5':
+            self.region = RFIDRegion(int(value, 16))
+            self._reply(f"N{value}")
+            self._busy_until = time.perf_counter() + self.setting_busy_time
+        elif setting == 'A':
+            baud_rate = AvailableBaudRates(int(value, 16))
+            # Reply at the old rate, then switch
+            self._reply(f"N{value}")
+            self.baud_rate = baud_rate
+            self._busy_until = time.perf_counter() + self.setting_busy_time
+        elif setting in '6789':
+            self._handle_gpio(setting, value)
+        else:
+            self._reply('X')
+
+    def _handle_gpio(self, setting: str, value: str):
+        with self._gpio_lock:
+            if setting == '6':
+                self._reply(f"N{self.gpio_outputs:02X}")
+            elif setting == '8':
+                self._reply(f"N{self.gpio_levels:02X}")
+            else:
+                # <mask><value>, one digit each
+                mask, bits = int(value[0], 16), int(value[1], 16)
+                if setting == '7':
+                    self.gpio_outputs = (self.gpio_outputs & ~mask) | (bits & mask)
+                else:
+                    # Levels of input pins are not ours to write
+                    mask &= self.gpio_outputs
+                    self.gpio_levels = (self.gpio_levels & ~mask) | (bits & mask)
+                self._reply(f"N{value}")
+
+    def _parse_memory_arguments(self, arguments: str) -> tuple[EPCMemoryBank, int, int]:
+        bank, address, length = arguments.split(',')
+        bank = EPCMemoryBank(int(bank, 16))
+        address = int(address, 16)
+        length = int(length, 16)
+        if not (0 <= address <= 0x3FFF and 1 <= length <= 0x1E):
+            raise ValueError(arguments)
+        return bank, address, length
+
+    def _read_memory(self, tag: SimulatedTag, bank: EPCMemoryBank, address: int, length: int, echo: str) -> str:
+        if bank in tag.locked_banks:
+            return '4'
+        memory = tag.memory(bank)
+        if (address + length) * 2 > len(memory):
+            return '3'
+        return echo + memory[address * 2:(address + length) * 2].hex().upper()
+
+    def _singulate(self, tags: list[SimulatedTag] | None = None) -> SimulatedTag | None:
+        """
+        Single tag access (Q, R, W, L, K): one slot, any of tags (default: all) may win it
+        """
+        tags = self._powered_tags() if tags is None else tags
+        if not tags:
+            self._advance(air_time=self.empty_slot_time)
+            return None
+        self._advance(air_time=self.reply_slot_time)
+        return self.rng.choice(tags)
+
+    def _powered_tags(self) -> list[SimulatedTag]:
+        """
+        Tags close enough to reply at the current power level
+        """
+        return [tag for tag in self.tags if tag.min_power <= self.power]
+
+    ####################################################################
+    # Access commands
+    ####################################################################
+
+    def _selected_tags(self) -> list[SimulatedTag]:
+        """
+        Powered tags matching the last T select. The select gates access commands (R, W, L, K), and inventories
+        only with select_gates_inventory.
+        """
+        if self._select is None:
+            return self._powered_tags()
+        bank, bit_address, bit_length, bits = self._select
+        selected = []
+        for tag in self._powered_tags():
+            memory = tag.memory(bank)
+            end = bit_address + bit_length
+            if end > len(memory) * 8:
+                continue
+            if (int.from_bytes(memory) >> (len(memory) * 8 - end)) & ((1 << bit_length) - 1) == bits:
+                selected.append(tag)
+        return selected
+
+    def _secured(self, tag: SimulatedTag, password: int | None) -> bool:
+        # Tags without an access password go straight to the secured state
+        return tag.access_password == 0 or password == tag.access_password
+
+    @staticmethod
+    def _bank_lock_field(bank: EPCMemoryBank, address: int) -> LockField:
+        if bank == EPCMemoryBank.RESERVED:
+            return LockField.KILL_PASSWORD if address < 2 else LockField.ACCESS_PASSWORD
+        return {EPCMemoryBank.EPC: LockField.EPC, EPCMemoryBank.TID: LockField.TID, EPCMemoryBank.USER: LockField.USER}[bank]
+
+    def _handle_access(self, command: str):
+        letter = command[0]
+        arguments = command[1:].split(',')
+        # P only lasts for the next R/W/L command
+        password, self._password = self._password, None
+        if letter == 'T':
+            bank, bit_address, bit_length, mask = arguments
+            bit_length = int(bit_length, 16)
+            if not 1 <= bit_length <= 0x60 or len(mask) * 4 < bit_length:
+                raise ValueError(command)
+            bits = int(mask, 16) >> (len(mask) * 4 - bit_length)
+            self._select = (EPCMemoryBank(int(bank, 16)), int(bit_address, 16), bit_length, bits)
+            self._reply('T')
+            return
+        if letter == 'P':
+            self._password = int(arguments[0], 16)
+            self._reply('P')
+            return
+
+        tag = self._singulate(self._selected_tags())
+        if tag is None:
+            self._reply(letter)
+        elif letter == 'W':
+            bank, address, length, data = arguments
+            bank = EPCMemoryBank(int(bank, 16))
+            address = int(address, 16)
+            length = int(length, 16)
+            data = bytes.fromhex(data)
+            if not (0 <= address <= 0x3FFF and 1 <= length <= 0x1E and len(data) == length * 2):
+                raise ValueError(command)
+            action = tag.lock_actions.get(self._bank_lock_field(bank, address), LockAction.UNLOCK)
+            if action == LockAction.PERMANENT_LOCK or (action == LockAction.LOCK and not self._secured(tag, password)):
+                self._reply('4Z00')
+                return
+            try:
+                tag.write(bank, address, data)
+            except IndexError:
+                self._reply('3Z00')
+                return
+            self._advance(air_time=length * self.write_word_time)
+            self._reply('W<OK>')
+        elif letter == 'L':
+            mask, action = (int(argument, 16) for argument in arguments)
+            if not self._secured(tag, password):
+                self._reply('4')
+                return
+            requested = {
+                lock_field: LockAction((action >> lock_field.value) & 0b11)
+                for lock_field in LockField if (mask >> lock_field.value) & 0b11
+            }
+            permanent = (LockAction.PERMANENT_LOCK, LockAction.PERMANENT_UNLOCK)
+            for lock_field, lock_action in requested.items():
+                if tag.lock_actions.get(lock_field) in permanent and tag.lock_actions[lock_field] != lock_action:
+                    self._reply('4')
+                    return
+            tag.lock_actions.update(requested)
+            self._reply('L<OK>')
+        else:
+            kill_password, _ = arguments
+            if tag.kill_password == 0 or int(kill_password, 16) != tag.kill_password:
+                self._reply('0')
+                return
+            self.tags.remove(tag)
+            self._reply('K<OK>')
+
+    def _handle_single_read(self, command: str):
+        memory_arguments = None
+        if command != 'Q':
+            if not command.startswith('Q,R'):
+                raise ValueError(command)
+            memory_arguments = self._parse_memory_arguments(command[3:])
+        tag = self._singulate(self._selected_tags() if self.select_gates_inventory else None)
+        if tag is None:
+            self._reply('Q')
+        elif memory_arguments is None:
+            self._reply(f"Q{tag.pc_epc_crc}")
+        else:
+            self._reply(f"Q{tag.pc_epc_crc},{self._read_memory(tag, *memory_arguments, 'R')}")
+
+    def _handle_multi_read(self, command: str):
+        q_argument, _, memory_argument = command[1:].partition(',')
+        q = int(q_argument, 16) if q_argument else self.default_q
+        if not 0 <= q <= 0x10:
+            raise ValueError(command)
+        memory_arguments = None
+        if memory_argument:
+            if memory_argument[0] != 'R':
+                raise ValueError(command)
+            memory_arguments = self._parse_memory_arguments(memory_argument[1:])
+
+        # Framed slotted ALOHA: every tag picks one of 2^Q slots, only single replies are read
+        slots: dict[int, list[SimulatedTag]] = {}
+        for tag in self._selected_tags() if self.select_gates_inventory else self._powered_tags():
+            slots.setdefault(self.rng.randrange(1 << q), []).append(tag)
+        previous_slot = -1
+        for slot in sorted(slots):
+            self._advance(air_time=(slot - previous_slot - 1) * self.empty_slot_time)
+            previous_slot = slot
+            replies = slots[slot]
+            if len(replies) > 1:
+                self._advance(air_time=self.collision_slot_time)
+                if self.rng.random() < self.collision_error_rate:
+                    self._reply('E')
+                continue
+            tag = replies[0]
+            self._advance(air_time=self.reply_slot_time)
+            if memory_arguments is None:
+                self._reply(f"U{tag.pc_epc_crc}")
+            else:
+                self._reply(f"U{tag.pc_epc_crc},{self._read_memory(tag, *memory_arguments, 'R')}")
+        self._advance(air_time=((1 << q) - previous_slot - 1) * self.empty_slot_time)
+        self._reply('U')
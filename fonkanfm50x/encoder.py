@@ -0,0 +1,198 @@
+import time
+from collections import Counter
+from typing import Generator, Iterable, NamedTuple
+
+from .interface import FonkanUHF, CLEAR_SELECT_COMMAND, MAX_READ_WORDS
+from .types import EPCMemoryBank, LockField, LockAction
+from .exceptions import ReaderCommandNotSupportedException, UnexpectedReaderResponseException, TagGenericException, TagMemoryLockedException, TagMemoryOverrunException
+
+class EncodeJob(NamedTuple):
+    target: str # hex EPC or TID of the tag to encode
+    epc: str | None = None # new EPC, hex (PC word updated to its length)
+    user: str | None = None # new USER bank data from word 0, hex
+    password: int | None = None # current access password, sent before every write and the lock
+    new_password: int | None = None # access password to write before locking
+    lock: dict[LockField, LockAction] | None = None # applied once the writes are verified
+    target_bank: EPCMemoryBank = EPCMemoryBank.EPC # bank of target: EPC or TID
+
+class EncodeResult(NamedTuple):
+    job: EncodeJob
+    success: bool
+    error_code: str | None # protocol error code ('0', '3', '4', 'B', 'E', 'F') of the failed command, if the reader sent one
+    error: Exception | None # as raised by raise_exception_from_code, TagNotFoundException if the tag was not found
+    attempts: int
+    duration: float
+
+class BulkEncoder:
+    """
+    Commission a stream of tags: select, authenticate, write EPC/USER in 30 word chunks, verify by read-back, lock.
+
+    All commands of a job up to the verification are written at once and their responses read afterwards:
+    every access command is gated by the job's select, so a tag that fails early only makes the remaining
+    commands fail too. The lock is only sent once the read-back matched, in a second round-trip.
+    Jobs are not overlapped, so a failed job never touches the next tag. The last round-trip of a job ends with
+    a select of every tag, so the job's select does not filter later inventories on firmware applying T to them.
+
+    Writes go USER, EPC, then the access password, each after the password valid at that point. Once the EPC
+    is written the select follows the tag to its new EPC, and a retry starts from the writes that went through.
+
+    encoder = BulkEncoder(reader)
+    for result in encoder.encode(jobs):
+        if not result.success:
+            print(f"{result.job.target}: {result.error_code} {result.error}")
+    print(f"{encoder.tags_per_minute:.0f} tags/min")
+    """
+
+    def __init__(self,
+              reader: FonkanUHF,
+              verify: bool = True,
+              retries: int = 1,
+              pipeline: bool = True):
+        """
+        verify: read back every written chunk and compare
+        retries: extra attempts of a failed job, except for locked/overrun memory
+        pipeline: False sends one command per round-trip (for comparison)
+        """
+        self.reader = reader
+        self.verify = verify
+        self.retries = retries
+        self.pipeline = pipeline
+        self.encoded = 0
+        self.failed = 0
+        self.failure_codes: Counter[str] = Counter() # error code (or exception name without one) -> jobs
+        self.elapsed = 0.0
+
+    @property
+    def tags_per_minute(self) -> float:
+        return self.encoded / self.elapsed * 60 if self.elapsed > 0 else 0.0
+
+    def reset_stats(self):
+        self.encoded = 0
+        self.failed = 0
+        self.failure_codes.clear()
+        self.elapsed = 0.0
+
+    @staticmethod
+    def _chunks(address: int, data: str) -> Generator[tuple[int, str], None, None]:
+        step = MAX_READ_WORDS * 4
+        for offset in range(0, len(data), step):
+            yield address + offset // 4, data[offset:offset + step]
+
+    def _plan(self, job: EncodeJob) -> tuple[list[str], dict[int, str], list[str], dict[int, EncodeJob]]:
+        """
+        Commands up to the verification, expected data of the R commands by index, the lock commands,
+        and by index of a write, how to reach the tag for a retry once that write went through
+        """
+        def authenticated(password: int | None) -> list[str]:
+            return [] if password is None else [f"P{password:08X}"]
+
+        commands = [FonkanUHF._build_tag_select_command(job.target, job.target_bank)]
+        reached: dict[int, EncodeJob] = {}
+        writes: list[tuple[EPCMemoryBank, int, str]] = []
+
+        def write(bank: EPCMemoryBank, address: int, data: str):
+            commands.extend(authenticated(job.password) + [FonkanUHF._build_write_command(bank, address, data)])
+            writes.append((bank, address, data))
+
+        if job.user:
+            for address, chunk in self._chunks(0, job.user.upper()):
+                write(EPCMemoryBank.USER, address, chunk)
+        if job.epc:
+            # PC word (word 1) holds the EPC length in its top 5 bits
+            epc = job.epc.upper()
+            write(EPCMemoryBank.EPC, 1, f"{(len(epc) // 4) << 11:04X}{epc}")
+            if job.target_bank == EPCMemoryBank.EPC:
+                # The select no longer matches: follow the tag to its new EPC
+                job = job._replace(target=epc)
+                reached[len(commands) - 1] = job
+                commands.append(FonkanUHF._build_tag_select_command(epc, EPCMemoryBank.EPC))
+        if job.new_password is not None:
+            # Access password: reserved words 2-3. Last, as the writes before still need the current one
+            write(EPCMemoryBank.RESERVED, 2, f"{job.new_password:08X}")
+            job = job._replace(password=job.new_password)
+            reached[len(commands) - 1] = job
+
+        expected: dict[int, str] = {}
+        if self.verify:
+            for bank, address, data in writes:
+                if bank == EPCMemoryBank.RESERVED:
+                    # Reading the access password back takes the (new) access password
+                    commands.extend(authenticated(job.password))
+                expected[len(commands)] = data
+                commands.append(f"R{bank.value},{address:X},{len(data) // 4:X}")
+
+        lock: list[str] = []
+        if job.lock:
+            lock = authenticated(job.password) + [FonkanUHF._build_lock_command(job.lock)]
+        return commands, expected, lock, reached
+
+    def _send(self, commands: list[str]) -> list[str | None]:
+        if self.pipeline:
+            return self.reader.send_commands_pipelined(commands)
+        return [self.reader.send_commands_pipelined([command])[0] for command in commands]
+
+    @staticmethod
+    def _check(command: str, res: str | None, expected: str | None):
+        FonkanUHF._parse_access_response(command, res)
+        if expected is not None and res[1:] != expected:
+            raise TagGenericException(f"Verification of {command} failed: read {res[1:]}, expected {expected}")
+
+    def _run(self, commands: list[str], expected: dict[int, str], clear: bool = False) -> tuple[Exception | None, str | None, int, bool]:
+        """
+        Send commands, followed by CLEAR_SELECT_COMMAND if clear, and check their responses.
+        Returns the first error, its reader error code if any, the index of the failed command (len(commands) if none)
+        and whether the select was cleared
+        """
+        responses = self._send(commands + [CLEAR_SELECT_COMMAND] if clear else commands)
+        cleared = False
+        if clear:
+            try:
+                FonkanUHF._parse_access_response(CLEAR_SELECT_COMMAND, responses[-1])
+                cleared = True
+            except (TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException) as e:
+                print(f"Clearing the select failed: {e}") if self.reader.debug else None
+        for i, (command, res) in enumerate(zip(commands, responses)):
+            try:
+                self._check(command, res, expected.get(i))
+            except (TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException) as e:
+                error_code = res[0] if res and res != 'X' and res[0] != command[0] else None
+                return e, error_code, i, cleared
+        return None, None, len(commands), cleared
+
+    def encode_one(self, job: EncodeJob) -> EncodeResult:
+        started = time.perf_counter()
+        attempt_job = job
+        attempts = 0
+        error: Exception | None = None
+        error_code: str | None = None
+        cleared = False
+        while attempts <= self.retries:
+            attempts += 1
+            commands, expected, lock, reached = self._plan(attempt_job)
+            # The clear goes with the last round-trip of the attempt (a retry selects the tag again)
+            error, error_code, failed_at, cleared = self._run(commands, expected, clear=not lock)
+            if error is None and lock:
+                error, error_code, _, cleared = self._run(lock, {}, clear=True)
+            if error is None:
+                break
+            print(f"Encoding {job.target} failed: {error}") if self.reader.debug else None
+            if isinstance(error, (TagMemoryLockedException, TagMemoryOverrunException, ReaderCommandNotSupportedException)):
+                break
+            # Writes that went through changed the EPC the select matches or the access password
+            attempt_job = next((reached[i] for i in sorted(reached, reverse=True) if i < failed_at), attempt_job)
+        if not cleared:
+            # Failed before the lock round-trip, or the clear was not acknowledged
+            self.reader.clear_select()
+        duration = time.perf_counter() - started
+
+        self.elapsed += duration
+        if error is None:
+            self.encoded += 1
+        else:
+            self.failed += 1
+            self.failure_codes[error_code or type(error).__name__] += 1
+        return EncodeResult(job, error is None, error_code, error, attempts, duration)
+
+    def encode(self, jobs: Iterable[EncodeJob]) -> Generator[EncodeResult, None, None]:
+        for job in jobs:
+            yield self.encode_one(job)
@@ -0,0 +1,286 @@
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class EPCScheme(Enum):
+    # Value: EPC header byte
+    SGTIN_96 = 0x30
+    SSCC_96 = 0x31
+    GRAI_96 = 0x33
+    GIAI_96 = 0x34
+
+    @property
+    def uri_name(self) -> str:
+        return self.name.split('_')[0].lower()
+
+# Per scheme and partition value: (company prefix bits, company prefix digits, reference bits, reference digits),
+# GS1 EPC Tag Data Standard partition tables
+PARTITION_TABLES: dict[EPCScheme, tuple[tuple[int, int, int, int], ...]] = {
+    EPCScheme.SGTIN_96: ((40, 12, 4, 1), (37, 11, 7, 2), (34, 10, 10, 3), (30, 9, 14, 4), (27, 8, 17, 5), (24, 7, 20, 6), (20, 6, 24, 7)),
+    EPCScheme.SSCC_96: ((40, 12, 18, 5), (37, 11, 21, 6), (34, 10, 24, 7), (30, 9, 28, 8), (27, 8, 31, 9), (24, 7, 34, 10), (20, 6, 38, 11)),
+    EPCScheme.GRAI_96: ((40, 12, 4, 0), (37, 11, 7, 1), (34, 10, 10, 2), (30, 9, 14, 3), (27, 8, 17, 4), (24, 7, 20, 5), (20, 6, 24, 6)),
+    EPCScheme.GIAI_96: ((40, 12, 42, 13), (37, 11, 45, 14), (34, 10, 48, 15), (30, 9, 52, 16), (27, 8, 55, 17), (24, 7, 58, 18), (20, 6, 62, 19)),
+}
+# Lowest bit of the reference field: serial (38 bits) below it, 24 reserved bits (SSCC), or nothing (GIAI)
+REFERENCE_LOW_BIT = {EPCScheme.SGTIN_96: 38, EPCScheme.SSCC_96: 24, EPCScheme.GRAI_96: 38, EPCScheme.GIAI_96: 0}
+SERIAL_BITS = 38
+SCHEMES_BY_HEADER = {scheme.value: scheme for scheme in EPCScheme}
+
+def gs1_check_digit(digits: str) -> str:
+    """
+    GS1 mod 10 check digit: weights 3 and 1 alternating from the rightmost digit
+    """
+    total = sum(int(digit) * (3 if i % 2 == 0 else 1) for i, digit in enumerate(reversed(digits)))
+    return str(-total % 10)
+
+class DecodedEPC(NamedTuple):
+    scheme: EPCScheme
+    filter: int
+    partition: int
+    company_prefix: str
+    reference: str # item reference with indicator (SGTIN), serial reference with extension (SSCC), asset type (GRAI), individual asset reference (GIAI)
+    serial: int | None # SGTIN and GRAI only
+
+    @property
+    def uri(self) -> str:
+        """
+        Pure identity URI, e.g. urn:epc:id:sgtin:0614141.812345.6789
+        """
+        fields = [self.company_prefix, self.reference] + ([str(self.serial)] if self.serial is not None else [])
+        return f"urn:epc:id:{self.scheme.uri_name}:{'.'.join(fields)}"
+
+    @property
+    def tag_uri(self) -> str:
+        """
+        EPC tag URI with the filter value, e.g. urn:epc:tag:sgtin-96:3.0614141.812345.6789
+        """
+        fields = [str(self.filter), self.company_prefix, self.reference] + ([str(self.serial)] if self.serial is not None else [])
+        return f"urn:epc:tag:{self.scheme.uri_name}-96:{'.'.join(fields)}"
+
+    @property
+    def gtin(self) -> str | None:
+        """
+        GTIN-14 of an SGTIN: indicator digit, company prefix, item reference, check digit
+        """
+        if self.scheme != EPCScheme.SGTIN_96:
+            return None
+        digits = self.reference[0] + self.company_prefix + self.reference[1:]
+        return digits + gs1_check_digit(digits)
+
+    @property
+    def sscc(self) -> str | None:
+        """
+        SSCC-18: extension digit, company prefix, serial reference, check digit
+        """
+        if self.scheme != EPCScheme.SSCC_96:
+            return None
+        digits = self.reference[0] + self.company_prefix + self.reference[1:]
+        return digits + gs1_check_digit(digits)
+
+def _format(scheme: EPCScheme, filter_value: int, partition: int, company: int, reference: int, serial: int) -> DecodedEPC:
+    """
+    DecodedEPC of the extracted fields. Raises ValueError if a field has more digits than the partition allows.
+    """
+    _, company_digits, _, reference_digits = PARTITION_TABLES[scheme][partition]
+    if company >= 10 ** company_digits or reference >= 10 ** reference_digits:
+        raise ValueError(f"{scheme.name} fields {company}.{reference} exceed partition {partition}")
+    if scheme == EPCScheme.GIAI_96:
+        # Individual asset reference: a number, not zero padded
+        reference_string = str(reference)
+    else:
+        reference_string = f"{reference:0{reference_digits}d}" if reference_digits else ''
+    return DecodedEPC(
+        scheme, filter_value, partition, f"{company:0{company_digits}d}", reference_string,
+        serial if scheme in (EPCScheme.SGTIN_96, EPCScheme.GRAI_96) else None,
+    )
+
+def decode_epc(epc: str | bytes) -> DecodedEPC | None:
+    """
+    Decode a 96 bit EPC (hex str as returned by read_many_tag_id, or 12 bytes as in TagRead.epc).
+    None if it is not one of the supported schemes; ValueError if it claims one but is malformed.
+    """
+    if isinstance(epc, str):
+        if len(epc) != 24:
+            return None
+        value = int(epc, 16)
+    else:
+        if len(epc) != 12:
+            return None
+        value = int.from_bytes(epc, 'big')
+    scheme = SCHEMES_BY_HEADER.get(value >> 88)
+    if scheme is None:
+        return None
+    partition = (value >> 82) & 7
+    if partition == 7:
+        raise ValueError(f"Invalid {scheme.name} partition 7")
+    _, _, reference_bits, _ = PARTITION_TABLES[scheme][partition]
+    low = REFERENCE_LOW_BIT[scheme]
+    return _format(
+        scheme,
+        (value >> 85) & 7,
+        partition,
+        ((value >> (low + reference_bits)) & ((1 << (82 - low - reference_bits)) - 1)),
+        (value >> low) & ((1 << reference_bits) - 1),
+        value & ((1 << SERIAL_BITS) - 1),
+    )
+
+####################################################################
+# Batch decoding
+####################################################################
+
+class EPCColumns(NamedTuple):
+    """
+    Fields of a batch of EPCs as NumPy arrays (one element per EPC), for analytics without per-EPC objects
+    """
+    valid: 'np.ndarray' # bool: supported scheme, valid partition and fields within their digits
+    header: 'np.ndarray'
+    filter: 'np.ndarray'
+    partition: 'np.ndarray'
+    company_prefix: 'np.ndarray' # uint64, 0 where not valid
+    company_digits: 'np.ndarray'
+    reference: 'np.ndarray' # uint64
+    reference_digits: 'np.ndarray'
+    serial: 'np.ndarray' # uint64, 0 for SSCC and GIAI
+
+def _column_tables():
+    """
+    Lookup arrays indexed by header * 8 + partition: reference low bit, reference bits, company digits,
+    reference digits, and whether the entry is a valid scheme/partition
+    """
+    size = 256 * 8
+    low = np.zeros(size, np.uint64)
+    reference_bits = np.zeros(size, np.uint64)
+    company_digits = np.zeros(size, np.uint8)
+    reference_digits = np.zeros(size, np.uint8)
+    valid = np.zeros(size, bool)
+    for scheme, table in PARTITION_TABLES.items():
+        for partition, (_, c_digits, r_bits, r_digits) in enumerate(table):
+            i = scheme.value * 8 + partition
+            low[i] = REFERENCE_LOW_BIT[scheme]
+            reference_bits[i] = r_bits
+            company_digits[i] = c_digits
+            reference_digits[i] = r_digits
+            valid[i] = True
+    return low, reference_bits, company_digits, reference_digits, valid
+
+def _epc_bytes(epc: str) -> bytes:
+    try:
+        raw = bytes.fromhex(epc)
+    except ValueError:
+        return bytes(12)
+    return raw if len(raw) == 12 and len(epc) == 24 else bytes(12)
+
+_COLUMN_TABLES = None
+# Powers of ten up to 10^19, the most digits a field can have
+_POWERS_OF_TEN = None
+# 96 bit EPC as a big-endian 32 bit high word and 64 bit low word
+_EPC_DTYPE = None
+
+def decode_array(epcs: Sequence[str | bytes]) -> EPCColumns:
+    """
+    Decode a batch of 96 bit EPCs with NumPy bitwise operations on whole arrays. EPCs of other lengths
+    and str EPCs that are not hex are not valid. Requires numpy.
+    """
+    if np is None:
+        raise RuntimeError("decode_array requires numpy")
+    global _COLUMN_TABLES, _POWERS_OF_TEN, _EPC_DTYPE
+    if _COLUMN_TABLES is None:
+        _COLUMN_TABLES = _column_tables()
+        _POWERS_OF_TEN = np.array([10 ** digits for digits in range(20)], np.uint64)
+        _EPC_DTYPE = np.dtype([('high', '>u4'), ('low', '>u8')])
+    low_bits, reference_bits, company_digits, reference_digits, valid_entry = _COLUMN_TABLES
+
+    if epcs and isinstance(epcs[0], str):
+        try:
+            if all(len(epc) == 24 for epc in epcs):
+                raw = bytes.fromhex(''.join(epcs))
+            else:
+                raw = bytes.fromhex(''.join(epc if len(epc) == 24 else '0' * 24 for epc in epcs))
+        except ValueError:
+            raw = b''
+        if len(raw) != 12 * len(epcs):
+            # Not all hex digits (bytes.fromhex also skips whitespace): convert one by one, zeros are not valid
+            raw = b''.join(_epc_bytes(epc) for epc in epcs)
+    else:
+        raw = b''.join(epc if len(epc) == 12 else bytes(12) for epc in epcs)
+    words = np.frombuffer(raw, _EPC_DTYPE)
+    high = words['high'].astype(np.uint64)
+    low = words['low'].astype(np.uint64)
+
+    header = high >> np.uint64(24)
+    filter_value = (high >> np.uint64(21)) & np.uint64(7)
+    partition = (high >> np.uint64(18)) & np.uint64(7)
+    entry = (header * np.uint64(8) + partition).astype(np.intp)
+    shift = low_bits[entry] + reference_bits[entry] # lowest bit of the company prefix, always below 64
+    # Company prefix: the 18 bits of the high word below the partition, then the low word above shift
+    company = ((high & np.uint64(0x3FFFF)) << (np.uint64(64) - shift)) | (low >> shift)
+    company &= (np.uint64(1) << (np.uint64(82) - shift)) - np.uint64(1)
+    reference = (low >> low_bits[entry]) & ((np.uint64(1) << reference_bits[entry]) - np.uint64(1))
+    serial = np.where(low_bits[entry] == 38, low & np.uint64((1 << SERIAL_BITS) - 1), np.uint64(0))
+    c_digits = company_digits[entry]
+    r_digits = reference_digits[entry]
+    valid = valid_entry[entry] & (company < _POWERS_OF_TEN[c_digits]) & (reference < _POWERS_OF_TEN[r_digits])
+    zero = np.uint64(0)
+    company = np.where(valid, company, zero)
+    reference = np.where(valid, reference, zero)
+    serial = np.where(valid, serial, zero)
+    return EPCColumns(valid, header, filter_value, partition, company, c_digits, reference, r_digits, serial)
+
+def _decode_columns(epcs: Sequence[str | bytes]) -> list[DecodedEPC | None]:
+    columns = decode_array(epcs)
+    # decode_array validated the fields: only formatting is left, with the formats of each scheme and partition
+    formats = {
+        (scheme.value, partition): (scheme, f"0{company_digits}d", '' if scheme == EPCScheme.GIAI_96 else f"0{reference_digits}d", REFERENCE_LOW_BIT[scheme] == 38)
+        for scheme, table in PARTITION_TABLES.items()
+        for partition, (_, company_digits, _, reference_digits) in enumerate(table)
+    }
+    results: list[DecodedEPC | None] = []
+    append = results.append
+    for valid, header, filter_value, partition, company, reference, serial in zip(
+            columns.valid.tolist(), columns.header.tolist(), columns.filter.tolist(), columns.partition.tolist(),
+            columns.company_prefix.tolist(), columns.reference.tolist(), columns.serial.tolist()):
+        if not valid:
+            append(None)
+            continue
+        scheme, company_format, reference_format, has_serial = formats[header, partition]
+        append(DecodedEPC(
+            scheme, filter_value, partition, format(company, company_format),
+            format(reference, reference_format) if reference_format != '00d' else '',
+            serial if has_serial else None,
+        ))
+    return results
+
+def _decode_python(epcs: Sequence[str | bytes]) -> list[DecodedEPC | None]:
+    results: list[DecodedEPC | None] = []
+    for epc in epcs:
+        try:
+            results.append(decode_epc(epc))
+        except ValueError:
+            results.append(None)
+    return results
+
+def _decode_chunk(epcs: Sequence[str | bytes]) -> list[DecodedEPC | None]:
+    # Numpy only pays off past a few dozen EPCs
+    return _decode_columns(epcs) if np is not None and len(epcs) >= 64 else _decode_python(epcs)
+
+def decode_many(epcs: Sequence[str | bytes], processes: int | None = None, chunk_size: int = 100_000) -> list[DecodedEPC | None]:
+    """
+    Decode a batch of EPCs, in order. Unsupported or malformed EPCs decode to None.
+    Uses decode_array when numpy is installed, plain Python otherwise.
+    processes: decode chunk_size EPCs per worker process in a process pool (for very large backlogs,
+    e.g. replaying a TagJournal). Pays off above a few hundred thousand EPCs.
+    """
+    epcs = list(epcs)
+    if processes is None or len(epcs) <= chunk_size:
+        return _decode_chunk(epcs)
+    chunks = [epcs[start:start + chunk_size] for start in range(0, len(epcs), chunk_size)]
+    results: list[DecodedEPC | None] = []
+    with ProcessPoolExecutor(processes) as pool:
+        for decoded in pool.map(_decode_chunk, chunks):
+            results.extend(decoded)
+    return results
@@ -1,6 +1,23 @@
+import functools
+import hashlib
+import os
+import struct
+from array import array
 from dataclasses import dataclass
+from typing import Iterable
 
-@dataclass
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+# Source: https://www.gs1.org/docs/epc/mdid_list.json
+MDID_JSON_PATH = os.path.join(DATA_DIRECTORY, 'mdid_list.json')
+# Precompiled from the JSON by build_mdid_table() (python -m fonkanfm50x.epcglobal)
+MDID_TABLE_PATH = os.path.join(DATA_DIRECTORY, 'mdid_table.bin')
+
+MDID_TABLE_MAGIC = b'FM50XMDT'
+MDID_TABLE_VERSION = 1
+# magic, version, designers, chips, names, SHA-256 of the source JSON
+MDID_TABLE_HEADER = struct.Struct('<8sHHHH32s')
+
+@dataclass(frozen=True, slots=True)
 class CardDetails:
     epc_tag_id: str
     comm_standard: str
@@ -12,82 +29,189 @@ class CardDetails:
     designer: str
     model_name: str
     standard_header: str
-    xtid_header: str
+    xtid_header: str | None
 
     def __str__(self):
         return f"CardDetails<{self.designer} | {self.model_name} | {self.comm_standard}>(S: {self.security_bit_set}, F:{self.file_indicator_bit}, X: {self.xtid_supported}, standard_header={self.standard_header}, xtid_header={self.xtid_header})"
 
+# mdid -> manufacturer, (mdid, tmn) -> model name
+MDIDIndex = tuple[dict[int, str], dict[tuple[int, int], str]]
+
+@functools.cache
+def _load_mdid_json(json_path: str) -> dict:
+    # json is only imported when the precompiled table cannot be used
+    import json
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _index_mdid_data(mdid_data: dict) -> MDIDIndex:
+    """
+    Flat integer indexes of the GS1 list. Later chip entries win on duplicate (mdid, tmn) keys,
+    as the previous linear search did.
+    """
+    designer_names: dict[int, str] = {}
+    chip_names: dict[tuple[int, int], str] = {}
+    for designer in mdid_data['registeredMaskDesigners']:
+        mdid_value = int(designer['mdid'], 2)
+        designer_names[mdid_value] = designer['manufacturer'].strip()
+        for chip in designer.get('chips', ()):
+            chip_names[(mdid_value, int(chip['tmnBinary'], 2))] = chip['modelName']
+    return designer_names, chip_names
+
+def _encode_mdid_table(index: MDIDIndex, source_digest: bytes) -> bytes:
+    """
+    Header, the names (UTF-8, NUL separated), then (mdid, name) and (mdid, tmn, name) as unsigned 16 bit arrays
+    """
+    designer_names, chip_names = index
+    names = list(dict.fromkeys([*designer_names.values(), *chip_names.values()]))
+    name_numbers = {name: number for number, name in enumerate(names)}
+    designers = array('H')
+    for mdid, name in designer_names.items():
+        designers.extend((mdid, name_numbers[name]))
+    chips = array('H')
+    for (mdid, tmn), name in chip_names.items():
+        chips.extend((mdid, tmn, name_numbers[name]))
+    encoded_names = '\0'.join(names).encode()
+    header = MDID_TABLE_HEADER.pack(MDID_TABLE_MAGIC, MDID_TABLE_VERSION, len(designer_names), len(chip_names), len(encoded_names) // 2 + 1, source_digest)
+    # Names padded to whole 16 bit words, so the arrays stay aligned
+    return header + encoded_names.ljust((len(encoded_names) // 2 + 1) * 2, b'\0') + designers.tobytes() + chips.tobytes()
+
+def _decode_mdid_table(data: bytes) -> tuple[MDIDIndex, bytes]:
+    """
+    Index and source JSON digest of a table written by _encode_mdid_table. Raises ValueError if it is not one.
+    """
+    if len(data) < MDID_TABLE_HEADER.size:
+        raise ValueError("Not an MDID table")
+    magic, version, designer_count, chip_count, name_words, source_digest = MDID_TABLE_HEADER.unpack_from(data)
+    if magic != MDID_TABLE_MAGIC or version != MDID_TABLE_VERSION:
+        raise ValueError(f"Not a version {MDID_TABLE_VERSION} MDID table")
+    offset = MDID_TABLE_HEADER.size
+    names_end = offset + name_words * 2
+    if len(data) != names_end + (designer_count * 2 + chip_count * 3) * 2:
+        raise ValueError("Truncated MDID table")
+    names = data[offset:names_end].rstrip(b'\0').decode().split('\0')
+    words = array('H')
+    words.frombytes(data[names_end:])
+    designers = words[:designer_count * 2]
+    chips = words[designer_count * 2:]
+    designer_names = {mdid: names[name] for mdid, name in zip(designers[0::2], designers[1::2])}
+    chip_names = {(mdid, tmn): names[name] for mdid, tmn, name in zip(chips[0::3], chips[1::3], chips[2::3])}
+    return (designer_names, chip_names), source_digest
+
+def build_mdid_table(json_path: str = MDID_JSON_PATH, table_path: str = MDID_TABLE_PATH) -> MDIDIndex:
+    """
+    Precompile the MDID JSON into the binary table, after checking that the table decodes to the same index.
+    Run after updating the JSON: python -m fonkanfm50x.epcglobal
+    """
+    import json
+    with open(json_path, 'rb') as f:
+        source = f.read()
+    index = _index_mdid_data(json.loads(source))
+    encoded = _encode_mdid_table(index, hashlib.sha256(source).digest())
+    if _decode_mdid_table(encoded)[0] != index:
+        raise ValueError(f"MDID table of {json_path} does not decode to the JSON's contents")
+    with open(table_path, 'wb') as f:
+        f.write(encoded)
+    return index
+
+@functools.cache
+def load_mdid_index(json_path: str = MDID_JSON_PATH, table_path: str | None = MDID_TABLE_PATH) -> MDIDIndex:
+    """
+    MDID index from the precompiled table when it was built from this exact JSON (same SHA-256),
+    otherwise from the JSON. Loaded once per process.
+    """
+    with open(json_path, 'rb') as f:
+        source_digest = hashlib.sha256(f.read()).digest()
+    if table_path is not None:
+        try:
+            with open(table_path, 'rb') as f:
+                index, table_digest = _decode_mdid_table(f.read())
+            if table_digest == source_digest:
+                return index
+        except (OSError, ValueError):
+            # Missing, outdated or damaged: the JSON is the reference
+            pass
+    return _index_mdid_data(_load_mdid_json(json_path))
+
 class TagModelParser:
     # Source: https://www.gs1.org/docs/epc/mdid_list.json
 
-    def __init__(self):
-        import json
-        import os
-        
-        # Get the directory where this module is located
-        module_dir = os.path.dirname(os.path.abspath(__file__))
-        mdid_absolute_source = os.path.join(module_dir, 'data', 'mdid_list.json')
-        with open(mdid_absolute_source, 'r', encoding='utf-8') as f:
-            self.mdid_data = json.load(f)
-            self.designers_by_mdid = {
-                designer['mdid']: designer
-                for designer in self.mdid_data['registeredMaskDesigners']
-            }
-            
+    def __init__(self, cache_size: int = 4096, json_path: str = MDID_JSON_PATH, table_path: str | None = MDID_TABLE_PATH):
+        """
+        cache_size: number of distinct TIDs whose decoded CardDetails are memoized
+        json_path: GS1 MDID list
+        table_path: table precompiled from it, None to always index the JSON
+        """
+        self.json_path = json_path
+        # Shared, read-only indexes: mdid -> manufacturer and (mdid, tmn) -> model name
+        self._designer_names, self._chip_names = load_mdid_index(json_path, table_path)
+        self._interpret_cached = functools.lru_cache(maxsize=cache_size)(self._interpret)
+
+    @property
+    def mdid_data(self) -> dict:
+        """
+        The GS1 MDID list as loaded from the JSON, parsed on first access
+        """
+        return _load_mdid_json(self.json_path)
+
+    @property
+    def designers_by_mdid(self) -> dict[str, dict]:
+        return {designer['mdid']: designer for designer in self.mdid_data['registeredMaskDesigners']}
+
     def interpret_TID_data(self, tid_string:str) -> CardDetails:
         """
         Interpret the lower 48 bits of the TID data
 
         lower_48: segmented array with each segment (MSB in element 0) determined by the standard 48 bit TID Header
         """
+        return self._interpret_cached(tid_string)
+
+    def interpret_many(self, tid_strings: Iterable[str]) -> list[CardDetails]:
+        """
+        Interpret a batch of TIDs, i.e. from read_multi_tag_memory_multiband. Repeated TIDs are decoded once.
+        """
+        interpret = self._interpret_cached
+        return [interpret(tid_string) for tid_string in tid_strings]
+
+    def _interpret(self, tid_string: str) -> CardDetails:
         # Determine Standard
         #        '11100010': 'True', '11101101': 'Nonexistent'
 
-        # extract memory segments based on GS1s TDS 2.0 document
-
-        tid_bits = bin(int(tid_string, 16))[2:].zfill(len(tid_string)*4)
+        # extract memory segments based on GS1s TDS 2.0 document, as integer fields of the 48 bit header
+        tid = int(tid_string, 16)
+        extra_bits = len(tid_string) * 4 - 48
+        if extra_bits >= 0:
+            header = tid >> extra_bits
+        else:
+            # Short TID, zero padded
+            header = tid << -extra_bits
+        top = header >> 16
 
         # ISO / IEC 15963 Class Identifier 00h-07h
-        class_identifier = tid_bits[0:8]
-        standard = True if class_identifier == '11100010' else False
-
-        xtid_bit = True if tid_bits[8] == '1' else False
-        security_bit = True if tid_bits[9] == '1' else False
-        file_indicator_bit = True if tid_bits[10] == '1' else False
-        mdid = tid_bits[11:20] # Mask Designer Identifier
-        tmn = tid_bits[20:32] # Tag Model Number
-        tmn_hex = hex(int(tmn, 2))[2:].upper().zfill(3)
-
-        # Get mask designer ID from json file
-        model_name = ""
-        try:
-            designer = self.designers_by_mdid[mdid]
-        except KeyError:
-            designer = {"designerName": "Unknown", "chips": []}
+        standard = (top >> 24) == 0b11100010
+
+        xtid_bit = (top >> 23) & 1 == 1
+        security_bit = (top >> 22) & 1 == 1
+        file_indicator_bit = (top >> 21) & 1 == 1
+        mdid = (top >> 12) & 0x1FF # Mask Designer Identifier
+        tmn = top & 0xFFF # Tag Model Number
+
+        # Get mask designer and tag model from the index
+        designer_name = self._designer_names.get(mdid)
+        if designer_name is None:
+            designer_name = "Unknown"
             model_name = ""
         else:
-            tag_model = None
-            if 'chips' not in designer:
-                designer['chips'] = []
-
-            # Search for tag model in designer chips
-            for _, chip in enumerate(designer['chips']):
-                if chip['tmnBinary'] == tmn:
-                    tag_model = chip
-            model_name = ""
-            if tag_model is None:
-                model_name = "Unknown: 0x{}".format(tmn_hex)
-            else:
-                model_name = tag_model['modelName']
+            model_name = self._chip_names.get((mdid, tmn))
+            if model_name is None:
+                model_name = f"Unknown: 0x{tmn:03X}"
 
         # do nothing for now
         # EPC Tag Data Standard Header 20h-2Fh
-        epc_TD_standard_header = int(tid_bits[32:48], 2)
-        standard_header_hex = hex(epc_TD_standard_header)[2:].upper().zfill(2)
+        standard_header_hex = f"{header & 0xFFFF:02X}"
 
-        if xtid_bit:
-            xtid_header = int(tid_bits[48:], 2)
-            xtid_header_hex = hex(xtid_header)[2:].upper().zfill(2)
+        if xtid_bit and extra_bits > 0:
+            xtid_header_hex = f"{tid & ((1 << extra_bits) - 1):02X}"
         else:
             xtid_header_hex = None
 
@@ -103,8 +227,19 @@ class TagModelParser:
             xtid_supported=xtid_bit,
             security_bit_set=security_bit,
             file_indicator_bit=file_indicator_bit,
-            designer=designer['manufacturer'].strip(),
+            designer=designer_name,
             model_name=model_name,
             standard_header=standard_header_hex,
             xtid_header=xtid_header_hex
         )
+
+@functools.cache
+def shared_parser() -> TagModelParser:
+    """
+    Process-wide TagModelParser, so every caller shares its indexes and decoded TID cache
+    """
+    return TagModelParser()
+
+if __name__ == '__main__':
+    index = build_mdid_table()
+    print(f"Wrote {MDID_TABLE_PATH}: {len(index[0])} mask designers, {len(index[1])} chips")
@@ -4,10 +4,22 @@ class UnexpectedReaderResponseException(Exception):
 class ReaderCommandNotSupportedException(Exception):
     pass
 
+class ReplayDivergedException(Exception):
+    """
+    The code replayed against a capture wrote something else than what was recorded
+    """
+    pass
+
 #################################################
 # Tag Read/Write Exceptions
 #################################################
 class TagGenericException(Exception):
+    code: str | None = None # reader error code, when raised by raise_exception_from_code
+
+class TagNotFoundException(TagGenericException):
+    """
+    No (selected) tag in the RF field answered an access command
+    """
     pass
 
 class TagMemoryOverrunException(TagGenericException):
@@ -16,19 +28,33 @@ class TagMemoryLockedException(TagGenericException):
     pass
 class TagInsufficientPowerException(TagGenericException):
     pass
+class TagMemoryPartialReadException(TagGenericException):
+    """
+    Some word ranges of a multi-chunk memory read failed.
+    data holds the whole requested range, with the words of the failed ranges left zero.
+    failed_ranges: (word address, word length) of each failed chunk, errors: the last error of each, same order
+    """
+    def __init__(self, message: str, epc: str | None, data: bytes, failed_ranges: list[tuple[int, int]], errors: list[Exception]):
+        super().__init__(message)
+        self.epc = epc
+        self.data = data
+        self.failed_ranges = failed_ranges
+        self.errors = errors
 
 def raise_exception_from_code(error_code: str, message: str = ""):
     if error_code == '3':
-        raise TagMemoryOverrunException(message)
+        exception = TagMemoryOverrunException(message)
     elif error_code == '4':
-        raise TagMemoryLockedException(message)
+        exception = TagMemoryLockedException(message)
     elif error_code == 'B':
-        raise TagInsufficientPowerException(message)
+        exception = TagInsufficientPowerException(message)
     elif error_code == 'E':
-        raise TagGenericException(message)
+        exception = TagGenericException(message)
     elif error_code == 'F':
-        raise TagGenericException(message)
+        exception = TagGenericException(message)
     elif error_code == '0':
-        raise TagGenericException(message)
+        exception = TagGenericException(message)
     else:
         raise UnexpectedReaderResponseException(f"Unknown error code: {error_code}: {message}")
+    exception.code = error_code
+    raise exception
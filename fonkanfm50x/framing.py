@@ -0,0 +1,66 @@
+import serial
+
+FRAME_START = b'\n'
+FRAME_END = b'\r\n'
+
+class FrameBuffer:
+    """
+    Incremental splitter for reader response frames: <LF>...<CR><LF>.
+    Raw bytes are appended with feed() and complete frames popped with next_frame().
+    Partial frames stay in the buffer until the rest of the bytes arrive.
+    """
+
+    __slots__ = ('_buffer',)
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: bytes):
+        self._buffer += data
+
+    def clear(self):
+        self._buffer.clear()
+
+    def next_frame(self) -> bytes | None:
+        """
+        Pop the next complete frame (without <LF> and <CR><LF>), or None if no complete frame is buffered.
+        Bytes before the frame start are discarded, like line noise after a baud rate change.
+        """
+        end = self._buffer.find(FRAME_END)
+        if end < 0:
+            return None
+        # Frames cannot contain LF, so the last LF before the end marks the start
+        start = self._buffer.rfind(FRAME_START, 0, end) + 1
+        frame = bytes(self._buffer[start:end])
+        # bytearray deletes from the front in amortized O(1)
+        del self._buffer[:end + len(FRAME_END)]
+        return frame
+
+class SerialFrameReader(FrameBuffer):
+    """
+    FrameBuffer fed from a serial port in bulk: each read takes whatever the port has waiting,
+    instead of one byte (and one syscall) at a time.
+    """
+
+    __slots__ = ('ser',)
+
+    def __init__(self, ser: serial.Serial):
+        super().__init__()
+        self.ser = ser
+
+    def read_frame(self) -> bytes | None:
+        """
+        Block until a complete frame is available. Returns None if the serial timeout expires first.
+        """
+        frame = self.next_frame()
+        while frame is None:
+            # Block for at least one byte (up to the serial timeout), then take everything else waiting
+            chunk = self.ser.read(self.ser.in_waiting or 1)
+            if not chunk:
+                return None
+            self.feed(chunk)
+            frame = self.next_frame()
+        return frame
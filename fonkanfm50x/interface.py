@@ -1,19 +1,112 @@
 import serial
 import time
+from collections import deque
 from enum import Enum
 from fastcrc import crc16
-from typing import Generator
+from typing import Callable, Generator, NamedTuple, TypeVar
 
-from .types import RFIDRegion, AvailableBaudRates, EPCMemoryBank
-from .exceptions import ReaderCommandNotSupportedException, UnexpectedReaderResponseException, raise_exception_from_code
+from .types import RFIDRegion, AvailableBaudRates, EPCMemoryBank, LockField, LockAction
+from .framing import SerialFrameReader
+from .qcontrol import AdaptiveQController
+from .connection_cache import ConnectionCache
+from .tagread import TagRead, parse_tag_frame
+from .tagfilter import TagFilter
+from .metrics import ReaderMetrics
+from .capture import CaptureSerial
+from .exceptions import ReaderCommandNotSupportedException, UnexpectedReaderResponseException, TagGenericException, TagNotFoundException, TagMemoryOverrunException, TagMemoryLockedException, TagMemoryPartialReadException, raise_exception_from_code
 
-AFTER_SETTING_COMMAND_DELAY = 0.3 # Tested with default 38400 baud rate up to 230400 baud rate, so not dependent on connection speed
+MAX_READ_WORDS = 0x1E # per R command
+# Select that every tag matches, undoing select_tag. Gen2 matches all tags on a zero length Select, but the
+# reader takes 1 to 60 (hex) bits: this one matches the ISO/IEC 15963 class identifier that starts every TID
+# (E0 ISO/IEC 7816-6, E2 EPCglobal, E3 ISO/IEC 7816-6 extended, top 6 bits 111000)
+CLEAR_SELECT_COMMAND = 'T2,0,6,E0'
+WRITE_WORD_TIMEOUT = 0.02 # Gen2 allows a tag up to 20 ms per word written
+# After N1/N5/NA the reader ignores commands for a while (a fixed 0.3 s wait was always enough, tested from
+# 38400 to 230400 baud). Instead of waiting, it is probed until it answers, backing off up to READY_TIMEOUT.
+READY_BACKOFF = 0.005 # first wait between readiness probes, doubled after each unanswered one
+READY_BACKOFF_MAX = 0.05
+READY_TIMEOUT = 1.0
+X_RETRY_DELAY = 0.02 # wait before resending a command answered with 'X', quadrupled on each retry
+
+# Baud rates ordered by how likely an unknown reader runs on them:
+# observed factory default, datasheet default, the fastest rate, then the rest
+BAUD_PROBE_ORDER = [
+    AvailableBaudRates.BAUD_38400,
+    AvailableBaudRates.BAUD_115200,
+    AvailableBaudRates.BAUD_230400,
+    AvailableBaudRates.BAUD_57600,
+    AvailableBaudRates.BAUD_9600,
+    AvailableBaudRates.BAUD_19200,
+    AvailableBaudRates.BAUD_14400,
+    AvailableBaudRates.BAUD_4800,
+]
+PROBE_BASE_TIMEOUT = 0.02 # Reader processing time of a probe, on top of the time on the wire
+# Rates tried by autotune_baud_rate, slowest first: below 38400 the link is never faster than the air interface
+AUTOTUNE_BAUD_RATES = [
+    AvailableBaudRates.BAUD_38400,
+    AvailableBaudRates.BAUD_57600,
+    AvailableBaudRates.BAUD_115200,
+    AvailableBaudRates.BAUD_230400,
+]
+
+T = TypeVar('T')
+
+# Command exchanges shared by FonkanUHF and AsyncFonkanUHF are written once, as generators of I/O steps that
+# each class runs with its own _run_steps. A step is yielded as (STEP_*, argument), and its result sent back.
+STEP_WRITE = 0 # argument: command to write. Result: None
+STEP_READ = 1 # argument: timeout in seconds, None for the default. Result: next response frame (str) or None
+STEP_SLEEP = 2 # argument: seconds. Result: None
+STEP_BAUD = 3 # argument: AvailableBaudRates to reopen the serial port at. Result: None
+Steps = Generator[tuple[int, object], object, T]
 
 class GPIOPin(Enum):
     GPIO_10 = 4
     GPIO_11 = 2
     GPIO_14 = 1
 
+class BaudRateTrial(NamedTuple):
+    baud_rate: AvailableBaudRates
+    switched: bool # False if the reader could not be reached at this rate
+    duration: float # seconds of workload
+    frames: int # response frames received
+    retries: int # 'X' answers
+    timeouts: int # response reads that timed out
+    crc_failures: int
+    errors: int # commands that failed on a garbled or missing response
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Link errors (retries, timeouts, CRC failures, failed commands) per response expected
+        """
+        if not self.switched:
+            return 1.0
+        return (self.retries + self.timeouts + self.crc_failures + self.errors) / max(self.frames + self.timeouts, 1)
+
+    def to_dict(self) -> dict:
+        return {
+            'baud_rate': self.baud_rate.to_int(),
+            **{field: getattr(self, field) for field in self._fields[1:]},
+            'frames_per_second': self.frames_per_second,
+            'error_rate': self.error_rate,
+        }
+
+class BaudRateReport(NamedTuple):
+    selected: AvailableBaudRates
+    trials: list[BaudRateTrial]
+    max_error_rate: float
+
+    def to_dict(self) -> dict:
+        return {
+            'selected': self.selected.to_int(),
+            'max_error_rate': self.max_error_rate,
+            'trials': [trial.to_dict() for trial in self.trials],
+        }
+
 class FonkanUHF:
     """
     Fonkan FM50x UHF RFID Reader class.
@@ -25,42 +118,135 @@ class FonkanUHF:
               start_power: int = 25,
               baud_rate: AvailableBaudRates = AvailableBaudRates.BAUD_38400,
               region: RFIDRegion = RFIDRegion.EU,
-              debug: bool = False):
+              debug: bool = False,
+              fast_connect: bool = False,
+              connection_cache_path: str | None = None,
+              use_tuned_baud_rate: bool = False,
+              metrics: ReaderMetrics | None = None,
+              capture_path: str | None = None,
+              transport: serial.Serial | None = None):
+        """
+        fast_connect: probe the last known baud rate first with short timeouts, and skip configuration
+            already applied to this reader, using a local connection cache
+        connection_cache_path: cache file location, default ~/.cache/fonkanfm50x/connections.json
+        use_tuned_baud_rate: connect at the baud rate autotune_baud_rate last chose for serial_port (from the
+            connection cache) instead of baud_rate, if there is one
+        metrics: record latencies, retries, errors and inventory rounds into it (off when None)
+        capture_path: record all bytes written and read, timestamped, to this file (.gz to compress)
+        transport: serial.Serial-like object used instead of opening serial_port, e.g. a capture.ReplaySerial
+        """
         # WARNING: The RFID Module MUST be connected through the non power USB port
         self.serial_port = serial_port
         self.start_power = start_power
         self.baud_rate = baud_rate
         self.region = region
         self.debug = debug
+        self.fast_connect = fast_connect
+        self.connection_cache_path = connection_cache_path
+        self.use_tuned_baud_rate = use_tuned_baud_rate
+        self.metrics = metrics
+        self.capture_path = capture_path
+        self.transport = transport
         self.ser: serial.Serial | None = None
-        self.stall_time = 60
-        self.last_tag = "initialise value"
-        self.last_time = time.time() - self.stall_time
+        self._frames: SerialFrameReader | None = None
 
     def __enter__(self):
-        # baud parameter is ignored for now to match request
-        self.ser = serial.Serial(
-            port=self.serial_port,
-            baudrate=self.baud_rate.to_int(),
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            bytesize=serial.EIGHTBITS,
-            timeout=.1,
-        )
+        if self.use_tuned_baud_rate:
+            self.baud_rate = ConnectionCache(self.connection_cache_path).tuned_baud_rate(self.serial_port) or self.baud_rate
+        if self.transport is not None:
+            self.ser = self.transport
+            if not self.ser.is_open:
+                self.ser.open()
+            self.ser.timeout = .1
+        else:
+            # baud parameter is ignored for now to match request
+            self.ser = serial.Serial(
+                port=self.serial_port,
+                baudrate=self.baud_rate.to_int(),
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                bytesize=serial.EIGHTBITS,
+                timeout=.1,
+            )
+        if self.capture_path is not None:
+            self.ser = CaptureSerial(self.ser, self.capture_path)
+        self._frames = SerialFrameReader(self.ser)
 
+        if self.fast_connect:
+            self._fast_connect()
+            return self
+
+        self._run_steps(self._connect_steps())
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.ser and self.ser.is_open:
+            try:
+                self.ser.close()
+            finally:
+                self.ser.close_capture() if isinstance(self.ser, CaptureSerial) else None
+                self.ser = None
+                self._frames = None
+        return False
+
+    def _fast_connect(self):
+        cache = ConnectionCache(self.connection_cache_path)
+        cached = cache.get(self.serial_port) or {}
+
+        # Last working rate of this port first, then the requested one, other known readers and the likely defaults
+        candidates: list[AvailableBaudRates] = []
+        if 'baud_rate' in cached:
+            try:
+                candidates.append(AvailableBaudRates(cached['baud_rate']))
+            except ValueError:
+                pass
+        for rate in [self.baud_rate, *cache.known_baud_rates(), *BAUD_PROBE_ORDER]:
+            if rate not in candidates:
+                candidates.append(rate)
+
+        reader_id: str | None = None
+        for rate in candidates:
+            if self.ser.baudrate != rate.to_int():
+                self._change_serial_connection_baud_rate(rate)
+            reader_id = self._probe_reader_id()
+            if reader_id:
+                break
+        if not reader_id:
+            raise RuntimeError("Could not establish connection with the RFID reader on any baud rate")
+        print(f"Connected to reader id: {reader_id} at baud rate {rate.to_int()}") if self.debug else None
+
+        if rate != self.baud_rate:
+            self.change_baud_rate(self.baud_rate)
+            # The reader state is only known again once the new rate is stored
+            cached = {}
+
+        # Settings survive power cycles, skip them when this same reader was last left with them
+        same_reader = cached.get('reader_id') == reader_id
+        if not (same_reader and cached.get('power') == self.start_power):
+            if self.get_power_level() != self.start_power:
+                self.set_power_level(self.start_power)
+        if not (same_reader and cached.get('region') == self.region.value):
+            if self.get_region() != self.region:
+                self.set_region(self.region)
+        cache.update(self.serial_port, reader_id=reader_id, baud_rate=self.baud_rate, power=self.start_power, region=self.region)
+
+    def _connect_steps(self) -> Steps[None]:
+        """
+        Connect: find the reader's baud rate, then apply baud_rate, start_power and region
+        """
         # Try command to check if connection baud rate is correct.
         # If not, try changing it until we find the right one, finally setting the chosen baud rate
         # We require this because the reader remembers the last baud rate even after power cycling
         connected_to_id:str|None = None
         try:
-            connected_to_id = self.get_reader_id()
+            connected_to_id = yield from self._get_reader_id_steps()
         except UnexpectedReaderResponseException:
             print(f"Could not connect at initial baud rate {self.baud_rate.to_int()}, searching for correct rate...")
             for rate in AvailableBaudRates:
                 try:
-                    self._change_serial_connection_baud_rate(rate)
+                    yield STEP_BAUD, rate
 
-                    connected_to_id = self.get_reader_id()
+                    connected_to_id = yield from self._get_reader_id_steps()
                     if connected_to_id:
                         break
                 except Exception:
@@ -71,32 +257,114 @@ class FonkanUHF:
             else:
                 print(f"Successfully connected to reader id: {connected_to_id} at baud rate {rate.to_int()}. Changing reader baud rate to desired {self.baud_rate.to_int()}.")
                 # Now set to desired baud rate
-                self.change_baud_rate(self.baud_rate)
+                yield from self._change_baud_rate_steps(self.baud_rate)
 
-        # print(f"current power level: {self.get_power_level()}")
-        current_power = self.get_power_level()
+        current_power = yield from self._get_power_level_steps()
         if current_power != self.start_power:
-            self.set_power_level(self.start_power)
-        current_region = self.get_region()
+            yield from self._set_power_level_steps(self.start_power)
+        current_region = yield from self._get_region_steps()
         if current_region != self.region:
-            self.set_region(self.region)
+            yield from self._set_region_steps(self.region)
 
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.ser and self.ser.is_open:
-            try:
-                self.ser.close()
-            finally:
-                self.ser = None
-        return False
+    def _probe(self, command: str) -> str | None:
+        """
+        One round-trip with a timeout scaled to the baud rate, without retries.
+        Returns the stripped response without echo, or None if there was no answer or not an echo.
+        """
+        return self._run_steps(self._probe_steps(command))
+
+    def _probe_steps(self, command: str) -> Steps[str | None]:
+        yield STEP_WRITE, command
+        # '\nS\r' out and '\nS01234567\r\n' back: ~16 bytes of 10 bits, doubled for margin
+        res = yield STEP_READ, PROBE_BASE_TIMEOUT + 2 * (len(command) + 14) * 10 / self.ser.baudrate
+        res = res.strip() if res else ''
+        if res and res[0] == command[0]:
+            return res[1:]
+        return None
+
+    def _probe_reader_id(self) -> str | None:
+        """
+        One S round-trip with a timeout scaled to the baud rate, without retries. Returns the reader ID or None.
+        """
+        return self._probe("S") or None
+
+    def _wait_until_ready(self, command: str, is_ready: Callable[[str], bool] = lambda res: True):
+        self._run_steps(self._wait_until_ready_steps(command, is_ready))
+
+    def _wait_until_ready_steps(self, command: str, is_ready: Callable[[str], bool] = lambda res: True) -> Steps[None]:
+        """
+        Probe with command until the reader answers it and is_ready(response without echo) holds,
+        backing off from READY_BACKOFF to READY_BACKOFF_MAX between probes, for up to READY_TIMEOUT.
+        A response is_ready fails to parse (a reader still busy may answer garbage) counts as not ready.
+        """
+        deadline = time.perf_counter() + READY_TIMEOUT
+        delay = READY_BACKOFF
+        unanswered = False
+        while True:
+            res = yield from self._probe_steps(command)
+            if res is not None and self._is_ready(is_ready, res):
+                break
+            unanswered = True
+            if time.perf_counter() + delay > deadline:
+                raise UnexpectedReaderResponseException(f"Reader not ready after {READY_TIMEOUT} s, last probe {command}: {res}")
+            yield STEP_SLEEP, delay
+            delay = min(delay * 2, READY_BACKOFF_MAX)
+        if unanswered:
+            # A slow reader may still answer an earlier probe: drop it so it is not taken for the next response
+            while (yield STEP_READ, 2 * (len(command) + 14) * 10 / self.ser.baudrate) is not None:
+                pass
+            self.metrics.discard_pending() if self.metrics is not None else None
+
+    def _is_ready(self, is_ready: Callable[[str], bool], res: str) -> bool:
+        try:
+            return is_ready(res)
+        except (ValueError, KeyError, IndexError) as e:
+            print(f"Not ready, unparsable response {res!r}: {e}") if self.debug else None
+            return False
 
     ####################################################################
     # Internal
     ####################################################################
 
+    def _run_steps(self, steps: Steps[T]) -> T:
+        """
+        Run a generator of I/O steps (see STEP_WRITE) on the serial port and return its result.
+        An exception raised by a step is thrown into the generator.
+        """
+        send, value = steps.send, None
+        while True:
+            try:
+                step, argument = send(value)
+            except StopIteration as stop:
+                return stop.value
+            send = steps.send
+            try:
+                if step == STEP_READ:
+                    value = self._read_response_within(argument)
+                elif step == STEP_WRITE:
+                    value = self._write_command(argument)
+                elif step == STEP_SLEEP:
+                    value = time.sleep(argument)
+                else:
+                    value = self._change_serial_connection_baud_rate(argument)
+            except Exception as e:
+                send, value = steps.throw, e
+
+    def _read_response_within(self, timeout: float | None) -> str | None:
+        if timeout is None:
+            return self._read_response()
+        previous = self.ser.timeout
+        self.ser.timeout = timeout
+        try:
+            return self._read_response()
+        finally:
+            self.ser.timeout = previous
+
     def send_command(self, command: str):
-        res = self.send_command_and_get_response(command)
+        self._run_steps(self._send_command_steps(command))
+
+    def _send_command_steps(self, command: str) -> Steps[None]:
+        res = yield from self._command_steps(command)
         if res is None:
             raise UnexpectedReaderResponseException(f"No ACK for command {command}")
     
@@ -104,26 +372,18 @@ class FonkanUHF:
         if not self.ser:
             raise RuntimeError("Serial port not initialized. Call begin() first.")
         print(f">: {command.encode()}") if self.debug else None
-        self.ser.write(f"\n{command}\r".encode())
+        data = f"\n{command}\r".encode()
+        self.ser.write(data)
+        self.metrics.command_sent(command, len(data)) if self.metrics is not None else None
 
     def _read_response(self) -> str | None:
-        response = b''
-        # Read until first LF
-        while True:
-            byte = self.ser.read(1)
-            if not byte:
-                break
-            if byte == b'\n':  # LF
-                break
-        # Read until CR LF
-        while True:
-            byte = self.ser.read(1)
-            if not byte:
-                break
-            response += byte
-            if response.endswith(b'\r\n'):  # CR LF
-                response = response[:-2]  # Strip the CR LF
-                break
+        if self._frames is None:
+            raise RuntimeError("Serial port not initialized. Call begin() first.")
+        response = self._frames.read_frame()
+        self.metrics.frame_received(response) if self.metrics is not None else None
+        if response is None:
+            print("<: ") if self.debug else None
+            return None
 
         decoded = response.decode('utf-8', errors='ignore')
         print(f"<: {decoded}") if self.debug else None
@@ -133,17 +393,34 @@ class FonkanUHF:
         else:
             return decoded
 
-    def send_command_and_get_response(self, command: str, handle_error: callable = raise_exception_from_code) -> str:
+    def _raise_tag_error(self, error_code: str, message: str = ""):
+        """
+        raise_exception_from_code, counting the error code in the metrics
+        """
+        self.metrics.tag_error(error_code) if self.metrics is not None else None
+        raise_exception_from_code(error_code, message)
+
+    def send_command_and_get_response(self, command: str, handle_error: Callable[[str, str], None] | None = None) -> str:
+        return self._run_steps(self._command_steps(command, handle_error))
+
+    def _command_steps(self, command: str, handle_error: Callable[[str, str], None] | None = None) -> Steps[str | None]:
+        """
+        Write command and read its response, resending it on 'X'. Returns the response without echo,
+        None if there was none. A response to another command goes through handle_error (default: tag errors).
+        """
+        handle_error = handle_error or self._raise_tag_error
         decoded:str | None = None
-        for _ in range(3):  # Retry up to 3 times
-            self._write_command(command)
+        for attempt in range(3):  # Retry up to 3 times
+            yield STEP_WRITE, command
 
-            decoded = self._read_response()
+            decoded = yield STEP_READ, None
             decoded = decoded.strip() if decoded else None
 
             if decoded == 'X':
                 # Re-attempt
-                time.sleep(0.2)
+                self.metrics.retry(command) if self.metrics is not None else None
+                if attempt < 2:
+                    yield STEP_SLEEP, X_RETRY_DELAY * 4 ** attempt
                 print("Received 'X' response, retrying...") if self.debug else None
                 continue
             elif decoded and decoded[0] != command[0]:
@@ -154,61 +431,148 @@ class FonkanUHF:
 
         raise ReaderCommandNotSupportedException(f"RFID Reader does not understand {command}")
     
-    def send_command_and_get_response_until(self, command: str, terminator: str) -> Generator[str, None, None]:
+    def send_command_and_get_response_until(self, command: str, terminator: str, on_error: Callable[[TagGenericException], None] | None = None) -> Generator[str, None, None]:
+        """
+        Yield responses of command until terminator is found.
+        Tag error frames (i.e. 'E' on a collision) do not end the stream: the remaining responses are still read,
+        so the link stays in sync. They are passed to on_error if given, otherwise the first one is raised at the end.
+        """
+        deferred_error: TagGenericException | None = None
+        def handle_tag_error(error: TagGenericException):
+            nonlocal deferred_error
+            if on_error is not None:
+                on_error(error)
+            elif deferred_error is None:
+                deferred_error = error
+
         # Call self.send_command_and_get_response repeatedly until terminator is found
-        res = self.send_command_and_get_response(command)
-        if res == terminator:
-            # If not even the first response, return empty list
-            return
+        try:
+            res = self.send_command_and_get_response(command)
+        except TagGenericException as e:
+            handle_tag_error(e)
         else:
-            yield res
+            if res == terminator or res is None:
+                # If not even the first response, return empty list
+                return
+            else:
+                yield res
 
         while True:
             res = self._read_response()
             if res is None:
                 break
-            # remove command echo
-            res = res.strip()[1:]
+            res = self._until_frame(command, res, handle_tag_error)
+            if res is None:
+                continue
 
             yield res
 
             if res == terminator:
                 break
 
+        if deferred_error is not None:
+            raise deferred_error
+
+    def _until_frame(self, command: str, res: str, handle_tag_error: Callable[[TagGenericException], None]) -> str | None:
+        """
+        Response of send_command_and_get_response_until without its echo, None for a tag error frame
+        (passed to handle_tag_error)
+        """
+        res = res.strip()
+        if res and res[0] != command[0]:
+            try:
+                self._raise_tag_error(res[0], f"response {res} while executing command {command}")
+            except TagGenericException as e:
+                handle_tag_error(e)
+                return None
+        # remove command echo
+        return res[1:]
+
+    def send_commands_pipelined(self, commands: list[str]) -> list[str | None]:
+        """
+        Write all commands at once, then read their responses in order (stripped, echo included, no error handling).
+        Only for commands answering exactly one frame. After a missing response the line is drained and
+        the remaining responses are None, so a late frame is never taken for the next command's.
+        """
+        if not self.ser:
+            raise RuntimeError("Serial port not initialized. Call begin() first.")
+        data = [f"\n{command}\r".encode() for command in commands]
+        self.ser.write(b''.join(data))
+        print(f">: {commands}") if self.debug else None
+        if self.metrics is not None:
+            for command, command_data in zip(commands, data):
+                self.metrics.command_sent(command, len(command_data))
+
+        responses: list[str | None] = []
+        timeout = self.ser.timeout
+        try:
+            for command in commands:
+                if command[0] == 'W':
+                    # Writes take air time per word before the reply
+                    self.ser.timeout = timeout + int(command.split(',')[2], 16) * WRITE_WORD_TIMEOUT
+                res = self._read_response()
+                self.ser.timeout = timeout
+                if res is None:
+                    while self._read_response() is not None:
+                        pass
+                    self.metrics.discard_pending() if self.metrics is not None else None
+                    break
+                responses.append(res.strip())
+        finally:
+            self.ser.timeout = timeout
+        responses.extend([None] * (len(commands) - len(responses)))
+        return responses
+
     ####################################################################
     # Configuration
     ####################################################################
     
-    def get_region(self) -> RFIDRegion:
-        res = self.send_command_and_get_response("N4,00")
+    @staticmethod
+    def _parse_region(res: str) -> RFIDRegion:
         region_value = int(res)
         for region in RFIDRegion:
             if region.value == region_value:
                 return region
         raise ValueError(f"Unknown region value: {region_value}")
 
+    def get_region(self) -> RFIDRegion:
+        return self._run_steps(self._get_region_steps())
+
+    def _get_region_steps(self) -> Steps[RFIDRegion]:
+        res = yield from self._command_steps("N4,00")
+        return self._parse_region(res)
+
     def set_region(self, region: RFIDRegion):
+        self._run_steps(self._set_region_steps(region))
+
+    def _set_region_steps(self, region: RFIDRegion) -> Steps[None]:
         # Set region
-        self.send_command(f"N5,0{region.value}")
+        yield from self._send_command_steps(f"N5,0{region.value}")
         
-        # This command requires a rate-limit after running to prevent the device from locking
-        time.sleep(AFTER_SETTING_COMMAND_DELAY)
+        # The reader ignores commands while applying it: wait until it reports the new region
+        yield from self._wait_until_ready_steps("N4,00", lambda res: self._parse_region(res) == region)
     
     def get_power_level(self) -> int:
-        res = self.send_command_and_get_response("N0,00")
+        return self._run_steps(self._get_power_level_steps())
+
+    def _get_power_level_steps(self) -> Steps[int]:
+        res = yield from self._command_steps("N0,00")
         if res is None:
             raise UnexpectedReaderResponseException("No response from get power level command")
         return int(res, 16)
 
     def set_power_level(self, power_level: int):
+        self._run_steps(self._set_power_level_steps(power_level))
+
+    def _set_power_level_steps(self, power_level: int) -> Steps[None]:
         assert -2 <= power_level <= 25, "Power level must be between -2 and 25 dB"
 
         # Convert int to hex string
         power_level_hex = format(power_level, '02X')
-        self.send_command(f"N1,{power_level_hex}")
+        yield from self._send_command_steps(f"N1,{power_level_hex}")
         
-        # This command requires a rate-limit after running to prevent the device from locking
-        time.sleep(AFTER_SETTING_COMMAND_DELAY)
+        # The reader ignores commands while applying it: wait until it reports the new power level
+        yield from self._wait_until_ready_steps("N0,00", lambda res: int(res, 16) in (power_level, power_level & 0xFF))
 
     def _change_serial_connection_baud_rate(self, baud_rate: AvailableBaudRates):
         if not self.ser:
@@ -219,32 +583,224 @@ class FonkanUHF:
         # Reopen with new baud rate
         self.ser.baudrate = baud_rate.to_int()
         self.ser.open()
+        # Anything buffered at the old rate is line noise now
+        self._frames.clear()
+        self.metrics.discard_pending() if self.metrics is not None else None
         # time.sleep(0.3)
 
     def change_baud_rate(self, baud_rate: AvailableBaudRates):
+        self._run_steps(self._change_baud_rate_steps(baud_rate))
+
+    def _change_baud_rate_steps(self, baud_rate: AvailableBaudRates) -> Steps[None]:
         # Change baud rate
-        res = self.send_command_and_get_response(f"NA,0{baud_rate.value}")
-        assert res[0:2] == f"0{baud_rate.value}"
-        time.sleep(AFTER_SETTING_COMMAND_DELAY)
+        res = yield from self._command_steps(f"NA,0{baud_rate.value}")
+        if res is None or res[0:2] != f"0{baud_rate.value}":
+            raise UnexpectedReaderResponseException(f"Unexpected response to baud rate change: {res}")
+
+        # Change serial connection baud rate, then wait until the reader answers on it
+        yield STEP_BAUD, baud_rate
+        yield from self._wait_until_ready_steps("S")
+
+    def apply_config(self, power_level: int | None = None, region: RFIDRegion | None = None, baud_rate: AvailableBaudRates | None = None) -> dict[str, float]:
+        """
+        Apply the given settings, sending only those that differ from the reader's current ones.
+        Returns the seconds taken by each step run: 'read' (current settings), 'power_level', 'region', 'baud_rate'
+
+        timings = reader.apply_config(power_level=20, region=RFIDRegion.EU)
+        """
+        timings: dict[str, float] = {}
+        started = time.perf_counter()
+
+        # Current power and region in one round-trip
+        queries = (["N0,00"] if power_level is not None else []) + (["N4,00"] if region is not None else [])
+        current = dict(zip(queries, self.send_commands_pipelined(queries)))
+        if queries:
+            timings['read'] = time.perf_counter() - started
+
+        def changed(query: str, is_current: Callable[[str], bool]) -> bool:
+            res = current[query]
+            if res is None or res[0] != 'N':
+                # Unknown state: apply
+                return True
+            try:
+                return not is_current(res[1:])
+            except ValueError:
+                return True
+
+        steps: list[tuple[str, Callable[[], None]]] = []
+        if power_level is not None and changed("N0,00", lambda res: int(res, 16) in (power_level, power_level & 0xFF)):
+            steps.append(('power_level', lambda: self.set_power_level(power_level)))
+        if region is not None and changed("N4,00", lambda res: self._parse_region(res) == region):
+            steps.append(('region', lambda: self.set_region(region)))
+        # Baud rate last, so the other settings go through on the known rate
+        if baud_rate is not None and self.ser.baudrate != baud_rate.to_int():
+            steps.append(('baud_rate', lambda: self.change_baud_rate(baud_rate)))
+
+        for name, step in steps:
+            step_started = time.perf_counter()
+            step()
+            timings[name] = time.perf_counter() - step_started
+        print(f"apply_config: {timings}") if self.debug else None
+        return timings
+
+    ####################################################################
+    # Baud rate tuning
+    ####################################################################
+
+    def autotune_baud_rate(self,
+              rates: list[AvailableBaudRates] | None = None,
+              duration: float = 1.0,
+              max_error_rate: float = 0.01,
+              slot_q: int | AdaptiveQController | None = None,
+              stop_on_failure: bool = True,
+              persist: bool = True) -> BaudRateReport:
+        """
+        Find the fastest baud rate the link (cable, USB adapter) carries reliably: switch to each rate with
+        change_baud_rate, slowest first, and run a standard workload on it for duration seconds (S and V
+        echoes, a burst of inventory rounds and of TID reads) counting frames, 'X' retries, timeouts, CRC
+        failures and failed commands. The rate with the most frames per second among those with an error rate
+        of at most max_error_rate is kept (the current one if none qualifies) and becomes self.baud_rate.
+        If the link cannot be switched to it, the rate the reader was last found on is kept and reported instead.
+
+        rates: rates to try, default AUTOTUNE_BAUD_RATES
+        slot_q: Q-value of the inventory rounds, or an AdaptiveQController
+        stop_on_failure: stop at the first rate over max_error_rate, faster rates rarely do better
+        persist: store the chosen rate and the report in the connection cache, see use_tuned_baud_rate
+
+        The workload is measured with its own ReaderMetrics: it is not recorded in self.metrics.
+
+        report = reader.autotune_baud_rate()
+        print(report.selected, [trial.error_rate for trial in report.trials])
+        """
+        rates = sorted(rates or AUTOTUNE_BAUD_RATES, key=lambda rate: rate.to_int())
+        original = self._serial_baud_rate()
+        trials: list[BaudRateTrial] = []
+        metrics = self.metrics
+        try:
+            for rate in rates:
+                trial = self._baud_rate_trial(rate, duration, slot_q)
+                trials.append(trial)
+                print(f"autotune {rate.to_int()}: {trial.frames_per_second:.0f} frames/s, error rate {trial.error_rate:.4f}") if self.debug else None
+                if stop_on_failure and trial.error_rate > max_error_rate:
+                    break
+        finally:
+            self.metrics = metrics
+
+        reliable = [trial for trial in trials if trial.error_rate <= max_error_rate]
+        selected = max(reliable, key=lambda trial: trial.frames_per_second).baud_rate if reliable else original
+        if self._serial_baud_rate() != selected and not self._switch_baud_rate(selected, fallback=original):
+            # The switch kept failing: keep the rate the reader was last found on, so that use_tuned_baud_rate connects
+            selected = self._serial_baud_rate()
+        self.baud_rate = selected
+        report = BaudRateReport(selected, trials, max_error_rate)
+        if persist:
+            ConnectionCache(self.connection_cache_path).update(
+                self.serial_port, reader_id=self.get_reader_id(), baud_rate=selected, tuned_baud_rate=selected, autotune=report.to_dict(),
+            )
+        return report
+
+    def _serial_baud_rate(self) -> AvailableBaudRates:
+        baud_rate = self.ser.baudrate
+        return next(rate for rate in AvailableBaudRates if rate.to_int() == baud_rate)
+
+    def _switch_baud_rate(self, baud_rate: AvailableBaudRates, fallback: AvailableBaudRates, attempts: int = 5) -> bool:
+        """
+        change_baud_rate on a link that may garble it: when the switch fails, find the reader again (it may
+        have switched, or not) and retry, up to attempts times. Returns whether the link ended up at baud_rate.
+        Raises RuntimeError if the reader answers at no rate.
+        """
+        candidates = list(dict.fromkeys([baud_rate, fallback, *BAUD_PROBE_ORDER]))
+        for _ in range(attempts):
+            try:
+                self.change_baud_rate(baud_rate)
+                return True
+            except (UnexpectedReaderResponseException, ReaderCommandNotSupportedException, TagGenericException):
+                # A garbled NA reply may also read as a tag error code
+                print(f"Lost the reader switching to {baud_rate.to_int()} baud, searching for it...") if self.debug else None
+            # Twice: a single probe may be garbled on the link being tested
+            for rate in candidates * 2:
+                if self.ser.baudrate != rate.to_int():
+                    self._change_serial_connection_baud_rate(rate)
+                if self._probe_reader_id():
+                    break
+            else:
+                raise RuntimeError("Could not establish connection with the RFID reader on any baud rate")
+            if rate == baud_rate:
+                return True
+        return False
+
+    def _discard_input(self):
+        """
+        Drop what is left of garbled or unfinished responses, until the line is quiet for a read timeout
+        """
+        while self._frames.read_frame() is not None:
+            pass
+        self.metrics.discard_pending() if self.metrics is not None else None
 
-        # Change serial connection baud rate
-        self._change_serial_connection_baud_rate(baud_rate)
+    def _baud_rate_trial(self, baud_rate: AvailableBaudRates, duration: float, slot_q: int | AdaptiveQController | None) -> BaudRateTrial:
+        previous = self._serial_baud_rate()
+        # The switch itself is not part of the measurement
+        self.metrics = None
+        if previous != baud_rate and not self._switch_baud_rate(baud_rate, fallback=previous):
+            return BaudRateTrial(baud_rate, False, 0.0, 0, 0, 0, 0, 1)
+
+        metrics = self.metrics = ReaderMetrics()
+        workload: list[Callable[[], object]] = [
+            self.get_reader_id,
+            self.get_reader_firmware,
+            *[lambda: list(self.read_many_tag_id(slot_q))] * 3,
+            *[lambda: self.read_tag_memory_multiband(EPCMemoryBank.TID, 0, 6)] * 3,
+        ]
+        errors = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < duration:
+            for command in workload:
+                try:
+                    command()
+                except (TagGenericException, RuntimeWarning):
+                    # Collisions and tags out of reach are not the link's fault, CRC failures are counted by the metrics
+                    pass
+                except (UnexpectedReaderResponseException, ReaderCommandNotSupportedException, ValueError, IndexError):
+                    # Garbled or missing response
+                    errors += 1
+                    self._discard_input()
+        elapsed = time.perf_counter() - started
+        return BaudRateTrial(
+            baud_rate, True, elapsed, metrics.frames_in, sum(metrics.retries.values()), sum(metrics.timeouts.values()),
+            metrics.crc_failures, errors,
+        )
 
     ####################################################################
     # GPIO Control
     ####################################################################
 
+    @staticmethod
+    def _parse_gpio_pins(res: str) -> dict[GPIOPin, bool]:
+        """
+        Split a 3 bit pin value into pin: set(True)/unset(False)
+        """
+        pin_value = int(res)
+        return {pin: (pin_value & pin.value) != 0 for pin in GPIOPin}
+
+    @staticmethod
+    def _build_gpio_argument(pins: dict[GPIOPin, bool]) -> str:
+        """
+        Build the <mask><value> argument of the GPIO setting commands
+        """
+        mask = 0
+        value = 0
+        for pin, is_set in pins.items():
+            mask |= pin.value
+            if is_set:
+                value |= pin.value
+        return f"{mask}{value}"
+
     def get_gpio_configuration(self) -> dict[GPIOPin, bool]:
         """
         Get GPIO pin configuration as input/output: pin: output(True)/input(False)
         """
         res = self.send_command_and_get_response("N6,00")
-        config_value = int(res)
-        config = {}
-        for pin in GPIOPin:
-            is_output = (config_value & pin.value) != 0
-            config[pin] = is_output
-        return config
+        return self._parse_gpio_pins(res)
 
     def configure_gpio(self, config: dict[GPIOPin, bool]):
         """
@@ -262,27 +818,14 @@ class FonkanUHF:
             # Update with new configuration
             current_config.update(config)
 
-        # Build mask and value
-        mask = 0
-        value = 0
-        for pin, is_output in current_config.items():
-            mask |= pin.value
-            if is_output:
-                value |= pin.value
-
-        self.send_command(f"N7,{mask}{value}")
+        self.send_command(f"N7,{self._build_gpio_argument(current_config)}")
 
     def read_gpio_pins(self) -> dict[GPIOPin, bool]:
         """
         Read GPIO pin levels: pin: high(True)/low(False)
         """
         res = self.send_command_and_get_response("N8,00")
-        pin_value = int(res)
-        levels = {}
-        for pin in GPIOPin:
-            is_high = (pin_value & pin.value) != 0
-            levels[pin] = is_high
-        return levels
+        return self._parse_gpio_pins(res)
     
     def write_gpio_pins(self, levels: dict[GPIOPin, bool]):
         """
@@ -290,24 +833,14 @@ class FonkanUHF:
 
         write_gpio_pins({GPIOPin.GPIO_10: True, GPIOPin.GPIO_11: False})
         """
-        # Build mask and value
-        mask = 0
-        value = 0
-        for pin, is_high in levels.items():
-            mask |= pin.value
-            if is_high:
-                value |= pin.value
-
-        self.send_command(f"N9,{mask}{value}")
+        self.send_command(f"N9,{self._build_gpio_argument(levels)}")
 
     ####################################################################
     # Status commands
     ####################################################################
 
-    def get_reader_firmware(self) -> str:
-        res = self.send_command_and_get_response("V")
-        if res is None:
-            raise UnexpectedReaderResponseException("No response from get firmware command")
+    @staticmethod
+    def _parse_firmware(res: str) -> str:
         res = res.split(',')
         
         major = res[0][0:2]
@@ -320,8 +853,17 @@ class FonkanUHF:
 
         return f"v{major_int}.{minor_int} ({major}{minor}, comment: {comment})"
 
+    def get_reader_firmware(self) -> str:
+        res = self.send_command_and_get_response("V")
+        if res is None:
+            raise UnexpectedReaderResponseException("No response from get firmware command")
+        return self._parse_firmware(res)
+
     def get_reader_id(self) -> str:
-        res = self.send_command_and_get_response("S")
+        return self._run_steps(self._get_reader_id_steps())
+
+    def _get_reader_id_steps(self) -> Steps[str]:
+        res = yield from self._command_steps("S")
         if res is None:
             raise UnexpectedReaderResponseException("No response from get reader ID command")
         return res
@@ -352,10 +894,24 @@ class FonkanUHF:
         expected_crc = format(expected_crc, '04X')
 
         if expected_crc != read_crc16:
-            print(f'found {pc_control_word}, {epc_tag_id}, {read_crc16}, calculated {expected_crc}')
+            print(f'found {pc_control_word}, {epc_tag_id}, {read_crc16}, calculated {expected_crc}') if self.debug else None
+            self.metrics.crc_failure() if self.metrics is not None else None
             raise RuntimeWarning(f"Invalid CRC16. Received: {read_crc16}, Calculated: {expected_crc}")
         return epc_tag_id
 
+    def _parse_tag_memory_response(self, res: str) -> tuple[str, str]:
+        # res = PC+EPC+CRC16,R<data> or PC+EPC+CRC16,<error code>
+        res = res.split(',')
+        epc = res[0]
+        parsed_epc = self._parse_tag_id_response(epc)
+        data = ','.join(res[1:])
+        # Raise error on communication with RFID error
+        if data[0] != 'R':
+            self._raise_tag_error(data[0], f"error while reading {parsed_epc}")
+        data = data[1:] # remove leading R, since command is Q,R and the R is echoed
+
+        return parsed_epc, data
+
     def read_tag_id(self) -> str | None:
         """
         Display tag EPC ID
@@ -368,19 +924,178 @@ class FonkanUHF:
         else:                        
             return self._parse_tag_id_response(res)
     
-    def read_many_tag_id(self, slot_q:int|None = None) -> Generator[str, None, None]:
+    def _read_inventory_round(self, command: str, parse: Callable[[str], T], q_controller: AdaptiveQController | None) -> Generator[T, None, None]:
         """
-        Display tag EPC ID. Multiple at the same time if present.
+        Run one U inventory round, yielding parsed replies.
+        Errors (CRC failures, tag errors) are raised once the whole round has been read.
         """
+        started = time.perf_counter()
+        tags = 0
+        crc_failures = 0
+        collisions = 0
+        deferred_error: Exception | None = None
 
-        slot_q = hex(slot_q)[2:].upper() if slot_q is not None else ''
+        def on_error(error: TagGenericException):
+            nonlocal collisions, deferred_error
+            collisions += 1
+            deferred_error = deferred_error or error
 
         # Find tags until we recieve 'U': no tags found.
-        for res in self.send_command_and_get_response_until(f"U{slot_q or ''}", terminator=""):
+        for res in self.send_command_and_get_response_until(command, terminator="", on_error=on_error):
             print(f"res: {res}") if self.debug else None
             if res == "":
                 continue
-            yield self._parse_tag_id_response(res)
+            try:
+                parsed = parse(res)
+            except RuntimeWarning as e:
+                crc_failures += 1
+                deferred_error = deferred_error or e
+                continue
+            except TagGenericException as e:
+                # The tag replied, but its memory could not be read
+                tags += 1
+                deferred_error = deferred_error or e
+                continue
+            tags += 1
+            yield parsed
+
+        duration = time.perf_counter() - started
+        if q_controller is not None:
+            q_controller.update(tags, crc_failures, collisions, duration)
+        self.metrics.inventory_round(tags, duration) if self.metrics is not None else None
+        if deferred_error is not None:
+            raise deferred_error
+
+    def _read_inventory_round_frames(self, command: str, q_controller: AdaptiveQController | None) -> Generator[TagRead, None, None]:
+        """
+        Bytes level version of _read_inventory_round: response frames are parsed into TagRead
+        without decoding them to str first. Same error handling.
+        """
+        echo = ord(command[0])
+        started = time.perf_counter()
+        tags = 0
+        crc_failures = 0
+        collisions = 0
+        deferred_error: Exception | None = None
+
+        for attempt in range(3):  # Retry up to 3 times
+            self._write_command(command)
+            frame = self._frames.read_frame()
+            self.metrics.frame_received(frame) if self.metrics is not None else None
+            if frame != b'X':
+                break
+            self.metrics.retry(command) if self.metrics is not None else None
+            time.sleep(X_RETRY_DELAY * 4 ** attempt) if attempt < 2 else None
+            print("Received 'X' response, retrying...") if self.debug else None
+        else:
+            raise ReaderCommandNotSupportedException(f"RFID Reader does not understand {command}")
+
+        while frame is not None:
+            print(f"<: {frame}") if self.debug else None
+            frame = frame.strip()
+            if frame and frame[0] == echo:
+                if len(frame) == 1:
+                    # Bare echo: no more tags
+                    break
+                try:
+                    read = parse_tag_frame(frame, time.monotonic())
+                except RuntimeWarning as e:
+                    crc_failures += 1
+                    self.metrics.crc_failure() if self.metrics is not None else None
+                    deferred_error = deferred_error or e
+                except TagGenericException as e:
+                    tags += 1
+                    self.metrics.tag_error(e.code) if self.metrics is not None else None
+                    deferred_error = deferred_error or e
+                else:
+                    tags += 1
+                    yield read
+            elif frame:
+                try:
+                    self._raise_tag_error(chr(frame[0]), f"response {frame!r} while executing command {command}")
+                except TagGenericException as e:
+                    collisions += 1
+                    deferred_error = deferred_error or e
+            frame = self._frames.read_frame()
+            self.metrics.frame_received(frame) if self.metrics is not None else None
+
+        duration = time.perf_counter() - started
+        if q_controller is not None:
+            q_controller.update(tags, crc_failures, collisions, duration)
+        self.metrics.inventory_round(tags, duration) if self.metrics is not None else None
+        if deferred_error is not None:
+            raise deferred_error
+
+    @staticmethod
+    def _slot_q_argument(slot_q: int | AdaptiveQController | None) -> tuple[str, AdaptiveQController | None]:
+        if isinstance(slot_q, AdaptiveQController):
+            return hex(slot_q.q)[2:].upper(), slot_q
+        return (hex(slot_q)[2:].upper() if slot_q is not None else ''), None
+
+    def _filtered_round(self, reads: Generator[T, None, None], tag_filter: TagFilter, matches: Callable[[T], bool]) -> Generator[T, None, None]:
+        """
+        Pass through the reads of a round matching the filter, under its select. The select is cleared once the
+        round ends, fails or is closed: on firmware applying T to inventories it would filter every later round.
+        If the round failed or was closed, a failure to clear does not replace its exception.
+        """
+        if tag_filter.select is None:
+            yield from (read for read in reads if matches(read))
+            return
+        self.select_tag(*tag_filter.select)
+        complete = False
+        failed = True
+        try:
+            for read in reads:
+                if matches(read):
+                    yield read
+            complete = True
+            failed = False
+        except (TagGenericException, RuntimeWarning):
+            # Raised once the whole round was read
+            complete = True
+            raise
+        finally:
+            if not complete:
+                # Closed early or failed: replies of the round may still be arriving
+                reads.close()
+                self._discard_input()
+            try:
+                self.clear_select()
+            except Exception as e:
+                if not failed:
+                    raise
+                print(f"Clearing the select failed: {e}") if self.debug else None
+
+    def read_many_tag_id(self, slot_q: int | AdaptiveQController | None = None, tag_filter: TagFilter | None = None) -> Generator[str, None, None]:
+        """
+        Display tag EPC ID. Multiple at the same time if present.
+        slot_q: Q-value of the round, or an AdaptiveQController choosing it from previous rounds
+        tag_filter: only yield matching EPCs, after sending its select (see TagFilter). The select is cleared
+            (clear_select) once the round ends or the generator is closed.
+        """
+
+        slot_q, q_controller = self._slot_q_argument(slot_q)
+
+        reads = self._read_inventory_round(f"U{slot_q}", self._parse_tag_id_response, q_controller)
+        if tag_filter is None:
+            yield from reads
+            return
+        yield from self._filtered_round(reads, tag_filter, tag_filter.matches)
+
+    def read_many_tag_reads(self, slot_q: int | AdaptiveQController | None = None, tag_filter: TagFilter | None = None) -> Generator[TagRead, None, None]:
+        """
+        read_many_tag_id returning compact TagRead records (PC word, EPC bytes, monotonic timestamp)
+        parsed straight from the response bytes. Use TagRead.epc_hex for the str EPC.
+        tag_filter: matched against the EPC bytes, without building the str EPCs
+        """
+        slot_q, q_controller = self._slot_q_argument(slot_q)
+
+        reads = self._read_inventory_round_frames(f"U{slot_q}", q_controller)
+        if tag_filter is None:
+            yield from reads
+            return
+        matches = tag_filter.bytes_matcher()
+        yield from self._filtered_round(reads, tag_filter, lambda read: matches(read.epc))
     
     def read_tag_memory(self, bank: EPCMemoryBank, address: int, length: int) -> str | None:
         """
@@ -392,7 +1107,7 @@ class FonkanUHF:
         assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
         assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
 
-        res = self.send_command_and_get_response(f"R{bank.value},{address},{length}")
+        res = self.send_command_and_get_response(f"R{bank.value},{address:X},{length:X}")
         if res == '':
             # No tag in RF field
             return None
@@ -409,47 +1124,263 @@ class FonkanUHF:
         assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
         assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
 
-        res = self.send_command_and_get_response(f"Q,R{bank.value},{address},{length}")
-        if res == '':
+        res = self.send_command_and_get_response(f"Q,R{bank.value},{address:X},{length:X}")
+        return self._tag_memory_multiband_result(res)
+
+    def _tag_memory_multiband_result(self, res: str | None) -> tuple[str, str] | None:
+        if res is None:
+            raise UnexpectedReaderResponseException("No response from read tag memory command")
+        elif res == '':
             # No tag in RF field
             return None
         else:
-            res = res.split(',')
-            epc = res[0]
-            parsed_epc = self._parse_tag_id_response(epc)
-            data = ','.join(res[1:])
-            # Raise error on communication with RFID error
-            if data[0] != 'R':
-                raise_exception_from_code(data[0], f"error while reading {parsed_epc}")
-            data = data[1:] # remove leading R, since command is Q,R and the R is echoed
+            return self._parse_tag_memory_response(res) #bytes.fromhex(res).decode('utf-8')
+
+    def read_tag_memory_range(self, bank: EPCMemoryBank, address: int, length: int, max_outstanding: int = 4, retries: int = 3) -> tuple[str, bytes] | None:
+        """
+        Read any number of words from one tag. Returns EPC & data, or None if no tag answered.
+        The range is split in Q,R reads of up to 30 words, with up to max_outstanding commands written before their
+        responses are read. Every chunk must come from the EPC of the first tag answering: chunks from another tag,
+        without a tag or with a transient error are retried up to retries times.
+        Raises TagMemoryPartialReadException with the failed word ranges (and the data read) if some chunks still fail.
+        bank: reserved/EPC/TID/User
+        address: word address: 0-> 3FFF
+        length: read word length, from 1
+        """
+        assert 0 <= address and 1 <= length and address + length - 1 <= 0x3FFF, "Words must be between 0 and 16383 (0x3FFF)"
+        assert max_outstanding >= 1, "At least one command must be outstanding"
 
+        chunks = deque((start, min(MAX_READ_WORDS, address + length - start)) for start in range(address, address + length, MAX_READ_WORDS))
+        attempts = {chunk: 0 for chunk in chunks}
+        in_flight: deque[tuple[int, int]] = deque()
+        failures: dict[tuple[int, int], Exception] = {}
+        data = bytearray(length * 2)
+        epc: str | None = None
+        tag_answered = False
+
+        def retry_or_fail(chunk: tuple[int, int], error: Exception):
+            if attempts[chunk] <= retries and not isinstance(error, (TagMemoryOverrunException, TagMemoryLockedException)):
+                chunks.append(chunk)
+            else:
+                failures[chunk] = error
+
+        while chunks or in_flight:
+            while chunks and len(in_flight) < max_outstanding:
+                chunk = chunks.popleft()
+                attempts[chunk] += 1
+                self._write_command(f"Q,R{bank.value},{chunk[0]:X},{chunk[1]:X}")
+                in_flight.append(chunk)
+
+            chunk = in_flight.popleft()
+            res = self._read_response()
+            if res is None:
+                # A late response would be taken for the next chunk's: drain the line and resend everything outstanding
+                while self._read_response() is not None:
+                    pass
+                self.metrics.discard_pending() if self.metrics is not None else None
+                for lost in (chunk, *in_flight):
+                    retry_or_fail(lost, UnexpectedReaderResponseException(f"No response while reading words {lost[0]:X}+{lost[1]:X}"))
+                in_flight.clear()
+                continue
+
+            res = res.strip()
+            try:
+                if res == 'X':
+                    raise ReaderCommandNotSupportedException(f"RFID Reader does not understand Q,R{bank.value},{chunk[0]:X},{chunk[1]:X}")
+                elif res[0] != 'Q':
+                    self._raise_tag_error(res[0], f"response {res} while reading words {chunk[0]:X}+{chunk[1]:X}")
+                elif res == 'Q':
+                    raise TagGenericException("No tag in RF field")
+                tag_answered = True
+                # Check the EPC before the data, so an error of another tag is retried rather than reported
+                tag_id, _, chunk_data = res[1:].partition(',')
+                chunk_epc = self._parse_tag_id_response(tag_id)
+                if epc is None:
+                    epc = chunk_epc
+                elif chunk_epc != epc:
+                    raise TagGenericException(f"Words {chunk[0]:X}+{chunk[1]:X} read from {chunk_epc} instead of {epc}")
+                if chunk_data[:1] != 'R':
+                    self._raise_tag_error(chunk_data[:1], f"error while reading words {chunk[0]:X}+{chunk[1]:X} of {chunk_epc}")
+                chunk_bytes = bytes.fromhex(chunk_data[1:])
+                if len(chunk_bytes) != chunk[1] * 2:
+                    raise UnexpectedReaderResponseException(f"Expected {chunk[1]} words, received {res}")
+            except (TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException, RuntimeWarning, ValueError) as e:
+                print(f"Chunk {chunk} failed: {e}") if self.debug else None
+                retry_or_fail(chunk, e)
+                continue
+            offset = (chunk[0] - address) * 2
+            data[offset:offset + len(chunk_bytes)] = chunk_bytes
 
-            return parsed_epc, data #bytes.fromhex(res).decode('utf-8')
+        if not tag_answered:
+            return None
+        if failures:
+            failed_ranges = sorted(failures)
+            raise TagMemoryPartialReadException(
+                f"Failed to read words {', '.join(f'{start:X}+{words:X}' for start, words in failed_ranges)} of {epc}",
+                epc, bytes(data), failed_ranges, [failures[chunk] for chunk in failed_ranges])
+        return epc, bytes(data)
 
-    def read_multi_tag_memory_multiband(self, bank: EPCMemoryBank, address: int, length: int, slot_q:int|None=None) -> Generator[tuple[str, str], None, None]:
+    def read_multi_tag_memory_multiband(self, bank: EPCMemoryBank, address: int, length: int, slot_q: int | AdaptiveQController | None = None, tag_filter: TagFilter | None = None) -> Generator[tuple[str, str], None, None]:
         """
         Read tag memory, multiband, multi-tag. Returns EPC & data
         slot_q: EPCglobal Class 1 Gen 2 ALOHA Anti-collision number of slots/Q-value that can be replied on. Designed for robust tag counting. Read: https://koreascience.kr/article/JAKO200911764893096.pdf
+            Or an AdaptiveQController choosing it from previous rounds.
         bank: reserved/EPC/TID/User
         address: word address: 0-> 3FFF
         length: read word length: 1->1E
+        tag_filter: only yield the memory of matching EPCs, after sending its select (see TagFilter), cleared as
+            by read_many_tag_id
         """
         assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
         assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
 
-        slot_q = hex(slot_q)[2:].upper() if slot_q is not None else ''
+        slot_q, q_controller = self._slot_q_argument(slot_q)
 
-        for res in self.send_command_and_get_response_until(f"U{slot_q},R{bank.value},{address},{length}", ""):
-            if res == "":
-                continue
+        reads = self._read_inventory_round(f"U{slot_q},R{bank.value},{address:X},{length:X}", self._parse_tag_memory_response, q_controller)
+        if tag_filter is None:
+            yield from reads
+            return
+        yield from self._filtered_round(reads, tag_filter, lambda tag: tag_filter.matches(tag[0]))
+
+    def read_multi_tag_memory_reads(self, bank: EPCMemoryBank, address: int, length: int, slot_q: int | AdaptiveQController | None = None, tag_filter: TagFilter | None = None) -> Generator[TagRead, None, None]:
+        """
+        read_multi_tag_memory_multiband returning compact TagRead records, with the memory in TagRead.data
+        tag_filter: matched against the EPC bytes, as by read_many_tag_reads
+        """
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
+
+        slot_q, q_controller = self._slot_q_argument(slot_q)
+
+        reads = self._read_inventory_round_frames(f"U{slot_q},R{bank.value},{address:X},{length:X}", q_controller)
+        if tag_filter is None:
+            yield from reads
+            return
+        matches = tag_filter.bytes_matcher()
+        yield from self._filtered_round(reads, tag_filter, lambda read: matches(read.epc))
+
+    ####################################################################
+    # Tag Write Operations
+    ####################################################################
+
+    @staticmethod
+    def _build_select_command(bank: EPCMemoryBank, bit_address: int, bit_length: int, mask: str) -> str:
+        assert 0 <= bit_address <= 0x3FFF, "Bit address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= bit_length <= 0x60, "Bit length must be between 1 and 96 (0x60)"
+        assert len(mask) * 4 >= bit_length, "Mask is shorter than bit length"
+        return f"T{bank.value},{bit_address:X},{bit_length:X},{mask[:(bit_length + 3) // 4]}"
+
+    @classmethod
+    def _build_tag_select_command(cls, tag_id: str, bank: EPCMemoryBank = EPCMemoryBank.EPC) -> str:
+        """
+        Select of a tag by its EPC (after CRC16 and PC, at bit 0x20) or TID, on up to the first 96 bits
+        """
+        bit_address = 0x20 if bank == EPCMemoryBank.EPC else 0
+        return cls._build_select_command(bank, bit_address, min(len(tag_id) * 4, 0x60), tag_id)
+
+    @staticmethod
+    def _build_write_command(bank: EPCMemoryBank, address: int, data: str) -> str:
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert len(data) % 4 == 0 and 1 <= len(data) // 4 <= 30, "Data must be 1 to 30 words (4 hex characters each)"
+        return f"W{bank.value},{address:X},{len(data) // 4:X},{data.upper()}"
+
+    @staticmethod
+    def _build_lock_command(policy: dict[LockField, LockAction]) -> str:
+        """
+        L<mask>,<action> of the Gen2 lock payload: fields missing from policy are left as they are
+        """
+        mask = 0
+        action = 0
+        for lock_field, lock_action in policy.items():
+            mask |= 0b11 << lock_field.value
+            action |= lock_action.value << lock_field.value
+        return f"L{mask:03X},{action:03X}"
+
+    @staticmethod
+    def _parse_access_response(command: str, res: str | None):
+        """
+        Raise on anything but a successful W/L/K/T/P response (stripped, echo included).
+        Error codes go through raise_exception_from_code, W may report the words written as Z<nn>.
+        """
+        if res is None:
+            raise UnexpectedReaderResponseException(f"No response to {command}")
+        if res == 'X':
+            raise ReaderCommandNotSupportedException(f"RFID Reader does not understand {command}")
+        if res[0] != command[0]:
+            raise_exception_from_code(res[0], f"response {res} while executing command {command}")
+            raise UnexpectedReaderResponseException(f"RFID Reader returned unexpected response for {command}: {res}")
+        if command[0] in 'WLKR' and len(res) == 1:
+            raise TagNotFoundException(f"No tag in RF field for {command}")
+        if command[0] == 'W' and res[1] == 'Z':
+            words = int(res[2:4], 16)
+            if words < int(command.split(',')[2], 16):
+                raise TagGenericException(f"Only {words} words written by {command}")
+
+    def select_tag(self, bank: EPCMemoryBank, bit_address: int, bit_length: int, mask: str):
+        """
+        Select the tags matching mask for the following R/W/L/K commands (and inventories, on firmware applying
+        T to them, see TagFilter)
+        bank: reserved/EPC/TID/User
+        bit_address: start bit address: 0-> 3FFF (EPC starts at bit 0x20 of the EPC bank)
+        bit_length: 1->60 (hex, 96 bits)
+        mask: hex bits to match, left aligned
+        """
+        command = self._build_select_command(bank, bit_address, bit_length, mask)
+        self._parse_access_response(command, self.send_commands_pipelined([command])[0])
+
+    def select_tag_id(self, tag_id: str, bank: EPCMemoryBank = EPCMemoryBank.EPC):
+        """
+        Select one tag by EPC (default) or TID for the following R/W/L/K commands
+        """
+        command = self._build_tag_select_command(tag_id, bank)
+        self._parse_access_response(command, self.send_commands_pipelined([command])[0])
+
+    def clear_select(self):
+        """
+        Select every tag again, undoing select_tag/select_tag_id (on firmware applying T to inventories, a select
+        left in force would filter every later round)
+        """
+        self._parse_access_response(CLEAR_SELECT_COMMAND, self.send_commands_pipelined([CLEAR_SELECT_COMMAND])[0])
+
+    def _run_access_command(self, command: str, password: int | None) -> bool:
+        """
+        Run a W/L command, after the one time access password P if given, in one round-trip.
+        Returns False if no tag is in the RF field.
+        """
+        commands = [command] if password is None else [f"P{password:08X}", command]
+        responses = self.send_commands_pipelined(commands)
+        try:
+            for sent, res in zip(commands, responses):
+                if self.metrics is not None and res and res[0] not in (sent[0], 'X'):
+                    self.metrics.tag_error(res[0])
+                self._parse_access_response(sent, res)
+        except TagNotFoundException:
+            return False
+        return True
+
+    def write_tag_memory(self, bank: EPCMemoryBank, address: int, data: str, password: int | None = None) -> bool:
+        """
+        Write tag memory (of the selected tag, see select_tag_id). Returns False if no tag is in the RF field.
+        bank: reserved/EPC/TID/User
+        address: word address: 0-> 3FFF
+        data: hex, 1->1E words
+        password: access password, needed for password locked banks
+        """
+        return self._run_access_command(self._build_write_command(bank, address, data), password)
 
-            res = res.split(',')
-            epc = res[0]
-            parsed_epc = self._parse_tag_id_response(epc)
-            data = ','.join(res[1:])
-            # Raise error on communication with RFID error
-            if data[0] != 'R':
-                raise_exception_from_code(data[0], f"error while reading {parsed_epc}")
-            data = data[1:] # remove leading R, since command is Q,R and the R is echoed
+    def lock_tag(self, policy: dict[LockField, LockAction], password: int | None = None) -> bool:
+        """
+        Lock or unlock memory banks and passwords of the (selected) tag. Returns False if no tag is in the RF field.
 
-            yield (parsed_epc, data)
+        lock_tag({LockField.EPC: LockAction.LOCK, LockField.ACCESS_PASSWORD: LockAction.LOCK}, password=0x12345678)
+        """
+        return self._run_access_command(self._build_lock_command(policy), password)
+
+    def kill_tag(self, password: int, recommissioning: int = 0) -> bool:
+        """
+        Permanently disable the (selected) tag. Returns False if no tag is in the RF field.
+        password: kill password, non zero
+        recommissioning: 0->7
+        """
+        assert 0 <= recommissioning <= 7, "Recommissioning must be between 0 and 7"
+        return self._run_access_command(f"K{password:08X},{recommissioning:X}", None)
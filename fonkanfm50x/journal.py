@@ -0,0 +1,514 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Generator, Iterable, NamedTuple, TypeVar
+
+from .tagread import TagRead
+
+T = TypeVar('T')
+
+SEGMENT_MAGIC = b'FM50XJNL'
+INDEX_MAGIC = b'FM50XIDX'
+JOURNAL_VERSION = 1
+# magic, version, EPC bytes, data bytes, segment number, created (wall clock)
+SEGMENT_HEADER = struct.Struct('<8sHBBQd')
+HEADER_SIZE = 64
+# monotonic, wall clock, reader id, PC word, EPC length, data length, CRC32; then the EPC and data fields
+RECORD_HEAD = struct.Struct('<dd8sHBBI')
+CRC_OFFSET = 28
+CRC_ZERO = b'\0\0\0\0'
+CRC_FIELD = struct.Struct('<I')
+INDEX_HEADER = struct.Struct('<8sQI')
+INDEX_BLOCK = struct.Struct('<dd128s')
+BLOOM_BITS = 1024
+
+class JournalRecord(NamedTuple):
+    timestamp: float # time.monotonic() of the read
+    wall_time: float # time.time() of the read
+    reader_id: str
+    pc: int
+    epc: bytes
+    data: bytes # memory payload, empty for EPC-only reads
+
+    @property
+    def epc_hex(self) -> str:
+        return self.epc.hex().upper()
+
+    @property
+    def data_hex(self) -> str:
+        return self.data.hex().upper()
+
+class _RecordLayout:
+    """
+    Fixed record: 32 byte head, EPC field of epc_bytes, data field of data_bytes
+    """
+
+    def __init__(self, epc_bytes: int, data_bytes: int):
+        if not 0 < epc_bytes <= 62 or not 0 <= data_bytes <= 255:
+            raise ValueError("EPC field must hold 1 to 62 bytes, the data field 0 to 255")
+        self.epc_bytes = epc_bytes
+        self.data_bytes = data_bytes
+        self.record = struct.Struct(f'<dd8sHBBI{epc_bytes}s{data_bytes}s')
+        self.size = self.record.size
+        self.data_offset = RECORD_HEAD.size + epc_bytes
+
+    def crc(self, buffer, offset: int) -> int:
+        # CRC32 of the record with its CRC field as zeros, as it is when the CRC is computed on append
+        view = memoryview(buffer)
+        crc = zlib.crc32(view[offset:offset + CRC_OFFSET])
+        return zlib.crc32(view[offset + CRC_OFFSET + 4:offset + self.size], zlib.crc32(CRC_ZERO, crc))
+
+def _bloom_bits(epc: bytes) -> int:
+    # crc32 rather than hash(): the blooms are persisted and hash() of bytes changes between runs
+    h = zlib.crc32(epc)
+    return (1 << (h & 0x3FF)) | (1 << ((h >> 10) & 0x3FF)) | (1 << ((h >> 20) & 0x3FF))
+
+class _Segment:
+    """
+    One journal file: a 64 byte header followed by fixed size records, and its sparse index:
+    per block of index_interval records the wall clock range and a bloom filter of the EPCs.
+    """
+
+    def __init__(self, path: Path, number: int, layout: _RecordLayout, interval: int):
+        self.path = path
+        self.number = number
+        self.layout = layout
+        self.interval = interval
+        self.count = 0
+        self.blocks: list[list] = [] # [wall min, wall max, EPC bloom] per block
+        self._map: mmap.mmap | None = None
+        self._mapped = 0
+
+    def add(self, wall: float, bloom_bits: int):
+        block = self.count // self.interval
+        if block == len(self.blocks):
+            self.blocks.append([wall, wall, bloom_bits])
+        else:
+            entry = self.blocks[block]
+            if wall < entry[0]:
+                entry[0] = wall
+            elif wall > entry[1]:
+                entry[1] = wall
+            entry[2] |= bloom_bits
+        self.count += 1
+
+    def add_many(self, wall: float, blooms: list[int]):
+        """
+        add() of records sharing one wall clock time, by their bloom bits
+        """
+        interval = self.interval
+        blocks = self.blocks
+        count = self.count
+        for bits in blooms:
+            block = count // interval
+            if block == len(blocks):
+                blocks.append([wall, wall, bits])
+            else:
+                entry = blocks[block]
+                if wall < entry[0]:
+                    entry[0] = wall
+                elif wall > entry[1]:
+                    entry[1] = wall
+                entry[2] |= bits
+            count += 1
+        self.count = count
+
+    @property
+    def index_path(self) -> Path:
+        return self.path.with_suffix('.idx')
+
+    def map(self) -> mmap.mmap:
+        """
+        Read-only mapping covering the records written so far
+        """
+        if self._map is None or self._mapped != self.count:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), HEADER_SIZE + self.count * self.layout.size, access=mmap.ACCESS_READ)
+            self._mapped = self.count
+        return self._map
+
+    def close(self):
+        self._map = None
+        self._mapped = 0
+
+    def save_index(self):
+        with open(self.index_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.count, self.interval))
+            for wall_min, wall_max, bloom in self.blocks:
+                f.write(INDEX_BLOCK.pack(wall_min, wall_max, bloom.to_bytes(BLOOM_BITS // 8, 'little')))
+
+    def load_index(self, records_on_disk: int) -> bool:
+        """
+        Load the saved index if it matches the records on disk (it does not after a crash)
+        """
+        try:
+            raw = self.index_path.read_bytes()
+        except FileNotFoundError:
+            return False
+        if len(raw) < INDEX_HEADER.size:
+            return False
+        magic, count, interval = INDEX_HEADER.unpack_from(raw)
+        n_blocks = -(-count // interval) if interval else 0
+        if magic != INDEX_MAGIC or count != records_on_disk or interval != self.interval \
+                or len(raw) != INDEX_HEADER.size + n_blocks * INDEX_BLOCK.size:
+            return False
+        self.blocks = [
+            [wall_min, wall_max, int.from_bytes(bloom, 'little')]
+            for wall_min, wall_max, bloom in INDEX_BLOCK.iter_unpack(raw[INDEX_HEADER.size:])
+        ]
+        self.count = count
+        return True
+
+    def rebuild_index(self) -> int:
+        """
+        Scan the records, checking their CRC, and truncate the file at the first torn one.
+        Returns the number of bytes cut off.
+        """
+        layout = self.layout
+        size = self.path.stat().st_size
+        self.count = 0
+        self.blocks = []
+        valid = 0
+        if size > HEADER_SIZE:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(HEADER_SIZE, size - layout.size + 1, layout.size):
+                    _, wall, _, _, epc_len, _, crc = RECORD_HEAD.unpack_from(mm, offset)
+                    if crc != layout.crc(mm, offset) or epc_len > layout.epc_bytes:
+                        break
+                    self.add(wall, _bloom_bits(mm[offset + RECORD_HEAD.size:offset + RECORD_HEAD.size + epc_len]))
+                    valid += 1
+        end = HEADER_SIZE + valid * layout.size
+        if size > end:
+            os.truncate(self.path, end)
+        return max(size - end, 0)
+
+class TagJournal:
+    """
+    Append-only binary journal of tag reads, for audit.
+
+    Records are fixed size: 32 bytes of timestamps, reader id, PC, lengths and CRC32, then an EPC field of
+    epc_bytes and a memory data field of data_bytes (64 bytes for a 96 bit EPC and a 6 word TID, the default).
+    They are appended to segment files of segment_records records. Appends are buffered and written in groups
+    (group_records records, or once group_interval seconds passed), with one fsync per group.
+    Queries by wall clock range and/or EPC skip blocks of index_interval records through a sparse index
+    (time range and EPC bloom filter per block) and search the segments through mmap.
+    The index of every segment is saved on close; after a crash the segments whose index does not match are
+    rescanned, and a torn record at their end is cut off.
+
+    Writing is slower than appending text lines (about 190k vs 380k reads/s with append(), the cost being the
+    Python work per record: packing, CRC32, bloom bits and index update). append_many() of a round of reads
+    does the same work in one loop and gets to about 270k reads/s. Records are only a little smaller than
+    text (64 vs 78 bytes); what the format buys is CRC checked records, crash recovery and indexed queries.
+
+    with FonkanUHF() as reader, TagJournal('reads', reader_id=reader.get_reader_id()) as journal:
+        for epc in journal.record_many(reader.read_many_tag_id()):
+            ...
+        for record in journal.query(start=time.time() - 3600, epc='E2801160600002098B2D0B7C'):
+            print(record)
+    """
+
+    def __init__(self,
+              directory: str | os.PathLike,
+              reader_id: str = '',
+              epc_bytes: int = 16,
+              data_bytes: int = 16,
+              segment_records: int = 1 << 19,
+              group_records: int = 256,
+              group_interval: float = 0.5,
+              fsync: bool = True,
+              index_interval: int = 256):
+        """
+        reader_id: default reader id of the records (get_reader_id(), 8 characters at most)
+        epc_bytes, data_bytes: record layout of a new journal. An existing journal keeps the layout it was created with.
+        segment_records: records per segment file (32 MiB with the default layout)
+        group_records, group_interval: commit (write + fsync) every group_records appends or group_interval seconds
+        fsync: False only writes the groups to the OS, faster but not crash safe
+        index_interval: records per sparse index block
+        """
+        self.directory = Path(directory)
+        self.reader_id = reader_id
+        self.segment_records = segment_records
+        self.group_records = group_records
+        self.group_interval = group_interval
+        self.fsync = fsync
+        self.index_interval = index_interval
+        self.recovered: dict[str, int] = {} # segment file -> bytes of torn records cut off when opening
+        self.layout = _RecordLayout(epc_bytes, data_bytes)
+        self._buffered = 0
+        self._last_commit = time.monotonic()
+        self._file = None
+        self._segments: list[_Segment] = []
+        self._open()
+        self._buffer = bytearray(group_records * self.layout.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self._segments)
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"segment-{number:08d}.fmj"
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directory.glob('segment-*.fmj')):
+            size = path.stat().st_size
+            if size < HEADER_SIZE:
+                # Crashed while creating it
+                path.unlink()
+                continue
+            with open(path, 'rb') as f:
+                magic, version, epc_bytes, data_bytes, number, _ = SEGMENT_HEADER.unpack_from(f.read(SEGMENT_HEADER.size))
+            if magic != SEGMENT_MAGIC or version != JOURNAL_VERSION:
+                raise ValueError(f"{path} is not a version {JOURNAL_VERSION} tag journal segment")
+            if (epc_bytes, data_bytes) != (self.layout.epc_bytes, self.layout.data_bytes):
+                if self._segments:
+                    raise ValueError(f"{path} has another record layout than the previous segments")
+                self.layout = _RecordLayout(epc_bytes, data_bytes)
+
+            segment = _Segment(path, number, self.layout, self.index_interval)
+            if (size - HEADER_SIZE) % self.layout.size or not segment.load_index((size - HEADER_SIZE) // self.layout.size):
+                cut = segment.rebuild_index()
+                if cut:
+                    self.recovered[path.name] = cut
+                segment.save_index()
+            self._segments.append(segment)
+
+        if not self._segments or self._segments[-1].count >= self.segment_records:
+            self._new_segment()
+        else:
+            self._file = open(self._segments[-1].path, 'ab', buffering=0)
+
+    def _new_segment(self):
+        number = self._segments[-1].number + 1 if self._segments else 0
+        path = self._segment_path(number)
+        header = SEGMENT_HEADER.pack(SEGMENT_MAGIC, JOURNAL_VERSION, self.layout.epc_bytes, self.layout.data_bytes, number, time.time())
+        with open(path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.flush()
+            os.fsync(f.fileno()) if self.fsync else None
+        self._segments.append(_Segment(path, number, self.layout, self.index_interval))
+        self._file = open(path, 'ab', buffering=0)
+
+    def _roll(self):
+        self.flush()
+        self._segments[-1].save_index()
+        self._file.close()
+        self._new_segment()
+
+    ####################################################################
+    # Writing
+    ####################################################################
+
+    def append(self, epc: bytes | str, data: bytes | str = b'', pc: int | None = None,
+               timestamp: float | None = None, wall_time: float | None = None, reader_id: str | None = None):
+        """
+        Journal one read. pc defaults to the PC word of an EPC of that length, timestamps to now.
+        """
+        if isinstance(epc, str):
+            epc = bytes.fromhex(epc)
+        if isinstance(data, str):
+            data = bytes.fromhex(data)
+        layout = self.layout
+        if len(epc) > layout.epc_bytes or len(data) > layout.data_bytes:
+            raise ValueError(f"This journal holds {layout.epc_bytes} bytes of EPC and {layout.data_bytes} bytes of data per read")
+        if pc is None:
+            pc = (len(epc) // 2) << 11
+        now = time.monotonic()
+        if timestamp is None:
+            timestamp = now
+        if wall_time is None:
+            wall_time = time.time()
+
+        segment = self._segments[-1]
+        if segment.count >= self.segment_records:
+            self._roll()
+            segment = self._segments[-1]
+        offset = self._buffered * layout.size
+        layout.record.pack_into(self._buffer, offset, timestamp, wall_time,
+                                (self.reader_id if reader_id is None else reader_id).encode('ascii'),
+                                pc, len(epc), len(data), 0, epc, data)
+        # The CRC field is still zero: one pass over the whole record
+        CRC_FIELD.pack_into(self._buffer, offset + CRC_OFFSET, zlib.crc32(memoryview(self._buffer)[offset:offset + layout.size]))
+        self._buffered += 1
+        segment.add(wall_time, _bloom_bits(epc))
+
+        if self._buffered == self.group_records or now - self._last_commit >= self.group_interval:
+            self.flush()
+
+    def append_many(self, reads: Iterable[TagRead | tuple[bytes | str, bytes | str] | bytes | str], reader_id: str | None = None) -> int:
+        """
+        Journal many reads in one call, faster than append() per read: EPCs, (EPC, data) tuples or TagRead, as
+        taken by record_many. All get the wall clock time of the call, and the reads other than TagRead its
+        monotonic time too. group_interval is checked once per call. Returns the number of reads journaled.
+        """
+        layout = self.layout
+        size = layout.size
+        epc_bytes = layout.epc_bytes
+        data_bytes = layout.data_bytes
+        pack_into = layout.record.pack_into
+        crc_into = CRC_FIELD.pack_into
+        crc32 = zlib.crc32
+        fromhex = bytes.fromhex
+        bloom_bits = _bloom_bits
+        buffer = self._buffer
+        view = memoryview(buffer)
+        group_records = self.group_records
+        segment_records = self.segment_records
+        encoded_reader_id = (self.reader_id if reader_id is None else reader_id).encode('ascii')
+        now = time.monotonic()
+        wall = time.time()
+
+        segment = self._segments[-1]
+        blooms: list[int] = [] # of the records not added to the segment index yet
+        buffered = self._buffered
+        appended = 0
+        try:
+            for read in reads:
+                if isinstance(read, TagRead):
+                    epc, data, pc, timestamp = read.epc, read.data, read.pc, read.timestamp
+                else:
+                    epc, data = read if isinstance(read, tuple) else (read, b'')
+                    if isinstance(epc, str):
+                        epc = fromhex(epc)
+                    if isinstance(data, str):
+                        data = fromhex(data)
+                    pc = (len(epc) // 2) << 11
+                    timestamp = now
+                if len(epc) > epc_bytes or len(data) > data_bytes:
+                    raise ValueError(f"This journal holds {epc_bytes} bytes of EPC and {data_bytes} bytes of data per read")
+
+                if buffered == group_records or segment.count + len(blooms) >= segment_records:
+                    segment.add_many(wall, blooms)
+                    blooms.clear()
+                    self._buffered = buffered
+                    if segment.count >= segment_records:
+                        self._roll()
+                        segment = self._segments[-1]
+                    else:
+                        self.flush()
+                    buffered = 0
+                offset = buffered * size
+                pack_into(buffer, offset, timestamp, wall, encoded_reader_id, pc, len(epc), len(data), 0, epc, data)
+                crc_into(buffer, offset + CRC_OFFSET, crc32(view[offset:offset + size]))
+                buffered += 1
+                blooms.append(bloom_bits(epc))
+                appended += 1
+        finally:
+            segment.add_many(wall, blooms)
+            self._buffered = buffered
+            view.release()
+
+        if self._buffered == group_records or now - self._last_commit >= self.group_interval:
+            self.flush()
+        return appended
+
+    def append_read(self, read: TagRead, reader_id: str | None = None):
+        self.append(read.epc, read.data, read.pc, read.timestamp, reader_id=reader_id)
+
+    def record_many(self, reads: Iterable[T], reader_id: str | None = None) -> Generator[T, None, None]:
+        """
+        Journal the reads of an inventory round while passing them through:
+        EPCs (read_many_tag_id), (EPC, data) tuples (read_multi_tag_memory_multiband) or TagRead
+        """
+        for read in reads:
+            if isinstance(read, TagRead):
+                self.append_read(read, reader_id)
+            elif isinstance(read, tuple):
+                self.append(read[0], read[1], reader_id=reader_id)
+            else:
+                self.append(read, reader_id=reader_id)
+            yield read
+
+    def flush(self, sync: bool | None = None):
+        """
+        Commit the buffered records: one write, and one fsync unless disabled
+        """
+        if self._buffered:
+            self._file.write(memoryview(self._buffer)[:self._buffered * self.layout.size])
+            self._buffered = 0
+            os.fsync(self._file.fileno()) if (self.fsync if sync is None else sync) else None
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._segments[-1].save_index()
+        self._file.close()
+        self._file = None
+        for segment in self._segments:
+            segment.close()
+
+    ####################################################################
+    # Queries
+    ####################################################################
+
+    def query(self, start: float | None = None, end: float | None = None, epc: bytes | str | None = None,
+              reader_id: str | None = None) -> Generator[JournalRecord, None, None]:
+        """
+        Records with start <= wall_time <= end (either open), of one EPC and/or reader, in journal order.
+        Only matching records are decoded. Their epc and data are copied out of the mapping (a few dozen bytes),
+        so records stay valid after the journal grows, rotates or is closed.
+        """
+        if self._buffered:
+            self.flush(sync=False)
+        if isinstance(epc, str):
+            epc = bytes.fromhex(epc)
+        bloom = _bloom_bits(epc) if epc is not None else 0
+        reader = reader_id.encode('ascii').ljust(8, b'\0') if reader_id is not None else None
+        unpack = RECORD_HEAD.unpack_from
+        layout = self.layout
+        size = layout.size
+        epc_offset = RECORD_HEAD.size
+
+        for segment in self._segments:
+            mm = None
+            for block, (wall_min, wall_max, block_bloom) in enumerate(segment.blocks):
+                if (start is not None and wall_max < start) or (end is not None and wall_min > end) \
+                        or block_bloom & bloom != bloom:
+                    continue
+                if mm is None:
+                    mm = segment.map()
+                first = HEADER_SIZE + block * segment.interval * size
+                last = HEADER_SIZE + min((block + 1) * segment.interval, segment.count) * size
+                if epc is None:
+                    offsets = range(first, last, size)
+                else:
+                    offsets = self._find_epc(mm, epc, first, last)
+                for offset in offsets:
+                    timestamp, wall, record_reader, pc, epc_len, data_len, _ = unpack(mm, offset)
+                    if (start is not None and wall < start) or (end is not None and wall > end):
+                        continue
+                    if reader is not None and record_reader != reader:
+                        continue
+                    if epc is not None and epc_len != len(epc):
+                        continue
+                    yield JournalRecord(
+                        timestamp, wall, record_reader.rstrip(b'\0').decode('ascii'), pc,
+                        mm[offset + epc_offset:offset + epc_offset + epc_len],
+                        mm[offset + layout.data_offset:offset + layout.data_offset + data_len],
+                    )
+
+    def _find_epc(self, mm: mmap.mmap, epc: bytes, first: int, last: int) -> Generator[int, None, None]:
+        """
+        Offsets of the records in [first, last) whose EPC field starts with epc, searched in the mapping itself
+        """
+        size = self.layout.size
+        position = mm.find(epc, first, last)
+        while position >= 0:
+            in_record = (position - HEADER_SIZE) % size
+            if in_record == RECORD_HEAD.size:
+                yield position - in_record
+                position = mm.find(epc, position - in_record + size, last)
+            else:
+                # Matched inside another field
+                position = mm.find(epc, position + 1, last)
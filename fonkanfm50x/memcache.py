@@ -0,0 +1,209 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generator
+
+from .interface import FonkanUHF, CLEAR_SELECT_COMMAND
+from .qcontrol import AdaptiveQController
+from .types import EPCMemoryBank
+from .exceptions import ReaderCommandNotSupportedException, TagGenericException, UnexpectedReaderResponseException
+
+class TagMemoryCache:
+    """
+    Tag memory read cache keyed by (EPC, bank, address, length), for tags staying in the field for many rounds.
+
+    read_many() runs a plain U inventory and only reads the memory of EPCs not read within the last ttl seconds
+    (select by EPC then R, pipelined), instead of reading it from every tag on every round like
+    read_multi_tag_memory_multiband. Entries are kept in least recently used order and capped at max_entries.
+    Invalidate the EPC after writing to a tag. The miss reads end with a select of every tag, so they do not
+    filter later rounds on firmware applying T to inventories.
+
+    cache = TagMemoryCache(reader, ttl=300)
+    while True:
+        for epc, tid in cache.read_many(EPCMemoryBank.TID, 0, 6):
+            print(epc, tid)
+    """
+
+    def __init__(self,
+              reader: FonkanUHF | None = None,
+              ttl: float = 300,
+              max_entries: int = 10_000,
+              pipeline_tags: int = 4,
+              clock: Callable[[], float] = time.monotonic):
+        """
+        reader: connected reader used by read_many/read_one (not needed for get/put only)
+        ttl: seconds a cached read stays valid
+        max_entries: hard cap on cached reads. When full, the least recently used one is dropped
+        pipeline_tags: tags whose select + R are written at once on misses
+        clock: time source for all timestamps
+        """
+        assert ttl > 0, "ttl must be positive"
+        assert max_entries > 0, "max_entries must be positive"
+        assert pipeline_tags > 0, "pipeline_tags must be positive"
+        self.reader = reader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pipeline_tags = pipeline_tags
+        self.clock = clock
+        # (epc, bank, address, length) -> (data, stored at), least recently used first
+        self._entries: OrderedDict[tuple[str, EPCMemoryBank, int, int], tuple[str, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0 # dropped because the cache was full
+        self.expirations = 0 # found older than ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, epc: str, bank: EPCMemoryBank, address: int, length: int, now: float | None = None) -> str | None:
+        """
+        Cached data, or None on a miss (never read, expired or evicted)
+        """
+        key = (epc, bank, address, length)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if (self.clock() if now is None else now) - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def put(self, epc: str, bank: EPCMemoryBank, address: int, length: int, data: str, now: float | None = None):
+        key = (epc, bank, address, length)
+        if key in self._entries:
+            del self._entries[key]
+        elif len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = (data, self.clock() if now is None else now)
+
+    def invalidate(self, epc: str | None = None, bank: EPCMemoryBank | None = None) -> int:
+        """
+        Drop the cached reads of epc (all EPCs if None), of bank only if given. Returns the number dropped.
+        """
+        if epc is None and bank is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+        keys = [key for key in self._entries if (epc is None or key[0] == epc) and (bank is None or key[1] == bank)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    ####################################################################
+    # Reads through the cache
+    ####################################################################
+
+    def _read_misses(self, epcs: list[str], bank: EPCMemoryBank, address: int, length: int) -> Generator[tuple[str, str | Exception], None, None]:
+        """
+        Select each EPC and read its memory, pipeline_tags tags per round-trip. Yields (EPC, data or error).
+        """
+        read_command = f"R{bank.value},{address:X},{length:X}"
+        cleared = not epcs
+        try:
+            for start in range(0, len(epcs), self.pipeline_tags):
+                batch = epcs[start:start + self.pipeline_tags]
+                commands = []
+                for epc in batch:
+                    commands += [FonkanUHF._build_tag_select_command(epc), read_command]
+                last = start + self.pipeline_tags >= len(epcs)
+                # The last select must not stay in force: written with the last batch, it costs no round-trip
+                responses = self.reader.send_commands_pipelined(commands + [CLEAR_SELECT_COMMAND] if last else commands)
+                if last:
+                    try:
+                        FonkanUHF._parse_access_response(CLEAR_SELECT_COMMAND, responses[-1])
+                        cleared = True
+                    except (TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException) as e:
+                        # Sent again by clear_select below, which raises if it fails too
+                        print(f"Clearing the select failed: {e}") if self.reader.debug else None
+                for i, epc in enumerate(batch):
+                    try:
+                        for command, res in zip(commands[2 * i:2 * i + 2], responses[2 * i:2 * i + 2]):
+                            FonkanUHF._parse_access_response(command, res)
+                    except (TagGenericException, UnexpectedReaderResponseException) as e:
+                        # Tag gone since the inventory, or its memory could not be read
+                        yield epc, e
+                    else:
+                        yield epc, res[1:]
+        finally:
+            if not cleared:
+                # Closed early, the link failed or the final clear was not acknowledged
+                self.reader.clear_select()
+
+    def read_many(self, bank: EPCMemoryBank, address: int, length: int, slot_q: int | AdaptiveQController | None = None) -> Generator[tuple[str, str], None, None]:
+        """
+        read_multi_tag_memory_multiband through the cache: one U inventory round, cached EPCs are yielded as they
+        are inventoried, the others once their memory has been read after the round.
+        Errors (of the round or of a miss read) are raised after everything else was yielded.
+        """
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
+
+        deferred_error: Exception | None = None
+        seen: set[str] = set()
+        misses: list[str] = []
+        try:
+            for epc in self.reader.read_many_tag_id(slot_q):
+                if epc in seen:
+                    continue
+                seen.add(epc)
+                data = self.get(epc, bank, address, length)
+                if data is None:
+                    misses.append(epc)
+                else:
+                    yield epc, data
+        except (TagGenericException, RuntimeWarning) as e:
+            # Collisions and CRC failures of the round: the tags read are still handled
+            deferred_error = e
+
+        for epc, data in self._read_misses(misses, bank, address, length):
+            if isinstance(data, Exception):
+                deferred_error = deferred_error or data
+                continue
+            self.put(epc, bank, address, length, data)
+            yield epc, data
+
+        if deferred_error is not None:
+            raise deferred_error
+
+    def read_one(self, bank: EPCMemoryBank, address: int, length: int) -> tuple[str, str] | None:
+        """
+        read_tag_memory_multiband through the cache: EPC & data of one tag, None if no tag is in the field
+        """
+        assert 0 <= address <= 0x3FFF, "Address must be between 0 and 16383 (0x3FFF)"
+        assert 1 <= length <= 30, "Length must be between 1 and 30 words (2-60 bytes)"
+
+        epc = self.reader.read_tag_id()
+        if epc is None:
+            return None
+        data = self.get(epc, bank, address, length)
+        if data is None:
+            _, data = next(self._read_misses([epc], bank, address, length))
+            if isinstance(data, Exception):
+                raise data
+            self.put(epc, bank, address, length, data)
+        return epc, data
@@ -0,0 +1,250 @@
+from bisect import bisect_left
+from collections import Counter, deque
+import time
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5) # seconds
+TAGS_PER_ROUND_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class Histogram:
+    """
+    Fixed bucket histogram, Prometheus style: counts[i] holds the observations <= bounds[i] and above the
+    previous bound, the last count the ones above every bound.
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """
+        (upper bound, observations <= bound), ending with (inf, count)
+        """
+        buckets = []
+        total = 0
+        for bound, count in zip((*self.bounds, float('inf')), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Upper bound of the bucket holding the q-quantile (None without observations)
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float('inf')
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {_format_bound(bound): total for bound, total in self.cumulative()},
+        }
+
+class ReaderMetrics:
+    """
+    Opt-in instrumentation of a FonkanUHF: latency per command letter (time to the first response frame),
+    bytes in and out, retries ('X' answers), timeouts, CRC failures, tag error codes and inventory rounds.
+
+    Pass one to FonkanUHF(metrics=ReaderMetrics()). Without it the reader only checks `self.metrics is not None`.
+    Recording is a few integer updates per frame and takes no lock: a reader is used from one thread, and a
+    snapshot taken from another thread may be off by the frame being recorded.
+
+    metrics = ReaderMetrics()
+    with FonkanUHF(metrics=metrics) as reader:
+        ...
+    print(metrics.snapshot())
+    print(metrics.to_prometheus({'reader': 'dock-1'}))
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.latency: dict[str, Histogram] = {}
+        self.retries: Counter[str] = Counter()
+        self.timeouts: Counter[str] = Counter()
+        self.tag_errors: Counter[str] = Counter()
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.frames_in = 0
+        self.crc_failures = 0
+        self.rounds = 0
+        self.round_tags = 0
+        self.round_duration = Histogram(LATENCY_BUCKETS)
+        self.tags_per_round = Histogram(TAGS_PER_ROUND_BUCKETS)
+        # (command letter, time written) of commands waiting for their first response
+        self._pending: deque[tuple[str, float]] = deque()
+        self._last_letter = '?'
+
+    def __repr__(self):
+        return f"ReaderMetrics(commands={sum(h.count for h in self.latency.values())}, rounds={self.rounds})"
+
+    ####################################################################
+    # Recording, called by the reader
+    ####################################################################
+
+    def command_sent(self, command: str, n_bytes: int):
+        self.bytes_out += n_bytes
+        self._last_letter = command[0] if command else '?'
+        self._pending.append((self._last_letter, self.clock()))
+
+    def frame_received(self, frame: bytes | None):
+        """
+        A response frame (without <LF>, <CR><LF>), or None when the read timed out
+        """
+        if frame is None:
+            letter = self._pending.popleft()[0] if self._pending else self._last_letter
+            self.timeouts[letter] += 1
+            return
+        self.bytes_in += len(frame) + 3
+        self.frames_in += 1
+        if self._pending:
+            letter, sent = self._pending.popleft()
+            histogram = self.latency.get(letter)
+            if histogram is None:
+                histogram = self.latency[letter] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(self.clock() - sent)
+
+    def discard_pending(self):
+        """
+        The line was drained: responses of the commands still pending will not be matched
+        """
+        self._pending.clear()
+
+    def retry(self, command: str):
+        self.retries[command[0]] += 1
+
+    def crc_failure(self):
+        self.crc_failures += 1
+
+    def tag_error(self, code: str):
+        self.tag_errors[code] += 1
+
+    def inventory_round(self, tags: int, duration: float):
+        self.rounds += 1
+        self.round_tags += tags
+        self.round_duration.observe(duration)
+        self.tags_per_round.observe(tags)
+
+    ####################################################################
+    # Export
+    ####################################################################
+
+    def reset(self):
+        self.__init__(self.clock)
+
+    def snapshot(self) -> dict:
+        inventory_time = self.round_duration.sum
+        return {
+            'uptime': self.clock() - self.started,
+            'commands': {
+                letter: {**histogram.summary(), 'retries': self.retries[letter], 'timeouts': self.timeouts[letter]}
+                for letter, histogram in sorted(self.latency.items())
+            },
+            'retries': dict(self.retries),
+            'timeouts': dict(self.timeouts),
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'frames_in': self.frames_in,
+            'crc_failures': self.crc_failures,
+            'tag_errors': dict(self.tag_errors),
+            'inventory': {
+                'rounds': self.rounds,
+                'tags': self.round_tags,
+                'tags_per_round': self.round_tags / self.rounds if self.rounds else None,
+                'rounds_per_second': self.rounds / inventory_time if inventory_time > 0 else None,
+                'round_duration': self.round_duration.summary(),
+                'tags_per_round_histogram': self.tags_per_round.summary(),
+            },
+        }
+
+    def _families(self, labels: dict[str, str] | None, prefix: str) -> list[tuple[str, str, str, list[str]]]:
+        """
+        Prometheus metric families: (name, type, help, sample lines)
+        """
+        def label_text(extra: dict[str, str] | None = None) -> str:
+            merged = {**(labels or {}), **(extra or {})}
+            if not merged:
+                return ''
+            return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in merged.items()) + '}'
+
+        def histogram_lines(name: str, histogram: Histogram, extra: dict[str, str] | None = None) -> list[str]:
+            lines = [
+                f"{name}_bucket{label_text({**(extra or {}), 'le': _format_bound(bound)})} {total}"
+                for bound, total in histogram.cumulative()
+            ]
+            lines.append(f"{name}_sum{label_text(extra)} {histogram.sum!r}")
+            lines.append(f"{name}_count{label_text(extra)} {histogram.count}")
+            return lines
+
+        def counter_lines(name: str, values: dict[str, int], label: str) -> list[str]:
+            return [f"{name}{label_text({label: key})} {value}" for key, value in sorted(values.items())]
+
+        families = [
+            (f"{prefix}_command_duration_seconds", 'histogram', "Time from writing a command to its first response frame",
+                [line for letter, latency in sorted(self.latency.items())
+                 for line in histogram_lines(f"{prefix}_command_duration_seconds", latency, {'command': letter})]),
+            (f"{prefix}_command_retries_total", 'counter', "Commands resent after an 'X' answer",
+                counter_lines(f"{prefix}_command_retries_total", self.retries, 'command')),
+            (f"{prefix}_command_timeouts_total", 'counter', "Response reads that timed out",
+                counter_lines(f"{prefix}_command_timeouts_total", self.timeouts, 'command')),
+            (f"{prefix}_tag_errors_total", 'counter', "Tag error codes answered by the reader",
+                counter_lines(f"{prefix}_tag_errors_total", self.tag_errors, 'code')),
+        ]
+        for name, description, value in (
+                ('bytes_sent_total', "Bytes written to the reader", self.bytes_out),
+                ('bytes_received_total', "Bytes of response frames read from the reader", self.bytes_in),
+                ('crc_failures_total', "Tag replies failing the CRC16 check", self.crc_failures),
+                ('inventory_rounds_total', "Inventory rounds", self.rounds),
+                ('inventory_tags_total', "Tags read in inventory rounds", self.round_tags)):
+            families.append((f"{prefix}_{name}", 'counter', description, [f"{prefix}_{name}{label_text()} {value}"]))
+        families.append((f"{prefix}_inventory_round_duration_seconds", 'histogram', "Duration of inventory rounds",
+                         histogram_lines(f"{prefix}_inventory_round_duration_seconds", self.round_duration)))
+        families.append((f"{prefix}_inventory_tags_per_round", 'histogram', "Tags read per inventory round",
+                         histogram_lines(f"{prefix}_inventory_tags_per_round", self.tags_per_round)))
+        return families
+
+    def to_prometheus(self, labels: dict[str, str] | None = None, prefix: str = 'fonkanfm50x') -> str:
+        """
+        Prometheus text exposition format. labels are added to every sample (e.g. {'reader': 'dock-1'}).
+        """
+        return to_prometheus([(self, labels)], prefix)
+
+def to_prometheus(readers: list[tuple[ReaderMetrics, dict[str, str] | None]], prefix: str = 'fonkanfm50x') -> str:
+    """
+    Prometheus text exposition of several readers, each with its own labels, samples grouped per metric
+
+    to_prometheus([(dock_metrics, {'reader': 'dock'}), (gate_metrics, {'reader': 'gate'})])
+    """
+    merged: dict[str, tuple[str, str, list[str]]] = {}
+    for metrics, labels in readers:
+        for name, metric_type, description, samples in metrics._families(labels, prefix):
+            merged.setdefault(name, (metric_type, description, []))[2].extend(samples)
+    lines: list[str] = []
+    for name, (metric_type, description, samples) in merged.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
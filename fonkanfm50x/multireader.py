@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+import serial
+from typing import Iterable, Iterator, NamedTuple
+
+from .interface import FonkanUHF
+from .exceptions import TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException
+
+class TagEvent(NamedTuple):
+    reader_id: str
+    epc: str
+    timestamp: float
+
+class MultiReaderInventory:
+    """
+    Run inventory on several FM50x readers at once and merge their tags into one stream.
+    Each reader gets its own worker thread, which also runs its (slow) connection setup,
+    so readers connect in parallel and a stalled port only stalls its own worker.
+
+    readers = [FonkanUHF(serial_port='/dev/ttyACM0'), FonkanUHF(serial_port='/dev/ttyACM1')]
+    with MultiReaderInventory(readers) as inventory:
+        for event in inventory:
+            print(event.reader_id, event.epc, event.timestamp)
+    """
+
+    def __init__(self,
+              readers: Iterable[FonkanUHF],
+              slot_q: int | None = None,
+              max_pending: int = 1024,
+              reconnect_delay: float | None = 1.0):
+        """
+        readers: FonkanUHF instances, not yet entered. The manager enters and exits them.
+        slot_q: Q-value passed to read_many_tag_id
+        max_pending: bound of the merged event queue. Workers block when it is full (backpressure)
+        reconnect_delay: seconds before reconnecting a reader whose serial port failed, None to give up on it
+        """
+        self.readers = list(readers)
+        self.slot_q = slot_q
+        self.reconnect_delay = reconnect_delay
+        self.events: queue.Queue[TagEvent] = queue.Queue(maxsize=max_pending)
+        self.reader_ids: dict[str, str] = {} # serial port -> reader id
+        self.errors: dict[str, BaseException] = {} # serial port -> last error
+        self._stop = threading.Event()
+        self._workers: list[threading.Thread] = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def start(self):
+        self._stop.clear()
+        self._workers = [
+            threading.Thread(target=self._run_reader, args=(reader,), name=f"fm50x-{reader.serial_port}", daemon=True)
+            for reader in self.readers
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return any(worker.is_alive() for worker in self._workers)
+
+    def __iter__(self) -> Iterator[TagEvent]:
+        """
+        Merged tag stream of all readers. Ends once every worker has stopped.
+        """
+        while True:
+            try:
+                yield self.events.get(timeout=0.1)
+            except queue.Empty:
+                if not self.running:
+                    return
+
+    def get(self, timeout: float | None = None) -> TagEvent | None:
+        """
+        Next merged event, or None if none arrived within timeout
+        """
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    ####################################################################
+    # Worker
+    ####################################################################
+
+    def _put(self, event: TagEvent) -> bool:
+        # Block while the consumer is behind, but keep checking for stop()
+        while not self._stop.is_set():
+            try:
+                self.events.put(event, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_reader(self, reader: FonkanUHF):
+        while not self._stop.is_set():
+            try:
+                with reader:
+                    reader_id = reader.get_reader_id()
+                    self.reader_ids[reader.serial_port] = reader_id
+                    self.errors.pop(reader.serial_port, None)
+                    self._inventory(reader, reader_id)
+                    return
+            except (serial.SerialException, OSError, RuntimeError, UnexpectedReaderResponseException, ReaderCommandNotSupportedException,
+                    ValueError, IndexError) as e:
+                # Port unplugged, reader not answering (on any baud rate), or a garbled frame failing to parse
+                self.errors[reader.serial_port] = e
+                print(f"Reader on {reader.serial_port} failed: {e}") if reader.debug else None
+                if self.reconnect_delay is None or self._stop.wait(self.reconnect_delay):
+                    return
+
+    def _inventory(self, reader: FonkanUHF, reader_id: str):
+        while not self._stop.is_set():
+            try:
+                for epc in reader.read_many_tag_id(self.slot_q):
+                    if not self._put(TagEvent(reader_id, epc, time.time())):
+                        return
+            except (TagGenericException, RuntimeWarning) as e:
+                # Collisions and CRC failures only lose the current round
+                print(f"Error reading tag on {reader_id}: {e}") if reader.debug else None
+                continue
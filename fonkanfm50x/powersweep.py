@@ -0,0 +1,158 @@
+import time
+from typing import Generator, Iterable
+
+from .interface import FonkanUHF
+from .qcontrol import AdaptiveQController
+from .types import RFIDRegion
+from .exceptions import TagGenericException
+
+class PowerSweep:
+    """
+    Inventory cycling through power levels (and optionally regions): high power reaches the far and
+    shadowed tags of a dense pallet, low power only the tags close to the antenna.
+
+    Each cycle visits every level. Rounds are repeated at a level while they are productive, that is while
+    they find EPCs not read yet in the cycle or read a tag at a lower power than ever before, and stop after
+    patience unproductive rounds (or max_rounds). Once the tags in the field are known, that is patience
+    rounds per level. After each cycle the levels are ordered by the EPCs per second they found first in
+    the cycle (smoothed over cycles), so the most productive level runs first.
+    Power is only set when it changes, which is what a sweep costs besides the rounds.
+
+    min_power holds the lowest level each EPC was read at: a cheap proximity estimate (lower is closer).
+
+    sweep = PowerSweep(reader, levels=[25, 18, 10, 3])
+    for epc, power in sweep.run(cycles=5):
+        print(epc, power)
+    print(sweep.min_power)
+    """
+
+    def __init__(self,
+              reader: FonkanUHF,
+              levels: Iterable[int] = (25, 20, 15, 10, 5, 0),
+              regions: Iterable[RFIDRegion] | None = None,
+              slot_q: int | AdaptiveQController | None = None,
+              patience: int = 1,
+              max_rounds: int = 20,
+              smoothing: float = 0.5,
+              reorder: bool = True):
+        """
+        levels: power levels in dB (-2 ~ 25) to sweep, in their initial order
+        regions: regions to sweep every level in, one after the other. Only pass regions legal where the reader is used.
+            None keeps the reader's region.
+        slot_q: Q-value of the rounds, or an AdaptiveQController
+        patience: unproductive rounds after which the sweep moves to the next level
+        max_rounds: rounds at a level per cycle, at most
+        smoothing: weight of the latest cycle in each level's yield average
+        reorder: order the levels by yield after each cycle, otherwise keep the given order
+        """
+        levels = list(dict.fromkeys(levels))
+        assert levels, "At least one power level is needed"
+        assert all(-2 <= level <= 25 for level in levels), "Power levels must be between -2 and 25 dB"
+        assert patience >= 1 and max_rounds >= patience, "Need 1 <= patience <= max_rounds"
+        self.reader = reader
+        self.levels = levels # current order
+        self.regions = list(regions) if regions is not None else None
+        self.slot_q = slot_q
+        self.patience = patience
+        self.max_rounds = max_rounds
+        self.smoothing = smoothing
+        self.reorder = reorder
+
+        self.min_power: dict[str, int] = {} # EPC -> lowest power level it was read at
+        self.yields: dict[int, float] = {} # level -> average EPCs per second found first in the cycle
+        self.cycles = 0
+        self.rounds = 0
+        self.round_errors = 0
+        self.switch_time = 0.0 # seconds spent changing power and region
+        self._power: int | None = None
+        self._region: RFIDRegion | None = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'cycles': self.cycles,
+            'rounds': self.rounds,
+            'round_errors': self.round_errors,
+            'tags': len(self.min_power),
+            'switch_time': self.switch_time,
+            'order': list(self.levels),
+            'yields': dict(self.yields),
+        }
+
+    def _set_power(self, level: int):
+        if self._power is None:
+            self._power = self.reader.get_power_level()
+        if level != self._power:
+            started = time.perf_counter()
+            self.reader.set_power_level(level)
+            self.switch_time += time.perf_counter() - started
+            self._power = level
+
+    def _set_region(self, region: RFIDRegion):
+        if self._region is None:
+            self._region = self.reader.get_region()
+        if region != self._region:
+            started = time.perf_counter()
+            self.reader.set_region(region)
+            self.switch_time += time.perf_counter() - started
+            self._region = region
+
+    def _sweep_level(self, level: int, seen: set[str]) -> Generator[tuple[str, int], None, None]:
+        """
+        Rounds at level while they are productive. Updates the level's yield.
+        """
+        self._set_power(level)
+        started = time.perf_counter()
+        found = 0
+        unproductive = 0
+        for _ in range(self.max_rounds):
+            productive = False
+            try:
+                for epc in self.reader.read_many_tag_id(self.slot_q):
+                    if epc not in seen:
+                        seen.add(epc)
+                        found += 1
+                        productive = True
+                    if level < self.min_power.get(epc, 26):
+                        self.min_power[epc] = level
+                        productive = True
+                    yield epc, level
+            except (TagGenericException, RuntimeWarning) as e:
+                # Collisions and CRC failures: the tags read in the round still count
+                self.round_errors += 1
+                print(f"Error reading tag: {e}") if self.reader.debug else None
+            self.rounds += 1
+            unproductive = 0 if productive else unproductive + 1
+            if unproductive >= self.patience:
+                break
+
+        rate = found / (time.perf_counter() - started)
+        previous = self.yields.get(level)
+        self.yields[level] = rate if previous is None else previous + self.smoothing * (rate - previous)
+
+    def cycle(self) -> Generator[tuple[str, int], None, None]:
+        """
+        One pass over every level (in every region). Yields (EPC, power level) for every read.
+        """
+        seen: set[str] = set()
+        for region in self.regions or [None]:
+            if region is not None:
+                self._set_region(region)
+            for level in list(self.levels):
+                yield from self._sweep_level(level, seen)
+        self.cycles += 1
+        if self.reorder:
+            # Stable: levels with the same yield keep their order
+            self.levels.sort(key=lambda level: -self.yields.get(level, 0.0))
+
+    def run(self, cycles: int | None = None, duration: float | None = None) -> Generator[tuple[str, int], None, None]:
+        """
+        Repeat cycle() cycles times, or until duration seconds have passed at the end of a cycle (forever if neither)
+        """
+        deadline = time.perf_counter() + duration if duration is not None else None
+        done = 0
+        while cycles is None or done < cycles:
+            yield from self.cycle()
+            done += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
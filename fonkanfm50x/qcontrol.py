@@ -0,0 +1,150 @@
+import math
+
+CONSISTENCY_MARGIN = 0.1 # log-scale distance by which one branch must agree better with the previous round
+MAX_GROWTH = 4 # crowded frame estimates are capped at this many times the slot count (Q + 2) per round
+
+class AdaptiveQController:
+    """
+    Chooses the slot Q-value (2^Q ALOHA slots) of the next inventory round from the outcome of the previous ones.
+    Pass it as slot_q to FonkanUHF.read_many_tag_id / read_multi_tag_memory_multiband.
+
+    Too small a Q makes tags collide (lost replies and 'E' errors), too large a Q wastes air time on empty slots.
+    Each round's slot statistics (single replies, reported collisions, slot count) update a tag population
+    estimate N, and the next Q moves at most max_step towards round(log2(N)) + 1: 1.4 to 2.8 slots per tag.
+    Round durations do not steer Q: wall-clock throughput is too noisy for that, and the slot statistics
+    already tell how far Q is from the population.
+
+    The reader does not report every collided slot, so Schoute's N = replies + 2.39 * collisions is only a
+    lower bound. The expected number of single replies N * (1 - 1/L)^(N-1) in L = 2^Q slots peaks at N = L,
+    so a reply count fits a lightly loaded frame (N < L) and a crowded one (N > L) alike. The branch is the
+    one consistent with the previous round at another Q. Failing that, the frame is crowded only when it
+    reported more collisions than the lightly loaded N could cause. A round with neither replies nor
+    collisions leaves Q alone: an empty field and an unreported pile-up look the same.
+
+    q_control = AdaptiveQController()
+    while True:
+        for tag in reader.read_many_tag_id(slot_q=q_control):
+            ...
+    """
+
+    def __init__(self,
+              initial_q: int = 4,
+              min_q: int = 0,
+              max_q: int = 15,
+              smoothing: float = 0.5,
+              max_step: int = 2):
+        """
+        initial_q: Q of the first round
+        min_q, max_q: Q-value bounds (protocol allows 0 ~ 0x10)
+        smoothing: weight of the latest round in the population estimate
+        max_step: largest change of Q between two rounds
+        """
+        assert 0 <= min_q <= initial_q <= max_q <= 0x10, "Q-values must satisfy 0 <= min_q <= initial_q <= max_q <= 16"
+        assert max_step >= 1, "max_step must be at least 1"
+        self.q = initial_q
+        self.min_q = min_q
+        self.max_q = max_q
+        self.smoothing = smoothing
+        self.max_step = max_step
+        self.population_estimate: float | None = None
+        self.rounds = 0
+        self._previous: tuple[int, float] | None = None # q and population estimate of the last round
+
+    def __repr__(self):
+        return f"AdaptiveQController(q={self.q}, population_estimate={self.population_estimate})"
+
+    def update(self, tags: int, crc_failures: int, collisions: int, duration: float):
+        """
+        Record the outcome of a round run with the current q and choose the next q.
+        tags: tags read, crc_failures: replies with a bad CRC, collisions: 'E' (or other tag error) frames,
+        duration: seconds the round took (part of the round report, not used to choose Q)
+        """
+        self.rounds += 1
+        alpha = self.smoothing
+
+        if not tags + crc_failures + collisions:
+            # An empty field and a frame where every slot collided unreported look alike: keep the estimate and Q
+            return
+
+        estimate = self._estimate_population(tags + crc_failures, collisions, 1 << self.q)
+        if self.population_estimate is None:
+            self.population_estimate = estimate
+        else:
+            self.population_estimate += alpha * (estimate - self.population_estimate)
+
+        self.q = self._next_q()
+
+    def _estimate_population(self, replies: int, collisions: int, slots: int) -> float:
+        light, crowded = self._population_candidates(replies, collisions, slots)
+        # Collisions without a single reply, or more collision reports than the lightly loaded count can produce
+        light_collisions = _expected_collided_slots(light, slots)
+        is_crowded = collisions > (light_collisions + 2 * math.sqrt(light_collisions) + 1 if replies else 0)
+        if collisions and self._previous is not None and self._previous[0] != self.q:
+            # The tag count is about the same as in the previous round at another Q: pick the branch that agrees
+            previous = math.log(self._previous[1] + 1)
+            light_distance, crowded_distance = (abs(math.log(candidate + 1) - previous) for candidate in (light, crowded))
+            if abs(light_distance - crowded_distance) > CONSISTENCY_MARGIN:
+                is_crowded = crowded_distance < light_distance
+        estimate = crowded if is_crowded else light
+        self._previous = (self.q, estimate)
+        return estimate
+
+    @staticmethod
+    def _population_candidates(replies: int, collisions: int, slots: int) -> tuple[float, float]:
+        """
+        (lightly loaded, crowded) tag counts explaining the replies, both at least Schoute's estimate.
+        The crowded one is at least the slot count and at most MAX_GROWTH * slots.
+        """
+        schoute = replies + 2.39 * collisions
+        cap = float(MAX_GROWTH * slots)
+        if slots == 1:
+            light = max(schoute, min(replies, 1))
+            return light, (light if replies else max(schoute, cap))
+
+        def expected_replies(n: float) -> float:
+            return n * (1 - 1 / slots) ** (n - 1)
+
+        def solve(low: float, high: float, increasing: bool) -> float:
+            for _ in range(30):
+                middle = (low + high) / 2
+                if (expected_replies(middle) < replies) == increasing:
+                    low = middle
+                else:
+                    high = middle
+            return (low + high) / 2
+
+        peak = -1 / math.log(1 - 1 / slots) # expected_replies is largest here, just under slots
+        if replies >= expected_replies(peak):
+            light = crowded = peak
+        else:
+            light = solve(0.0, peak, increasing=True)
+            crowded = solve(peak, cap, increasing=False) if expected_replies(cap) < replies else cap
+        return max(schoute, light), max(schoute, crowded)
+
+    def _clamp(self, q: int) -> int:
+        return max(self.min_q, min(self.max_q, q))
+
+    def target_q(self) -> int:
+        """
+        Q-value matching the population estimate: 1.4 to 2.8 slots per tag, so a population near the
+        slot count (where a frame cannot tell light from crowded) still moves Q up
+        """
+        if not self.population_estimate or self.population_estimate <= 1:
+            return self.min_q
+        return self._clamp(round(math.log2(self.population_estimate)) + 1)
+
+    def _next_q(self) -> int:
+        step = max(-self.max_step, min(self.max_step, self.target_q() - self.q))
+        return self._clamp(self.q + step)
+
+    def reset(self):
+        self.population_estimate = None
+        self.rounds = 0
+        self._previous = None
+
+def _expected_collided_slots(tags: float, slots: int) -> float:
+    if tags <= 1:
+        return 0.0
+    empty = (1 - 1 / slots) ** tags
+    single = tags * (1 - 1 / slots) ** (tags - 1)
+    return slots - slots * empty - single
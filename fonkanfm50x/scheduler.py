@@ -0,0 +1,253 @@
+import heapq
+import itertools
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, TypeVar
+
+from .interface import FonkanUHF, GPIOPin
+from .qcontrol import AdaptiveQController
+from .exceptions import TagGenericException, UnexpectedReaderResponseException, ReaderCommandNotSupportedException
+
+T = TypeVar('T')
+
+class CommandPriority(IntEnum):
+    URGENT = 0
+    HIGH = 1 # GPIO, power changes
+    NORMAL = 2
+    LOW = 3 # inventory rounds, long memory reads
+
+class _Job:
+    __slots__ = ('priority', 'function', 'future', 'submitted', 'taken')
+
+    def __init__(self, priority: CommandPriority, function: Callable[[FonkanUHF], object], future: Future):
+        self.priority = priority
+        self.function = function
+        self.future = future
+        self.submitted = time.perf_counter()
+        self.taken = False
+
+class ReaderScheduler:
+    """
+    Share one connected reader between threads. FonkanUHF has no locking: concurrent calls interleave their
+    frames on the serial port and take each other's responses. Here a single I/O thread owns the reader and
+    runs submitted jobs one at a time, most urgent first and first come first served within a priority,
+    returning their results through concurrent.futures.Future.
+
+    A job cannot be interrupted once started (a round's replies are already on the wire), so a HIGH command
+    waits for at most the job running when it was submitted, typically one inventory round, however many
+    LOW jobs are queued. Jobs that waited max_wait seconds run next whatever their priority, so a flood of
+    urgent commands cannot starve the inventory.
+
+    Continuous inventory (start_inventory) runs rounds only while no job is queued. A failing round or on_tag
+    callback is counted and the rounds go on; only a serial port failure stops the I/O thread.
+
+    with FonkanUHF() as reader, ReaderScheduler(reader) as scheduler:
+        scheduler.start_inventory(on_tag=print, slot_q=4)
+        # From any thread, runs between two rounds:
+        levels = scheduler.read_gpio_pins().result()
+        scheduler.submit(lambda reader: reader.set_power_level(20), CommandPriority.HIGH).result()
+    """
+
+    def __init__(self, reader: FonkanUHF, max_wait: float | None = 1.0):
+        """
+        reader: connected reader. Only use it through the scheduler until stop()
+        max_wait: seconds after which a queued job runs before any more urgent one (None: strict priorities)
+        """
+        self.reader = reader
+        self.max_wait = max_wait
+        self.error: BaseException | None = None # failure of the I/O thread itself
+        self.rounds = 0 # continuous inventory rounds
+        self.round_errors = 0
+        self.callback_errors = 0
+        self._heap: list[tuple[int, int, _Job]] = []
+        self._arrivals: deque[_Job] = deque() # submission order, for max_wait
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._inventory: tuple[Callable[[str], None], int | AdaptiveQController | None] | None = None
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._waits: dict[CommandPriority, deque[float]] = {priority: deque(maxlen=1000) for priority in CommandPriority}
+        self._jobs_run: dict[CommandPriority, int] = {priority: 0 for priority in CommandPriority}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return sum(not job.taken for _, _, job in self._heap)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Per priority: jobs run and their queue wait (submit to start) over the last 1000 jobs
+        """
+        stats = {'rounds': self.rounds, 'round_errors': self.round_errors, 'callback_errors': self.callback_errors}
+        for priority in CommandPriority:
+            waits = sorted(self._waits[priority])
+            stats[priority.name.lower()] = {
+                'jobs': self._jobs_run[priority],
+                'wait_median': statistics.median(waits) if waits else None,
+                'wait_max': waits[-1] if waits else None,
+            }
+        return stats
+
+    ####################################################################
+    # Submitting
+    ####################################################################
+
+    def submit(self, function: Callable[[FonkanUHF], T], priority: CommandPriority = CommandPriority.NORMAL) -> 'Future[T]':
+        """
+        Run function(reader) on the I/O thread. Its result or exception is set on the returned future.
+        Cancelling the future before it started skips the job.
+        """
+        future: Future[T] = Future()
+        job = _Job(priority, function, future)
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("Scheduler is not running")
+            heapq.heappush(self._heap, (priority, next(self._sequence), job))
+            self._arrivals.append(job)
+            self._condition.notify()
+        return future
+
+    def read_gpio_pins(self, priority: CommandPriority = CommandPriority.HIGH) -> 'Future[dict[GPIOPin, bool]]':
+        return self.submit(FonkanUHF.read_gpio_pins, priority)
+
+    def write_gpio_pins(self, levels: dict[GPIOPin, bool], priority: CommandPriority = CommandPriority.HIGH) -> 'Future[None]':
+        return self.submit(lambda reader: reader.write_gpio_pins(levels), priority)
+
+    def get_power_level(self, priority: CommandPriority = CommandPriority.HIGH) -> 'Future[int]':
+        return self.submit(FonkanUHF.get_power_level, priority)
+
+    def set_power_level(self, power_level: int, priority: CommandPriority = CommandPriority.HIGH) -> 'Future[None]':
+        return self.submit(lambda reader: reader.set_power_level(power_level), priority)
+
+    def read_many_tag_id(self, slot_q: int | AdaptiveQController | None = None, priority: CommandPriority = CommandPriority.LOW) -> 'Future[list[str]]':
+        """
+        One inventory round. The EPCs come as a list: a generator cannot be consumed from another thread.
+        """
+        return self.submit(lambda reader: list(reader.read_many_tag_id(slot_q)), priority)
+
+    def start_inventory(self, on_tag: Callable[[str], None], slot_q: int | AdaptiveQController | None = None):
+        """
+        Run inventory rounds whenever no job is queued, calling on_tag(epc) on the I/O thread for every read.
+        Round errors (collisions, CRC failures, garbled or unexpected responses) are counted in round_errors,
+        exceptions raised by on_tag in callback_errors.
+        """
+        with self._condition:
+            self._inventory = (on_tag, slot_q)
+            self._condition.notify()
+
+    def stop_inventory(self):
+        with self._condition:
+            self._inventory = None
+
+    ####################################################################
+    # I/O thread
+    ####################################################################
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name=f"fm50x-scheduler-{self.reader.serial_port}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        """
+        Run the jobs already queued, then stop the I/O thread. submit() raises afterwards.
+        """
+        with self._condition:
+            self._running = False
+            self._inventory = None
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_job(self) -> _Job | None:
+        """
+        Most urgent queued job, or the oldest one if it waited max_wait. None if the queue is empty.
+        Called with the condition held.
+        """
+        arrivals = self._arrivals
+        while arrivals and arrivals[0].taken:
+            arrivals.popleft()
+        if arrivals and self.max_wait is not None and time.perf_counter() - arrivals[0].submitted >= self.max_wait:
+            job = arrivals.popleft()
+            job.taken = True
+            return job
+        heap = self._heap
+        while heap:
+            job = heapq.heappop(heap)[2]
+            if not job.taken:
+                job.taken = True
+                return job
+        return None
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    job = self._next_job()
+                    while job is None and self._inventory is None:
+                        if not self._running:
+                            return
+                        self._condition.wait()
+                        job = self._next_job()
+                    inventory = self._inventory
+                if job is not None:
+                    self._run_job(job)
+                else:
+                    self._run_round(*inventory)
+        except BaseException as e:
+            self.error = e
+            print(f"Scheduler of {self.reader.serial_port} stopped: {e}") if self.reader.debug else None
+        finally:
+            with self._condition:
+                self._running = False
+                abandoned = [job for _, _, job in self._heap if not job.taken]
+                self._heap.clear()
+                self._arrivals.clear()
+            for job in abandoned:
+                job.future.cancel()
+
+    def _run_job(self, job: _Job):
+        if not job.future.set_running_or_notify_cancel():
+            return
+        self._waits[job.priority].append(time.perf_counter() - job.submitted)
+        self._jobs_run[job.priority] += 1
+        try:
+            result = job.function(self.reader)
+        except BaseException as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+
+    def _run_round(self, on_tag: Callable[[str], None], slot_q: int | AdaptiveQController | None):
+        try:
+            for epc in self.reader.read_many_tag_id(slot_q):
+                try:
+                    on_tag(epc)
+                except Exception as e:
+                    # A failing callback must not stop the I/O thread, and with it every other user of the reader
+                    self.callback_errors += 1
+                    print(f"Tag callback {on_tag} failed: {e}") if self.reader.debug else None
+        except (TagGenericException, RuntimeWarning, UnexpectedReaderResponseException, ReaderCommandNotSupportedException,
+                ValueError, IndexError) as e:
+            # Collisions, CRC failures and garbled frames only lose the current round
+            self.round_errors += 1
+            print(f"Error reading tag: {e}") if self.reader.debug else None
+        self.rounds += 1
@@ -0,0 +1,251 @@
+from typing import TYPE_CHECKING, Callable, Generator, Iterable, NamedTuple
+
+from .types import EPCMemoryBank
+
+if TYPE_CHECKING:
+    from .epcdecode import EPCScheme
+
+EPC_BIT_ADDRESS = 0x20 # first EPC bit of the EPC bank, after CRC16 and PC
+GS1_COMPANY_PREFIX_OFFSET = 14 # EPC bits before the company prefix: header (8), filter (3), partition (3)
+
+class SelectMask(NamedTuple):
+    """
+    Arguments of a T select: tags whose bank bits at bit_address match mask
+    """
+    bank: EPCMemoryBank
+    bit_address: int
+    bit_length: int # 1 ~ 0x60
+    mask: str # hex bits to match, left aligned
+
+    @classmethod
+    def epc_prefix(cls, prefix: str, bit_length: int | None = None) -> 'SelectMask':
+        """
+        Tags whose EPC starts with the hex prefix (its first bit_length bits, default all of it, at most 96)
+        """
+        return cls(EPCMemoryBank.EPC, EPC_BIT_ADDRESS, bit_length or min(len(prefix) * 4, 0x60), prefix.upper())
+
+    @classmethod
+    def company_prefix(cls, company_prefix: str, scheme: 'EPCScheme | None' = None) -> 'SelectMask':
+        """
+        GS1 EPCs of a company prefix (digits, e.g. '0614141'), whatever their filter value: the mask only covers
+        the company prefix field, whose width follows from the number of digits. scheme: default SGTIN-96.
+        Other schemes and partitions may match the same bits: check the reads with a TagFilter index or epcdecode.
+        """
+        from .epcdecode import EPCScheme, PARTITION_TABLES
+        table = PARTITION_TABLES[scheme or EPCScheme.SGTIN_96]
+        bits = next((company_bits for company_bits, digits, _, _ in table if digits == len(company_prefix)), None)
+        if bits is None:
+            raise ValueError(f"A GS1 company prefix has 6 to 12 digits, not {len(company_prefix)}")
+        padding = -bits % 4
+        mask = f"{int(company_prefix) << padding:0{(bits + padding) // 4}X}"
+        return cls(EPCMemoryBank.EPC, EPC_BIT_ADDRESS + GS1_COMPANY_PREFIX_OFFSET, bits, mask)
+
+    def matches(self, epc: str) -> bool:
+        """
+        Whether a tag with this EPC (hex) matches. Masks outside the EPC (other banks, PC word) cannot be
+        checked from the EPC and match.
+        """
+        offset = self.bit_address - EPC_BIT_ADDRESS
+        if self.bank != EPCMemoryBank.EPC or offset < 0:
+            return True
+        epc_bits = len(epc) * 4
+        end = offset + self.bit_length
+        if end > epc_bits:
+            return False
+        bits = int(self.mask, 16) >> (len(self.mask) * 4 - self.bit_length)
+        return (int(epc, 16) >> (epc_bits - end)) & ((1 << self.bit_length) - 1) == bits
+
+    def bytes_matcher(self) -> Callable[[bytes], bool]:
+        """
+        matches() for EPCs as bytes (TagRead.epc), with the mask converted once
+        """
+        offset = self.bit_address - EPC_BIT_ADDRESS
+        if self.bank != EPCMemoryBank.EPC or offset < 0:
+            return lambda epc: True
+        end = offset + self.bit_length
+        if offset % 8 == 0 and end % 8 == 0:
+            # Whole bytes: compare the slice
+            mask = bytes.fromhex(self.mask[:self.bit_length // 4])
+            first, last = offset // 8, end // 8
+            return lambda epc: epc[first:last] == mask
+        bits = int(self.mask, 16) >> (len(self.mask) * 4 - self.bit_length)
+        field = (1 << self.bit_length) - 1
+
+        def matches(epc: bytes) -> bool:
+            epc_bits = len(epc) * 8
+            return end <= epc_bits and (int.from_bytes(epc, 'big') >> (epc_bits - end)) & field == bits
+        return matches
+
+class EPCPrefixIndex:
+    """
+    Watch-list of EPCs and EPC prefixes (hex, any number of digits, e.g. a company's SGTIN header or whole EPCs).
+    Entries are kept in one set per prefix length, so matching an EPC hashes one slice of it per distinct
+    length: O(EPC length), whatever the number of entries (a 100k EPC list is a single set).
+
+    index = EPCPrefixIndex(known_epcs)
+    index.add('30340242')  # every EPC starting with it
+    for epc in index.filter(reader.read_many_tag_id()):
+        ...
+    """
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self._by_length: dict[int, set[str]] = {}
+        self._lengths: list[int] = [] # shortest first
+        self._byte_lookups: list[tuple[int, set[bytes] | set[str]]] | None = None # for match_bytes, built on first use
+        self.update(entries)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._by_length.values())
+
+    def __iter__(self) -> Generator[str, None, None]:
+        for length in self._lengths:
+            yield from self._by_length[length]
+
+    def __contains__(self, epc: str) -> bool:
+        return self.match(epc) is not None
+
+    def add(self, prefix: str):
+        prefix = prefix.upper()
+        entries = self._by_length.get(len(prefix))
+        if entries is None:
+            entries = self._by_length[len(prefix)] = set()
+            self._lengths = sorted(self._by_length)
+        entries.add(prefix)
+        self._byte_lookups = None
+
+    def update(self, entries: Iterable[str]):
+        for prefix in entries:
+            self.add(prefix)
+
+    def discard(self, prefix: str):
+        prefix = prefix.upper()
+        entries = self._by_length.get(len(prefix))
+        if entries is not None:
+            entries.discard(prefix)
+            if not entries:
+                del self._by_length[len(prefix)]
+                self._lengths = sorted(self._by_length)
+            self._byte_lookups = None
+
+    def match(self, epc: str) -> str | None:
+        """
+        Shortest entry epc starts with, None if there is none. epc: upper case hex, as read_many_tag_id returns it
+        """
+        by_length = self._by_length
+        for length in self._lengths:
+            if length > len(epc):
+                break
+            prefix = epc[:length]
+            if prefix in by_length[length]:
+                return prefix
+        return None
+
+    def _build_byte_lookups(self) -> list[tuple[int, set[bytes] | set[str]]]:
+        lookups: list[tuple[int, set[bytes] | set[str]]] = []
+        for length in self._lengths:
+            entries = self._by_length[length]
+            if length % 2:
+                lookups.append((length, entries))
+                continue
+            converted = set()
+            for prefix in entries:
+                try:
+                    converted.add(bytes.fromhex(prefix))
+                except ValueError:
+                    # Not hex: no EPC read matches it
+                    pass
+            lookups.append((length, converted))
+        return lookups
+
+    def match_bytes(self, epc: bytes) -> str | None:
+        """
+        match() for an EPC as bytes (TagRead.epc), without converting it to hex: whole byte prefixes are
+        looked up as bytes, prefixes of an odd number of digits only convert the bytes they cover
+        """
+        lookups = self._byte_lookups
+        if lookups is None:
+            lookups = self._byte_lookups = self._build_byte_lookups()
+        digits = len(epc) * 2
+        for length, entries in lookups:
+            if length > digits:
+                break
+            if length % 2:
+                prefix = epc[:length // 2 + 1].hex().upper()[:length]
+                if prefix in entries:
+                    return prefix
+            else:
+                prefix = epc[:length // 2]
+                if prefix in entries:
+                    return prefix.hex().upper()
+        return None
+
+    def filter(self, epcs: Iterable[str]) -> Generator[str, None, None]:
+        """
+        Pass through the EPCs matching an entry
+        """
+        match = self.match
+        for epc in epcs:
+            if match(epc) is not None:
+                yield epc
+
+    def common_prefix(self) -> str:
+        """
+        Longest prefix shared by all entries ('' if none): the first digits where the smallest and the largest
+        entries differ bound it
+        """
+        if not self._by_length:
+            return ''
+        first = min(min(entries) for entries in self._by_length.values())
+        last = max(max(entries) for entries in self._by_length.values())
+        length = 0
+        for a, b in zip(first, last):
+            if a != b:
+                break
+            length += 1
+        return first[:length]
+
+    def select_mask(self) -> SelectMask | None:
+        """
+        Select covering every entry (their common prefix), None if the entries share no prefix
+        """
+        prefix = self.common_prefix()
+        return SelectMask.epc_prefix(prefix) if prefix else None
+
+class TagFilter(NamedTuple):
+    """
+    Filter of FonkanUHF.read_many_tag_id / read_many_tag_reads and of the multi-tag memory reads
+    (read_multi_tag_memory_multiband / read_multi_tag_memory_reads).
+
+    select is sent to the reader as a T select before every round, so that on firmware applying it to
+    inventories the other tags stay silent and the slots only go to relevant ones, and cleared after it.
+    index (and select, for EPC masks) is also checked on the host for every read, so the result is the same
+    on firmware that only applies T to access commands.
+
+    tag_filter = TagFilter(SelectMask.company_prefix('0614141'), EPCPrefixIndex(watch_list))
+    for epc in reader.read_many_tag_id(slot_q, tag_filter=tag_filter):
+        ...
+    """
+    select: SelectMask | None = None
+    index: EPCPrefixIndex | None = None
+
+    @classmethod
+    def from_index(cls, index: EPCPrefixIndex) -> 'TagFilter':
+        """
+        Filter on index, selecting the common prefix of its entries on the reader
+        """
+        return cls(index.select_mask(), index)
+
+    def matches(self, epc: str) -> bool:
+        return (self.select is None or self.select.matches(epc)) and (self.index is None or self.index.match(epc) is not None)
+
+    def bytes_matcher(self) -> Callable[[bytes], bool]:
+        """
+        matches() for EPCs as bytes (TagRead.epc)
+        """
+        select = self.select.bytes_matcher() if self.select is not None else None
+        if self.index is None:
+            return select or (lambda epc: True)
+        match_bytes = self.index.match_bytes
+        if select is None:
+            return lambda epc: match_bytes(epc) is not None
+        return lambda epc: select(epc) and match_bytes(epc) is not None
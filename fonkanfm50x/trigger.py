@@ -0,0 +1,257 @@
+import threading
+import time
+from typing import Callable, NamedTuple
+
+from .interface import FonkanUHF, GPIOPin
+from .qcontrol import AdaptiveQController
+from .exceptions import TagGenericException
+
+class BurstResult(NamedTuple):
+    triggered: float # time.perf_counter() of the first poll seeing the trigger active
+    started: float # when the first inventory round was sent
+    ended: float
+    first_read: float | None # time of the first tag read, None if no tag was read
+    rounds: int
+    reads: int
+    epcs: frozenset[str]
+
+    @property
+    def trigger_latency(self) -> float | None:
+        """
+        Seconds from the trigger being seen to the first tag read
+        """
+        return self.first_read - self.triggered if self.first_read is not None else None
+
+class TriggeredInventory:
+    """
+    Gate inventory on a GPIO input (photo-eye, push button): poll the pin every poll_interval while idle,
+    start a burst of back to back inventory rounds once it has been active for debounce seconds, and stop
+    hold seconds after it has been inactive for debounce seconds (or after max_burst seconds).
+    During a burst the pin is only polled between rounds once poll_interval has passed, so most of the link
+    goes to the rounds. busy_pin is driven high during bursts (stack light), and outputs(result) may return
+    pin levels to write at the end of each burst (e.g. open a gate when a tag was read).
+
+    Latency from trigger to the first read is bounded by poll_interval + debounce + the first round.
+    duty_cycle is the fraction of time the link was in use (polls, rounds, outputs).
+
+    with FonkanUHF() as reader, TriggeredInventory(reader, GPIOPin.GPIO_14, on_read=print) as trigger:
+        time.sleep(3600)
+    print(trigger.stats)
+    """
+
+    def __init__(self,
+              reader: FonkanUHF,
+              trigger_pin: GPIOPin,
+              active_high: bool = True,
+              poll_interval: float = 0.01,
+              debounce: float = 0.0,
+              hold: float = 0.2,
+              max_burst: float | None = None,
+              slot_q: int | AdaptiveQController | None = None,
+              busy_pin: GPIOPin | None = None,
+              outputs: Callable[[BurstResult], dict[GPIOPin, bool] | None] | None = None,
+              on_read: Callable[[str], None] | None = None,
+              on_burst: Callable[[BurstResult], None] | None = None):
+        """
+        trigger_pin: input pin starting bursts, active when high (or low if not active_high)
+        poll_interval: seconds between pin polls, idle and during bursts
+        debounce: seconds the pin must stay in its new state before the edge counts (0: first poll)
+        hold: seconds to keep reading after the trigger went inactive
+        max_burst: stop a burst after this many seconds even if the trigger stays active
+        slot_q: Q-value of the rounds, or an AdaptiveQController
+        busy_pin: output pin held high during bursts
+        outputs: called with each burst result, returns the output pin levels to write (None for none)
+        on_read, on_burst: called with each EPC read and each burst result
+        """
+        assert poll_interval > 0, "poll_interval must be positive"
+        self.reader = reader
+        self.trigger_pin = trigger_pin
+        self.active_high = active_high
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.hold = hold
+        self.max_burst = max_burst
+        self.slot_q = slot_q
+        self.busy_pin = busy_pin
+        self.outputs = outputs
+        self.on_read = on_read
+        self.on_burst = on_burst
+
+        self.bursts: list[BurstResult] = []
+        self.polls = 0
+        self.round_errors = 0
+        self.busy_time = 0.0 # seconds spent in reader commands
+        self.error: BaseException | None = None # failure that stopped the scheduler thread
+        self._started: float | None = None
+        self._stopped: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    @property
+    def elapsed(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._stopped or time.perf_counter()) - self._started
+
+    @property
+    def duty_cycle(self) -> float:
+        return self.busy_time / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def stats(self) -> dict:
+        latencies = sorted(burst.trigger_latency for burst in self.bursts if burst.trigger_latency is not None)
+        return {
+            'elapsed': self.elapsed,
+            'bursts': len(self.bursts),
+            'polls': self.polls,
+            'rounds': sum(burst.rounds for burst in self.bursts),
+            'reads': sum(burst.reads for burst in self.bursts),
+            'round_errors': self.round_errors,
+            'duty_cycle': self.duty_cycle,
+            'trigger_latency_max': latencies[-1] if latencies else None,
+            'trigger_latency_median': latencies[len(latencies) // 2] if latencies else None,
+        }
+
+    ####################################################################
+    # Scheduling
+    ####################################################################
+
+    def start(self):
+        """
+        Run the scheduler on its own thread. The reader is owned by it until stop().
+        """
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run_thread, name=f"fm50x-trigger-{self.reader.serial_port}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run_thread(self):
+        try:
+            self.run()
+        except Exception as e:
+            self.error = e
+            print(f"Triggered inventory on {self.reader.serial_port} stopped: {e}") if self.reader.debug else None
+
+    def _timed(self, function: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.busy_time += time.perf_counter() - started
+
+    def _trigger_active(self) -> bool:
+        self.polls += 1
+        levels = self._timed(self.reader.read_gpio_pins)
+        return levels[self.trigger_pin] == self.active_high
+
+    def _wait_for_edge(self, active: bool) -> float | None:
+        """
+        Poll until the trigger has been in the active (or inactive) state for debounce seconds.
+        Returns when that state was first seen, None if stopped first.
+        """
+        since: float | None = None
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            if self._trigger_active() == active:
+                since = now if since is None else since
+                if now - since >= self.debounce:
+                    return since
+            else:
+                since = None
+            self._stop.wait(self.poll_interval)
+        return None
+
+    def run(self):
+        """
+        Run bursts on trigger until stop() (from another thread)
+        """
+        self._started = time.perf_counter()
+        self._stopped = None
+        try:
+            config = {self.trigger_pin: False}
+            if self.busy_pin is not None:
+                config[self.busy_pin] = True
+            self._timed(self.reader.configure_gpio, config)
+            while not self._stop.is_set():
+                triggered = self._wait_for_edge(True)
+                if triggered is None:
+                    break
+                self._burst(triggered)
+        finally:
+            self._stopped = time.perf_counter()
+
+    def _burst(self, triggered: float):
+        if self.busy_pin is not None:
+            self._timed(self.reader.write_gpio_pins, {self.busy_pin: True})
+        started = time.perf_counter()
+        deadline = started + self.max_burst if self.max_burst is not None else None
+        first_read: float | None = None
+        rounds = 0
+        reads = 0
+        epcs: set[str] = set()
+        last_poll = started
+        inactive_since: float | None = None
+        stop_at: float | None = None
+        timed_out = False
+
+        while not self._stop.is_set():
+            round_started = time.perf_counter()
+            try:
+                for epc in self.reader.read_many_tag_id(self.slot_q):
+                    if first_read is None:
+                        first_read = time.perf_counter()
+                    reads += 1
+                    epcs.add(epc)
+                    self.on_read(epc) if self.on_read is not None else None
+            except (TagGenericException, RuntimeWarning) as e:
+                # Collisions and CRC failures only lose the current round
+                self.round_errors += 1
+                print(f"Error reading tag: {e}") if self.reader.debug else None
+            rounds += 1
+            now = time.perf_counter()
+            self.busy_time += now - round_started
+
+            if deadline is not None and now >= deadline:
+                timed_out = True
+                break
+            if stop_at is not None:
+                if now >= stop_at:
+                    break
+                continue
+            if now - last_poll >= self.poll_interval:
+                last_poll = now
+                if self._trigger_active():
+                    inactive_since = None
+                else:
+                    inactive_since = now if inactive_since is None else inactive_since
+                    if now - inactive_since >= self.debounce:
+                        # Trigger released: read on for hold seconds, without polling any more
+                        stop_at = inactive_since + self.hold
+                        if now >= stop_at:
+                            break
+
+        result = BurstResult(triggered, started, time.perf_counter(), first_read, rounds, reads, frozenset(epcs))
+        self.bursts.append(result)
+        levels = dict(self.outputs(result) or {}) if self.outputs is not None else {}
+        if self.busy_pin is not None:
+            levels[self.busy_pin] = False
+        if levels:
+            self._timed(self.reader.write_gpio_pins, levels)
+        self.on_burst(result) if self.on_burst is not None else None
+        if timed_out:
+            # The trigger may still be active: the next burst needs a new edge
+            self._wait_for_edge(False)
@@ -47,4 +47,23 @@ class EPCMemoryBank(Enum):
 	RESERVED = 0
 	EPC = 1
 	TID = 2
-	USER = 3
\ No newline at end of file
+	USER = 3
+
+class LockField(Enum):
+	'''
+	Gen2 lock payload field. Value is the bit shift of its 2 bit mask/action in the 10 bit L arguments
+	'''
+	KILL_PASSWORD = 8
+	ACCESS_PASSWORD = 6
+	EPC = 4
+	TID = 2
+	USER = 0
+
+class LockAction(Enum):
+	'''
+	Gen2 lock action bits of a field: password write (read/write for passwords), permalock
+	'''
+	UNLOCK = 0
+	PERMANENT_UNLOCK = 1
+	LOCK = 2 # writable only after the access password
+	PERMANENT_LOCK = 3
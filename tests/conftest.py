@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from fonkanfm50x.emulator import FM50xEmulator, SimulatedTag
+from fonkanfm50x.exceptions import TagGenericException
+from fonkanfm50x.interface import FonkanUHF
+
+def random_tags(n: int, seed: int = 0) -> list[SimulatedTag]:
+    rng = random.Random(seed)
+    return [SimulatedTag.random(rng) for _ in range(n)]
+
+@pytest.fixture
+def make_emulator():
+    """
+    Start FM50xEmulator(**kwargs), stopped at the end of the test. Defaults: 10 random tags, no timing model
+    """
+    started: list[FM50xEmulator] = []
+
+    def make(**kwargs) -> FM50xEmulator:
+        kwargs.setdefault('tags', random_tags(10))
+        kwargs.setdefault('seed', 0)
+        kwargs.setdefault('model_timing', False)
+        emulator = FM50xEmulator(**kwargs)
+        emulator.start()
+        started.append(emulator)
+        return emulator
+
+    yield make
+    for emulator in started:
+        emulator.stop()
+
+@pytest.fixture
+def emulator(make_emulator) -> FM50xEmulator:
+    return make_emulator()
+
+@pytest.fixture
+def reader(emulator):
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        yield reader
+
+def epcs_of(tags: list[SimulatedTag]) -> set[str]:
+    return {tag.epc.hex().upper() for tag in tags}
+
+def inventory_until_complete(read_round, expected: set[str], rounds: int = 30) -> set[str]:
+    """
+    EPCs read over inventory rounds, stopping once every expected one was read
+    """
+    seen = set()
+    for _ in range(rounds):
+        try:
+            for epc in read_round():
+                seen.add(epc)
+        except (TagGenericException, RuntimeWarning):
+            pass
+        if expected <= seen:
+            break
+    return seen
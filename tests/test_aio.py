@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from conftest import epcs_of
+from fonkanfm50x.aio import AsyncFonkanUHF
+from fonkanfm50x.exceptions import TagGenericException, UnexpectedReaderResponseException
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.types import AvailableBaudRates, EPCMemoryBank, RFIDRegion
+
+def _run(emulator, session, **kwargs):
+    async def main():
+        async with AsyncFonkanUHF(serial_port=emulator.port, **kwargs) as reader:
+            return await session(reader)
+    return asyncio.run(main())
+
+def test_connect(emulator):
+    async def session(reader):
+        return await reader.get_reader_id(), await reader.get_reader_firmware()
+    reader_id, firmware = _run(emulator, session)
+    assert reader_id == emulator.reader_id
+    assert 'FM50x emulator' in firmware
+
+def test_connect_finds_baud_rate(make_emulator):
+    emulator = make_emulator(baud_rate=AvailableBaudRates.BAUD_115200)
+    async def session(reader):
+        return await reader.get_reader_id()
+    assert _run(emulator, session, baud_rate=AvailableBaudRates.BAUD_38400) == emulator.reader_id
+    assert emulator.baud_rate == AvailableBaudRates.BAUD_38400
+
+def test_connect_applies_settings(make_emulator):
+    emulator = make_emulator(power=10, region=RFIDRegion.US)
+    async def session(reader):
+        return await reader.get_power_level(), await reader.get_region()
+    assert _run(emulator, session, start_power=20, region=RFIDRegion.EU) == (20, RFIDRegion.EU)
+
+def test_read_many_tag_id(emulator):
+    expected = epcs_of(emulator.tags)
+    async def session(reader):
+        seen = set()
+        for _ in range(30):
+            try:
+                async for epc in reader.read_many_tag_id(4):
+                    seen.add(epc)
+            except (TagGenericException, RuntimeWarning):
+                pass
+            if seen == expected:
+                break
+        return seen
+    assert _run(emulator, session) == expected
+
+def test_change_baud_rate(emulator):
+    async def session(reader):
+        await reader.change_baud_rate(AvailableBaudRates.BAUD_115200)
+        return await reader.get_reader_id()
+    assert _run(emulator, session) == emulator.reader_id
+    assert emulator.baud_rate == AvailableBaudRates.BAUD_115200
+
+def _replying(response: str | None):
+    """
+    _command_steps stand-in answering every command with response, as a garbled or lost reply would
+    """
+    def command_steps(command, handle_error=None):
+        yield from ()
+        return response
+    return command_steps
+
+def _run_either(emulator, reader_class, session):
+    """
+    Run session(reader, call) on a connected reader of either class, call(result) awaiting async results
+    """
+    async def call(result):
+        return await result if asyncio.iscoroutine(result) else result
+
+    if reader_class is AsyncFonkanUHF:
+        return _run(emulator, lambda reader: session(reader, call))
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        return asyncio.run(session(reader, call))
+
+@pytest.mark.parametrize('reader_class', [FonkanUHF, AsyncFonkanUHF])
+def test_change_baud_rate_rejects_wrong_ack(emulator, reader_class):
+    async def session(reader, call):
+        reader._command_steps = _replying('03')
+        await call(reader.change_baud_rate(AvailableBaudRates.BAUD_115200))
+
+    with pytest.raises(UnexpectedReaderResponseException):
+        _run_either(emulator, reader_class, session)
+
+@pytest.mark.parametrize('reader_class', [FonkanUHF, AsyncFonkanUHF])
+def test_read_tag_memory_multiband_without_tag(make_emulator, reader_class):
+    async def session(reader, call):
+        return await call(reader.read_tag_memory_multiband(EPCMemoryBank.TID, 0, 6))
+
+    assert _run_either(make_emulator(tags=[]), reader_class, session) is None
+
+@pytest.mark.parametrize('reader_class', [FonkanUHF, AsyncFonkanUHF])
+def test_read_tag_memory_multiband_without_response(emulator, reader_class):
+    async def session(reader, call):
+        reader._command_steps = _replying(None)
+        await call(reader.read_tag_memory_multiband(EPCMemoryBank.TID, 0, 6))
+
+    with pytest.raises(UnexpectedReaderResponseException):
+        _run_either(emulator, reader_class, session)
+
+@pytest.mark.parametrize('reader_class', [FonkanUHF, AsyncFonkanUHF])
+def test_wait_until_ready_probes_past_unparsable_response(emulator, reader_class):
+    async def session(reader, call):
+        probe_steps = reader._probe_steps
+        garbled = []
+
+        def garbling_probe_steps(command):
+            # The first readiness probe answers an empty value, which int(res, 16) cannot parse
+            res = yield from probe_steps(command)
+            if not garbled:
+                garbled.append(command)
+                return ''
+            return res
+
+        reader._probe_steps = garbling_probe_steps
+        await call(reader.set_power_level(20))
+        return garbled, await call(reader.get_power_level())
+
+    garbled, power = _run_either(emulator, reader_class, session)
+    assert garbled == ['N0,00'] and power == 20
@@ -0,0 +1,59 @@
+import pytest
+
+from fonkanfm50x.capture import ReplaySerial, load_capture, EVENT_WRITE
+from fonkanfm50x.exceptions import ReplayDivergedException, TagGenericException
+from fonkanfm50x.interface import FonkanUHF
+
+def _rounds(reader: FonkanUHF, n: int = 10) -> list[list[str]]:
+    rounds = []
+    for _ in range(n):
+        tags = []
+        try:
+            for epc in reader.read_many_tag_id(4):
+                tags.append(epc)
+        except (TagGenericException, RuntimeWarning):
+            tags.append('error')
+        rounds.append(tags)
+    return rounds
+
+@pytest.fixture
+def capture(emulator, tmp_path) -> tuple[str, list[list[str]]]:
+    path = str(tmp_path / 'session.fmcap')
+    with FonkanUHF(serial_port=emulator.port, capture_path=path) as reader:
+        live = _rounds(reader)
+    return path, live
+
+def test_replay_is_deterministic(capture):
+    path, live = capture
+    for _ in range(2):
+        transport = ReplaySerial(path)
+        with FonkanUHF(transport=transport) as reader:
+            assert _rounds(reader) == live
+        assert transport.done
+
+def test_replay_bytes_path_reads_the_same_tags(capture):
+    path, live = capture
+    with FonkanUHF(transport=ReplaySerial(path)) as reader:
+        for tags in live:
+            try:
+                replayed = [read.epc_hex for read in reader.read_many_tag_reads(4)]
+            except (TagGenericException, RuntimeWarning):
+                continue
+            assert replayed == tags
+
+def test_replay_diverges_on_other_command(capture):
+    path, _ = capture
+    with FonkanUHF(transport=ReplaySerial(path)) as reader:
+        with pytest.raises(ReplayDivergedException):
+            reader.get_reader_firmware()
+
+def test_truncated_capture_keeps_complete_events(capture):
+    path, _ = capture
+    events = load_capture(path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    with open(path, 'wb') as f:
+        f.write(raw[:-3])
+    truncated = load_capture(path)
+    assert truncated == events[:-1]
+    assert any(event.kind == EVENT_WRITE for event in truncated)
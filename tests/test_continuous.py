@@ -0,0 +1,122 @@
+import threading
+import time
+
+from conftest import epcs_of
+from fonkanfm50x.continuous import MAX_READER_ERRORS, ContinuousInventory, OverflowPolicy, TagRingBuffer
+from fonkanfm50x.exceptions import UnexpectedReaderResponseException
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.tagread import TagRead
+
+def _reads(n: int) -> list[TagRead]:
+    return [TagRead(0x3000, i.to_bytes(12), b'', float(i)) for i in range(n)]
+
+def test_drop_oldest_keeps_the_newest_reads():
+    ring = TagRingBuffer(4)
+    reads = _reads(10)
+    for read in reads:
+        assert ring.put(read)
+    assert len(ring) == 4 and ring.written == 10 and ring.dropped == 6
+    assert ring.get_batch(3) == reads[6:9]
+    assert ring.get_batch() == reads[9:]
+    assert ring.dropped == 6 and len(ring) == 0
+    assert not ring.wait(0.01)
+
+def test_block_waits_for_the_consumer():
+    ring = TagRingBuffer(4, OverflowPolicy.BLOCK)
+    reads = _reads(10)
+    consumed = []
+
+    def consume():
+        while len(consumed) < len(reads):
+            if ring.wait(1.0):
+                consumed.extend(ring.get_batch(2))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for read in reads:
+        assert ring.put(read)
+        assert len(ring) <= 4
+    consumer.join(5.0)
+    assert consumed == reads and ring.dropped == 0
+
+def test_block_drops_the_read_once_stopped():
+    ring = TagRingBuffer(2, OverflowPolicy.BLOCK)
+    reads = _reads(3)
+    stop = threading.Event()
+    stop.set()
+    assert ring.put(reads[0], stop) and ring.put(reads[1], stop)
+    assert not ring.put(reads[2], stop)
+    assert ring.dropped == 1 and ring.written == 2
+    assert ring.get_batch() == reads[:2]
+    assert ring.dropped == 1
+
+def test_iteration_and_batches(emulator, reader):
+    expected = epcs_of(emulator.tags)
+    seen = set()
+    with ContinuousInventory(reader, slot_q=6) as inventory:
+        for read in inventory:
+            seen.add(read.epc_hex)
+            if seen == expected:
+                break
+        deadline = time.monotonic() + 5
+        while inventory.rounds < 3 and time.monotonic() < deadline:
+            inventory.get_batch(timeout=0.1)
+    # The reads left after stop() can still be drained
+    inventory.get_batch()
+    assert seen == expected
+    assert inventory.error is None and not inventory.running
+    assert inventory.get_batch(timeout=0.01) == []
+    assert inventory.stats['reads'] == inventory.buffer.written and inventory.stats['pending'] == 0
+
+def test_callbacks_get_every_read(make_emulator):
+    emulator = make_emulator(collision_error_rate=0.0)
+    expected = epcs_of(emulator.tags)
+    seen = set()
+    complete = threading.Event()
+
+    def collect(read):
+        seen.add(read.epc_hex)
+        if seen == expected:
+            complete.set()
+
+    def fail(read):
+        raise ValueError(read)
+
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        inventory = ContinuousInventory(reader, slot_q=6, overflow=OverflowPolicy.BLOCK)
+        inventory.on_tag(collect)
+        inventory.on_tag(fail)
+        with inventory:
+            assert complete.wait(5.0)
+    assert seen == expected
+    # Every read went through both callbacks, nothing was dropped
+    assert inventory.dropped == 0
+    assert inventory.callback_errors == inventory.buffer.written
+
+def test_producer_survives_garbled_rounds(emulator, reader, monkeypatch):
+    read_round = reader.read_many_tag_reads
+    garbled = [2]
+
+    def garbled_round(slot_q):
+        if garbled[0]:
+            garbled[0] -= 1
+            raise UnexpectedReaderResponseException("garbled frame")
+        return read_round(slot_q)
+
+    monkeypatch.setattr(reader, 'read_many_tag_reads', garbled_round)
+    with ContinuousInventory(reader, slot_q=6) as inventory:
+        assert inventory.get_batch(timeout=5.0)
+    assert inventory.error is None and inventory.reader_errors == 2
+    assert inventory.stats['reader_errors'] == 2
+
+def test_producer_gives_up_on_a_silent_reader(emulator, reader, monkeypatch):
+    def silent_round(slot_q):
+        raise UnexpectedReaderResponseException("no response")
+
+    monkeypatch.setattr(reader, 'read_many_tag_reads', silent_round)
+    inventory = ContinuousInventory(reader, slot_q=6)
+    inventory.start()
+    inventory._producer.join(5.0)
+    assert not inventory.running
+    assert isinstance(inventory.error, UnexpectedReaderResponseException)
+    assert inventory.reader_errors == MAX_READER_ERRORS
@@ -0,0 +1,52 @@
+from fonkanfm50x.dedup import TagDeduplicator, TagSighting
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_reports_once_per_presence():
+    clock = Clock()
+    expired: list[TagSighting] = []
+    dedup = TagDeduplicator(window=10, on_expire=expired.append, clock=clock)
+    emitted = []
+    for now in (0, 1, 2, 5):
+        clock.now = now
+        emitted += list(dedup.filter(['A', 'B'] if now < 5 else ['A']))
+    assert [(s.epc, s.first_seen, s.last_seen, s.count) for s in emitted] == [('A', 0, 0, 1), ('B', 0, 0, 1)]
+
+    # B absent for the window: its whole presence goes to on_expire, then it is reported again
+    clock.now = 12.5
+    assert list(dedup.filter(['B'])) == [TagSighting('B', 12.5, 12.5, 1)]
+    assert expired == [TagSighting('B', 0, 2, 3)]
+
+def test_expire_all_passes_final_spans():
+    clock = Clock()
+    expired: list[TagSighting] = []
+    dedup = TagDeduplicator(window=10, on_expire=expired.append, clock=clock)
+    for now in range(4):
+        clock.now = now
+        list(dedup.filter([('A', '1234')]))
+    dedup.expire_all()
+    assert expired == [TagSighting('A', 0, 3, 4)]
+    assert len(dedup) == 0
+
+def test_max_entries_evicts_least_recently_seen():
+    clock = Clock()
+    expired: list[TagSighting] = []
+    dedup = TagDeduplicator(window=100, max_entries=2, on_expire=expired.append, clock=clock)
+    for epc in ('A', 'B', 'A', 'C'):
+        dedup.seen(epc)
+    assert 'B' not in dedup and 'A' in dedup and 'C' in dedup
+    assert [sighting.epc for sighting in expired] == ['B']
+
+def test_refresh_reports_the_presence_so_far():
+    clock = Clock()
+    dedup = TagDeduplicator(window=10, refresh=5, clock=clock)
+    emitted = []
+    for now in range(13):
+        clock.now = now
+        emitted += list(dedup.filter([('A', '1234')]))
+    assert emitted == [TagSighting('A', 0, 0, 1, '1234'), TagSighting('A', 0, 5, 6, '1234'), TagSighting('A', 0, 10, 11, '1234')]
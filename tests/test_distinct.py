@@ -0,0 +1,75 @@
+import random
+import time
+
+import pytest
+
+from fonkanfm50x.distinct import HyperLogLog, epc_hash
+from fonkanfm50x.tagread import TagRead
+
+def _hashes(n: int, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(n)]
+
+def _sketch(hashes: list[int], **kwargs) -> HyperLogLog:
+    sketch = HyperLogLog(**kwargs)
+    for h in hashes:
+        sketch.add_hash(h)
+    return sketch
+
+def test_exact_up_to_threshold():
+    hashes = _hashes(256)
+    sketch = _sketch(hashes + hashes[:100])
+    assert sketch.exact and sketch.standard_error == 0.0
+    assert len(sketch) == 256
+
+@pytest.mark.parametrize('size', [257, 300, 10_000, 100_000])
+def test_relative_error(size):
+    # Past the switch to the registers: within 4 standard errors (6.5% at precision 12)
+    for seed in range(3 if size < 100_000 else 1):
+        sketch = _sketch(_hashes(size, seed))
+        assert not sketch.exact
+        assert abs(sketch.count() / size - 1) < 4 * sketch.standard_error
+
+def test_merge_is_the_union():
+    hashes = _hashes(20_000)
+    both = _sketch(hashes)
+    for left, right in ((hashes[:15_000], hashes[5_000:]), (hashes[:100], hashes[100:]), (hashes[100:], hashes[:100])):
+        merged = _sketch(left) | _sketch(right)
+        assert merged._registers == both._registers
+        assert merged.count() == both.count()
+    small = _sketch(hashes[:100]) | _sketch(hashes[50:200])
+    assert small.exact and small.count() == 200
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=12).merge(HyperLogLog(precision=10))
+
+@pytest.mark.parametrize('size', [100, 50_000])
+def test_bytes_round_trip(size):
+    sketch = _sketch(_hashes(size), precision=10)
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert (restored.precision, restored.exact_threshold, restored.exact) == (10, sketch.exact_threshold, sketch.exact)
+    assert restored._exact == sketch._exact and restored._registers == sketch._registers
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(sketch.to_bytes()[:-1])
+
+def test_same_hash_for_every_epc_form():
+    epc = '3034257BF7194E4000001A85'
+    read = TagRead(0x3000, bytes.fromhex(epc), b'', 0.0)
+    assert epc_hash(epc) == epc_hash(bytes.fromhex(epc)) == epc_hash(read)
+
+def test_update_matches_add_and_keeps_up():
+    rng = random.Random(0)
+    epcs = [rng.randbytes(12).hex().upper() for _ in range(100_000)]
+    added = HyperLogLog()
+    for epc in epcs[:2000]:
+        added.add(epc)
+    updated = HyperLogLog()
+    updated.update(epcs[:2000])
+    assert updated._registers == added._registers
+
+    sketch = HyperLogLog()
+    start = time.perf_counter()
+    sketch.update(epcs)
+    # About 700k/s here: far ahead of any number of readers
+    assert len(epcs) / (time.perf_counter() - start) > 100_000
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from conftest import epcs_of, inventory_until_complete, random_tags
+from fonkanfm50x.encoder import BulkEncoder, EncodeJob
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.types import LockAction, LockField
+
+OLD_PASSWORD = 0x11223344
+NEW_PASSWORD = 0x55667788
+
+@pytest.fixture
+def locked_tags():
+    """
+    Tags with EPC, USER and access password locked behind OLD_PASSWORD
+    """
+    tags = random_tags(3)
+    for tag in tags:
+        tag.reserved = bytes(4) + OLD_PASSWORD.to_bytes(4)
+        tag.lock_actions.update({field: LockAction.LOCK for field in (LockField.EPC, LockField.USER, LockField.ACCESS_PASSWORD)})
+    return tags
+
+def _jobs(tags, seed: int = 0) -> list[EncodeJob]:
+    rng = random.Random(seed)
+    return [
+        EncodeJob(
+            target=tag.epc.hex().upper(),
+            epc=rng.randbytes(12).hex().upper(),
+            user=rng.randbytes(64).hex().upper(),
+            password=OLD_PASSWORD,
+            new_password=NEW_PASSWORD,
+            lock={LockField.EPC: LockAction.LOCK, LockField.USER: LockAction.LOCK},
+        )
+        for tag in tags
+    ]
+
+def _assert_encoded(tag, job: EncodeJob):
+    assert tag.epc.hex().upper() == job.epc
+    assert tag.user[:len(job.user) // 2].hex().upper() == job.user
+    assert tag.access_password == NEW_PASSWORD
+
+@pytest.mark.parametrize('pipeline', [True, False])
+def test_encode_password_locked_tags(make_emulator, locked_tags, pipeline):
+    emulator = make_emulator(tags=locked_tags)
+    jobs = _jobs(locked_tags)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        encoder = BulkEncoder(reader, pipeline=pipeline)
+        results = list(encoder.encode(jobs))
+    assert [(result.success, result.error_code, result.attempts) for result in results] == [(True, None, 1)] * len(jobs)
+    for tag, job in zip(locked_tags, jobs):
+        _assert_encoded(tag, job)
+    assert encoder.encoded == len(jobs) and encoder.failed == 0
+
+def test_retry_follows_written_epc_and_password(make_emulator, locked_tags):
+    emulator = make_emulator(tags=locked_tags[:1])
+    job = _jobs(locked_tags[:1])[0]
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        send = reader.send_commands_pipelined
+        cut = []
+
+        def lose_link_after_password_write(commands):
+            # First attempt: everything up to the access password write goes through, then the link drops
+            if not cut:
+                cut.append(next(i for i, command in enumerate(commands) if command.startswith('W0,2,')) + 1)
+                return send(commands[:cut[0]]) + [None] * (len(commands) - cut[0])
+            return send(commands)
+
+        reader.send_commands_pipelined = lose_link_after_password_write
+        result = BulkEncoder(reader).encode_one(job)
+    assert (result.success, result.attempts) == (True, 2), result.error
+    _assert_encoded(locked_tags[0], job)
+
+def test_wrong_password_fails_on_first_write(make_emulator, locked_tags):
+    emulator = make_emulator(tags=locked_tags[:1])
+    job = _jobs(locked_tags[:1])[0]._replace(password=0xDEADBEEF)
+    epc = locked_tags[0].epc
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        result = BulkEncoder(reader).encode_one(job)
+    assert not result.success and result.error_code == '4'
+    assert locked_tags[0].epc == epc and locked_tags[0].access_password == OLD_PASSWORD
+
+@pytest.mark.parametrize('lock', [True, False])
+def test_jobs_leave_inventories_unfiltered(make_emulator, locked_tags, lock):
+    # Firmware applying T to inventories: the select of the last job would hide every other tag
+    emulator = make_emulator(tags=locked_tags, select_gates_inventory=True, collision_error_rate=0.0)
+    jobs = [job if lock else job._replace(lock=None) for job in _jobs(locked_tags)]
+    # The last job fails on its first write, before the lock round-trip
+    jobs[-1] = jobs[-1]._replace(password=0xDEADBEEF)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        results = list(BulkEncoder(reader, retries=0).encode(jobs))
+        assert [result.success for result in results] == [True, True, False]
+        expected = epcs_of(locked_tags)
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), expected) == expected
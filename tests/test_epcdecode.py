@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from fonkanfm50x.epcdecode import EPCScheme, PARTITION_TABLES, REFERENCE_LOW_BIT, decode_epc, decode_array, decode_many, _decode_python
+
+# GS1 EPC Tag Data Standard examples: EPC -> tag URI
+REFERENCE_VECTORS = {
+    '3074257BF7194E4000001A85': 'urn:epc:tag:sgtin-96:3.0614141.812345.6789',
+    '3174257BF4499602D2000000': 'urn:epc:tag:sscc-96:3.0614141.1234567890',
+    '3374257BF40C0E400000162E': 'urn:epc:tag:grai-96:3.0614141.12345.5678',
+    '3474257BF40000000000162E': 'urn:epc:tag:giai-96:3.0614141.5678',
+}
+
+def _random_epcs(n: int, seed: int = 0) -> list[str]:
+    """
+    Well-formed EPCs of every scheme and partition
+    """
+    rng = random.Random(seed)
+    epcs = []
+    for _ in range(n):
+        scheme = rng.choice(list(EPCScheme))
+        partition = rng.randrange(7)
+        company_bits, company_digits, reference_bits, reference_digits = PARTITION_TABLES[scheme][partition]
+        low = REFERENCE_LOW_BIT[scheme]
+        value = scheme.value << 88 | rng.randrange(8) << 85 | partition << 82
+        value |= rng.randrange(min(10 ** company_digits, 1 << company_bits)) << (low + reference_bits)
+        value |= rng.randrange(min(10 ** reference_digits, 1 << reference_bits)) << low
+        value |= rng.getrandbits(38) if low == 38 else 0
+        epcs.append(f"{value:024X}")
+    return epcs
+
+@pytest.mark.parametrize('epc, uri', REFERENCE_VECTORS.items())
+def test_reference_vectors(epc, uri):
+    assert decode_epc(epc).tag_uri == uri
+    assert decode_epc(bytes.fromhex(epc)).tag_uri == uri
+    # Single, batch and pure Python paths agree
+    assert decode_many([epc] * 100)[0].tag_uri == uri
+    assert _decode_python([epc])[0].tag_uri == uri
+
+def test_batch_matches_single():
+    epcs = _random_epcs(2000)
+    expected = [decode_epc(epc) for epc in epcs]
+    assert None not in expected
+    assert decode_many(epcs) == expected
+    assert decode_many([bytes.fromhex(epc) for epc in epcs]) == expected
+
+def test_unsupported_and_malformed_decode_to_none():
+    epcs = _random_epcs(100)
+    broken = {
+        3: 'not an EPC at all, 24 ch',
+        10: '3074257BF7194E4000001A8',
+        20: '3074 257BF7194E4000001A85'[:24],
+        30: 'E2801105' * 3,
+        40: '3C74257BF7194E4000001A85', # partition 7
+        50: '0x74257BF7194E4000001A85',
+    }
+    for i, epc in broken.items():
+        epcs[i] = epc
+    expected = [None if i in broken else decode_epc(epc) for i, epc in enumerate(epcs)]
+    assert decode_many(epcs) == expected
+    assert _decode_python(epcs) == expected
+
+def test_columns():
+    pytest.importorskip('numpy')
+    epcs = list(REFERENCE_VECTORS) + ['ZZ' * 12, '30' * 6]
+    columns = decode_array(epcs)
+    assert columns.valid.tolist() == [True] * 4 + [False, False]
+    assert columns.company_prefix.tolist() == [614141] * 4 + [0, 0]
+    assert columns.serial.tolist() == [6789, 0, 5678, 0, 0, 0]
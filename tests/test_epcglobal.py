@@ -0,0 +1,93 @@
+import hashlib
+import json
+import random
+
+import pytest
+
+from fonkanfm50x.epcglobal import (MDID_JSON_PATH, MDID_TABLE_PATH, CardDetails, TagModelParser, _decode_mdid_table,
+                                   _encode_mdid_table, _index_mdid_data, build_mdid_table, load_mdid_index)
+
+with open(MDID_JSON_PATH, encoding='utf-8') as f:
+    MDID_DATA = json.load(f)
+
+def _reference_interpret(tid_string: str) -> CardDetails:
+    """
+    The former bit string decoder (linear search of the JSON), for TIDs of a registered designer
+    with more than 48 bits
+    """
+    tid_bits = bin(int(tid_string, 16))[2:].zfill(len(tid_string) * 4)
+    designer = next(d for d in MDID_DATA['registeredMaskDesigners'] if d['mdid'] == tid_bits[11:20])
+    tmn = tid_bits[20:32]
+    model_name = f"Unknown: 0x{int(tmn, 2):03X}"
+    for chip in designer.get('chips', []):
+        if chip['tmnBinary'] == tmn:
+            model_name = chip['modelName']
+    xtid_bit = tid_bits[8] == '1'
+    return CardDetails(
+        epc_tag_id=tid_string,
+        comm_standard="ISO/IEC 15963" if tid_bits[0:8] == '11100010' else "Unknown",
+        xtid_supported=xtid_bit,
+        security_bit_set=tid_bits[9] == '1',
+        file_indicator_bit=tid_bits[10] == '1',
+        designer=designer['manufacturer'].strip(),
+        model_name=model_name,
+        standard_header=f"{int(tid_bits[32:48], 2):02X}",
+        xtid_header=f"{int(tid_bits[48:], 2):02X}" if xtid_bit else None,
+    )
+
+def _known_tids(n: int) -> list[str]:
+    """
+    TIDs of registered chips (and unregistered model numbers of registered designers), random flags and serials
+    """
+    rng = random.Random(0)
+    pairs = [(designer['mdid'], chip['tmnBinary']) for designer in MDID_DATA['registeredMaskDesigners'] for chip in designer.get('chips', ())]
+    pairs += [(designer['mdid'], f"{rng.getrandbits(12):012b}") for designer in MDID_DATA['registeredMaskDesigners']]
+    tids = []
+    for _ in range(n):
+        mdid, tmn = rng.choice(pairs)
+        class_id = rng.choice(['11100010', '11100000'])
+        bits = class_id + f"{rng.getrandbits(3):03b}" + mdid + tmn + f"{rng.getrandbits(16):016b}" + f"{rng.getrandbits(48):048b}"
+        tids.append(f"{int(bits, 2):024X}")
+    return tids
+
+def test_matches_the_string_decoder():
+    parser = TagModelParser()
+    tids = _known_tids(3000)
+    assert [parser.interpret_TID_data(tid) for tid in tids] == [_reference_interpret(tid) for tid in tids]
+    assert parser.interpret_many(tids) == [_reference_interpret(tid) for tid in tids]
+
+def test_known_chip():
+    # Impinj Monza R6-P, XTID
+    details = TagModelParser().interpret_TID_data('E2801170200020F1B2C3D4E5')
+    assert (details.designer, details.model_name, details.comm_standard, details.xtid_supported) == ('Impinj', 'Monza R6-P', 'ISO/IEC 15963', True)
+    assert (details.standard_header, details.xtid_header) == ('2000', '20F1B2C3D4E5')
+
+def test_table_round_trip():
+    index = _index_mdid_data(MDID_DATA)
+    digest = hashlib.sha256(b'source').digest()
+    assert _decode_mdid_table(_encode_mdid_table(index, digest)) == (index, digest)
+    with pytest.raises(ValueError):
+        _decode_mdid_table(_encode_mdid_table(index, digest)[:-2])
+    with pytest.raises(ValueError):
+        _decode_mdid_table(b'NOTATABLE' + bytes(64))
+
+def test_shipped_table_is_current():
+    with open(MDID_TABLE_PATH, 'rb') as f:
+        index, digest = _decode_mdid_table(f.read())
+    with open(MDID_JSON_PATH, 'rb') as f:
+        assert digest == hashlib.sha256(f.read()).digest()
+    assert index == _index_mdid_data(MDID_DATA)
+
+def test_stale_table_is_ignored(tmp_path):
+    # A table built from another version of the list must not be used for this one
+    changed = json.loads(json.dumps(MDID_DATA))
+    changed['registeredMaskDesigners'][0]['manufacturer'] = 'Stale Inc.'
+    stale_json = tmp_path / 'old_mdid_list.json'
+    stale_json.write_text(json.dumps(changed), encoding='utf-8')
+    stale_table = tmp_path / 'mdid_table.bin'
+    build_mdid_table(str(stale_json), str(stale_table))
+
+    index = load_mdid_index(MDID_JSON_PATH, str(stale_table))
+    assert 'Stale Inc.' not in index[0].values()
+    assert index == _index_mdid_data(MDID_DATA)
+    assert 'Stale Inc.' in load_mdid_index(str(stale_json), str(stale_table))[0].values()
@@ -0,0 +1,63 @@
+from fonkanfm50x.framing import FrameBuffer, SerialFrameReader
+
+class _ChunkedSerial:
+    """
+    Stand-in serial port handing out predefined chunks, one per read, then timing out
+    """
+    def __init__(self, chunks: list[bytes]):
+        self.chunks = list(chunks)
+        self.reads = 0
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size: int = 1) -> bytes:
+        self.reads += 1
+        return self.chunks.pop(0) if self.chunks else b''
+
+def test_frame_split_across_reads():
+    buffer = FrameBuffer()
+    for chunk in (b'\nU30', b'00E2', b'8011\r', b'\n'):
+        assert buffer.next_frame() is None
+        buffer.feed(chunk)
+    assert buffer.next_frame() == b'U3000E28011'
+    assert buffer.next_frame() is None and len(buffer) == 0
+
+def test_several_frames_in_one_read():
+    buffer = FrameBuffer()
+    buffer.feed(b'\nU3000AA\r\n\nU3000BB\r\n\nU\r\n\nV1.0')
+    assert [buffer.next_frame() for _ in range(4)] == [b'U3000AA', b'U3000BB', b'U', None]
+    # The partial frame waits for the rest
+    buffer.feed(b'\r\n')
+    assert buffer.next_frame() == b'V1.0'
+
+def test_leading_noise_is_dropped():
+    buffer = FrameBuffer()
+    buffer.feed(b'\x00\xff\x13garbage\nS\r\n')
+    assert buffer.next_frame() == b'S'
+    # Noise after a frame, before the next frame start
+    buffer.feed(b'\r\x7f\nN19\r\n')
+    assert buffer.next_frame() == b'N19'
+
+def test_empty_frame():
+    buffer = FrameBuffer()
+    buffer.feed(b'\n\r\n')
+    assert buffer.next_frame() == b''
+
+def test_serial_reader_reads_in_bulk():
+    ser = _ChunkedSerial([b'\nU30', b'00AA\r\n\nU3000BB\r\n\nU\r', b'\n'])
+    reader = SerialFrameReader(ser)
+    assert reader.read_frame() == b'U3000AA'
+    assert reader.read_frame() == b'U3000BB'
+    assert reader.read_frame() == b'U'
+    assert ser.reads == 3
+    # Serial timeout: no complete frame
+    assert reader.read_frame() is None
+
+def test_serial_reader_keeps_partial_frame_on_timeout():
+    ser = _ChunkedSerial([b'\nU30'])
+    reader = SerialFrameReader(ser)
+    assert reader.read_frame() is None
+    ser.chunks.append(b'00\r\n')
+    assert reader.read_frame() == b'U3000'
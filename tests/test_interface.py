@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from conftest import epcs_of, inventory_until_complete
+from fonkanfm50x.connection_cache import ConnectionCache
+from fonkanfm50x.emulator import SimulatedTag
+from fonkanfm50x.exceptions import TagGenericException
+from fonkanfm50x.interface import BaudRateTrial, FonkanUHF
+from fonkanfm50x.types import AvailableBaudRates, EPCMemoryBank
+
+def test_connect(emulator, reader):
+    assert reader.get_reader_id() == emulator.reader_id
+    assert reader.get_power_level() == 25
+
+def test_connect_finds_baud_rate(make_emulator):
+    emulator = make_emulator(baud_rate=AvailableBaudRates.BAUD_115200)
+    with FonkanUHF(serial_port=emulator.port, baud_rate=AvailableBaudRates.BAUD_38400) as reader:
+        assert reader.get_reader_id() == emulator.reader_id
+    assert emulator.baud_rate == AvailableBaudRates.BAUD_38400
+
+def test_autotune_records_the_rate_the_link_ended_on(emulator, tmp_path):
+    cache_path = str(tmp_path / 'connections.json')
+    fast, slow = AvailableBaudRates.BAUD_115200, AvailableBaudRates.BAUD_38400
+    with FonkanUHF(serial_port=emulator.port, baud_rate=slow, connection_cache_path=cache_path) as reader:
+        # 115200 measures best, but every NA to it is garbled into a tag error code
+        reader._baud_rate_trial = lambda rate, duration, slot_q: BaudRateTrial(rate, True, 1.0, 1000 if rate == fast else 100, 0, 0, 0, 0)
+        def garbled_change_baud_rate(baud_rate):
+            raise TagGenericException("response 3 while executing command NA")
+        reader.change_baud_rate = garbled_change_baud_rate
+
+        report = reader.autotune_baud_rate(rates=[slow, fast])
+        assert report.selected == reader.baud_rate == slow
+        assert reader.get_reader_id() == emulator.reader_id
+    assert ConnectionCache(cache_path).tuned_baud_rate(emulator.port) == slow
+
+def test_read_many_tag_id(emulator, reader):
+    expected = epcs_of(emulator.tags)
+    assert inventory_until_complete(lambda: reader.read_many_tag_id(4), expected) == expected
+
+def test_read_many_tag_reads_match_tag_ids(emulator, reader):
+    expected = epcs_of(emulator.tags)
+    seen = inventory_until_complete(lambda: (read.epc_hex for read in reader.read_many_tag_reads(4)), expected)
+    assert seen == expected
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_crc_failure_prints_only_with_debug(emulator, capsys, debug):
+    reply = emulator.tags[0].pc_epc_crc
+    corrupted = reply[:-4] + f"{int(reply[-4:], 16) ^ 1:04X}"
+    with FonkanUHF(serial_port=emulator.port, debug=debug) as reader:
+        capsys.readouterr()
+        assert reader._parse_tag_id_response(reply) == emulator.tags[0].epc.hex().upper()
+        with pytest.raises(RuntimeWarning):
+            reader._parse_tag_id_response(corrupted)
+    assert ('found' in capsys.readouterr().out) == debug
+
+def test_read_multi_tag_memory_multiband(emulator, reader):
+    tids = {tag.epc.hex().upper(): tag.tid.hex().upper() for tag in emulator.tags}
+    for _ in range(5):
+        try:
+            for epc, tid in reader.read_multi_tag_memory_multiband(EPCMemoryBank.TID, 0, 6, 4):
+                assert tids[epc] == tid
+        except RuntimeWarning:
+            pass
+
+@pytest.mark.parametrize('max_outstanding', [1, 4])
+def test_read_tag_memory_range(make_emulator, max_outstanding):
+    rng = random.Random(0)
+    tag = SimulatedTag.random(rng)
+    tag.user = rng.randbytes(1024)
+    emulator = make_emulator(tags=[tag], link_latency=0.002)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        epc, data = reader.read_tag_memory_range(EPCMemoryBank.USER, 0, 512, max_outstanding=max_outstanding)
+    assert epc == tag.epc.hex().upper()
+    assert data == tag.user
+
+def test_read_tag_memory_range_without_tag(make_emulator):
+    emulator = make_emulator(tags=[])
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        assert reader.read_tag_memory_range(EPCMemoryBank.USER, 0, 40) is None
+
+def test_clear_select_is_in_spec(make_emulator):
+    emulator = make_emulator(select_gates_inventory=True, collision_error_rate=0.0)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        # The reader takes selects of 1 to 96 bits only
+        assert reader.send_commands_pipelined(['T1,0,0,0']) == ['X']
+        target = emulator.tags[0].epc.hex().upper()
+        reader.select_tag_id(target)
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), {target}) == {target}
+        reader.clear_select()
+        expected = epcs_of(emulator.tags)
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), expected) == expected
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from fonkanfm50x.journal import TagJournal, HEADER_SIZE
+from fonkanfm50x.tagread import TagRead
+
+@pytest.fixture
+def reads() -> list[tuple[str, str]]:
+    rng = random.Random(0)
+    return [(rng.randbytes(12).hex().upper(), rng.randbytes(12).hex().upper()) for _ in range(50)]
+
+def _fill(journal: TagJournal, reads: list[tuple[str, str]], n: int):
+    for i in range(n):
+        epc, tid = reads[i % len(reads)]
+        journal.append(epc, tid, wall_time=1000.0 + i)
+
+def test_query_by_epc_and_time(tmp_path, reads):
+    with TagJournal(tmp_path, reader_id='01234567', fsync=False, index_interval=64) as journal:
+        _fill(journal, reads, 1000)
+        epc, tid = reads[3]
+        records = list(journal.query(epc=epc))
+        assert [record.wall_time for record in records] == [1000.0 + i for i in range(3, 1000, len(reads))]
+        assert all(record.epc_hex == epc and record.data_hex == tid and record.reader_id == '01234567' for record in records)
+        assert [record.wall_time for record in journal.query(start=1990.0)] == [1990.0 + i for i in range(10)]
+        assert len(list(journal.query(start=1100.0, end=1199.0, reader_id='other'))) == 0
+
+def test_reopen_uses_saved_index(tmp_path, reads):
+    with TagJournal(tmp_path, fsync=False) as journal:
+        _fill(journal, reads, 700)
+    with TagJournal(tmp_path) as journal:
+        assert len(journal) == 700
+        assert journal.recovered == {}
+        _fill(journal, reads, 10)
+        assert len(list(journal.query(epc=reads[0][0]))) == 15
+
+def test_recovery_cuts_torn_record(tmp_path, reads):
+    journal = TagJournal(tmp_path, fsync=False)
+    _fill(journal, reads, 300)
+    journal.flush()
+    record_size = journal.layout.size
+    segment = next(tmp_path.glob('segment-*.fmj'))
+    # Crash: index not saved, half of a record written
+    with open(segment, 'ab') as f:
+        f.write(b'\x01' * (record_size // 2))
+
+    with TagJournal(tmp_path) as recovered:
+        assert len(recovered) == 300
+        assert recovered.recovered == {segment.name: record_size // 2}
+        assert len(list(recovered.query(epc=reads[7][0]))) == 6
+    assert segment.stat().st_size == HEADER_SIZE + 300 * record_size
+
+def test_recovery_stops_at_corrupt_record(tmp_path, reads):
+    journal = TagJournal(tmp_path, fsync=False)
+    _fill(journal, reads, 100)
+    journal.flush()
+    record_size = journal.layout.size
+    segment = next(tmp_path.glob('segment-*.fmj'))
+    with open(segment, 'r+b') as f:
+        f.seek(HEADER_SIZE + 60 * record_size + 40)
+        f.write(b'\xFF')
+
+    with TagJournal(tmp_path) as recovered:
+        assert len(recovered) == 60
+        assert recovered.recovered == {segment.name: 40 * record_size}
+
+def test_records_outlive_the_mapping(tmp_path, reads):
+    with TagJournal(tmp_path, fsync=False) as journal:
+        _fill(journal, reads, 100)
+        records = list(journal.query(epc=reads[5][0]))
+        # Growing the segment remaps it
+        _fill(journal, reads, 5000)
+    assert [(record.epc_hex, record.data_hex) for record in records] == [reads[5]] * 2
+
+def test_append_many_matches_append(tmp_path, reads):
+    tag_reads = [TagRead(0x3000, bytes.fromhex(epc), bytes.fromhex(tid), 5.0 + i) for i, (epc, tid) in enumerate(reads[:10])]
+    batch = reads + [epc for epc, _ in reads[:5]] + tag_reads
+    # Small groups and segments: the batch is flushed and rolled over several times
+    with TagJournal(tmp_path / 'one', fsync=False, group_records=16, segment_records=40, index_interval=8) as one:
+        for read in batch:
+            if isinstance(read, TagRead):
+                one.append_read(read)
+            elif isinstance(read, tuple):
+                one.append(*read)
+            else:
+                one.append(read)
+    with TagJournal(tmp_path / 'many', fsync=False, group_records=16, segment_records=40, index_interval=8) as many:
+        assert many.append_many(batch[:30]) == 30
+        assert many.append_many(iter(batch[30:]), reader_id='dock') == len(batch) - 30
+        assert len(many) == len(batch)
+        assert len(many._segments) == 2
+
+    def contents(journal: TagJournal) -> list[tuple]:
+        return [(record.pc, record.epc, record.data) for record in journal.query()]
+
+    with TagJournal(tmp_path / 'one') as one, TagJournal(tmp_path / 'many') as many:
+        assert many.recovered == {}
+        assert contents(many) == contents(one)
+        assert [record.timestamp for record in many.query()][-10:] == [read.timestamp for read in tag_reads]
+        # In reads, the bare EPCs and the TagRead records
+        assert len(list(many.query(epc=reads[2][0]))) == 3
+        assert len(list(many.query(reader_id='dock'))) == len(batch) - 30
+
+def test_append_many_keeps_the_reads_before_an_error(tmp_path, reads):
+    with TagJournal(tmp_path, fsync=False, index_interval=8) as journal:
+        with pytest.raises(ValueError):
+            journal.append_many(reads[:20] + [('00' * 20, '')] + reads[20:])
+        assert len(journal) == 20
+        assert [record.epc_hex for record in journal.query()] == [epc for epc, _ in reads[:20]]
+    with TagJournal(tmp_path) as journal:
+        assert len(journal) == 20 and journal.recovered == {}
@@ -0,0 +1,115 @@
+from conftest import epcs_of, inventory_until_complete
+from fonkanfm50x.exceptions import TagGenericException
+from fonkanfm50x.interface import FonkanUHF, CLEAR_SELECT_COMMAND
+from fonkanfm50x.memcache import TagMemoryCache
+from fonkanfm50x.types import EPCMemoryBank
+
+def test_read_many_leaves_inventories_unfiltered(make_emulator):
+    # Firmware applying T to inventories: a select left over from the miss reads would hide the other tags
+    emulator = make_emulator(select_gates_inventory=True, collision_error_rate=0.0)
+    expected = {tag.epc.hex().upper(): tag.tid[:12].hex().upper() for tag in emulator.tags}
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        cache = TagMemoryCache(reader, pipeline_tags=3)
+        seen = {}
+        for _ in range(5):
+            try:
+                seen.update(cache.read_many(EPCMemoryBank.TID, 0, 6, slot_q=6))
+            except TagGenericException:
+                pass
+        assert seen == expected
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), set(expected)) == set(expected)
+
+def test_closing_read_many_clears_the_select(make_emulator):
+    emulator = make_emulator(select_gates_inventory=True, collision_error_rate=0.0)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        cache = TagMemoryCache(reader, pipeline_tags=1)
+        reads = cache.read_many(EPCMemoryBank.TID, 0, 6, slot_q=6)
+        next(reads)
+        reads.close()
+        expected = epcs_of(emulator.tags)
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), expected) == expected
+
+def test_ttl_expiry():
+    now = [0.0]
+    cache = TagMemoryCache(ttl=10, clock=lambda: now[0])
+    cache.put('E1', EPCMemoryBank.TID, 0, 6, 'AA')
+    now[0] = 9.9
+    assert cache.get('E1', EPCMemoryBank.TID, 0, 6) == 'AA'
+    now[0] = 10.0
+    assert cache.get('E1', EPCMemoryBank.TID, 0, 6) is None
+    assert cache.expirations == 1 and len(cache) == 0
+    # An explicit now overrides the clock
+    cache.put('E1', EPCMemoryBank.TID, 0, 6, 'AA', now=20.0)
+    assert cache.get('E1', EPCMemoryBank.TID, 0, 6, now=25.0) == 'AA'
+    assert cache.get('E1', EPCMemoryBank.TID, 0, 6, now=30.0) is None
+
+def test_lru_eviction_within_max_entries():
+    cache = TagMemoryCache(max_entries=3, clock=lambda: 0.0)
+    for epc in ('E1', 'E2', 'E3'):
+        cache.put(epc, EPCMemoryBank.TID, 0, 6, epc)
+    # E1 becomes the most recently used, so E2 goes first
+    assert cache.get('E1', EPCMemoryBank.TID, 0, 6) == 'E1'
+    cache.put('E4', EPCMemoryBank.TID, 0, 6, 'E4')
+    assert len(cache) == 3 and cache.evictions == 1
+    assert cache.get('E2', EPCMemoryBank.TID, 0, 6) is None
+    # Storing a cached key again refreshes it without evicting
+    cache.put('E3', EPCMemoryBank.TID, 0, 6, 'E3 again')
+    assert len(cache) == 3 and cache.evictions == 1
+    for i in range(10):
+        cache.put(f"F{i}", EPCMemoryBank.TID, 0, 6, '')
+        assert len(cache) <= 3
+    assert cache.evictions == 11
+    assert [cache.get(f"F{i}", EPCMemoryBank.TID, 0, 6) for i in range(7, 10)] == ['', '', '']
+
+def test_invalidate():
+    cache = TagMemoryCache(clock=lambda: 0.0)
+    for epc in ('E1', 'E2'):
+        cache.put(epc, EPCMemoryBank.TID, 0, 6, 'AA')
+        cache.put(epc, EPCMemoryBank.USER, 0, 2, 'BB')
+    assert cache.invalidate('E1', EPCMemoryBank.USER) == 1
+    assert cache.get('E1', EPCMemoryBank.TID, 0, 6) == 'AA'
+    assert cache.invalidate('E1') == 1
+    assert cache.invalidate(bank=EPCMemoryBank.USER) == 1
+    assert cache.invalidate('E3') == 0
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+def test_stats_count_hits_and_misses(make_emulator):
+    emulator = make_emulator(collision_error_rate=0.0)
+    expected = {tag.epc.hex().upper(): tag.tid[:12].hex().upper() for tag in emulator.tags}
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        cache = TagMemoryCache(reader)
+        seen = {}
+        for _ in range(10):
+            try:
+                seen.update(cache.read_many(EPCMemoryBank.TID, 0, 6, slot_q=6))
+            except TagGenericException:
+                pass
+            if seen == expected:
+                break
+        assert seen == expected
+        # Every tag missed once, then all hits
+        assert cache.misses == len(expected)
+        cache.reset_stats()
+        assert dict(cache.read_many(EPCMemoryBank.TID, 0, 6, slot_q=6)).items() <= expected.items()
+        assert cache.misses == 0 and cache.hits > 0
+        assert cache.stats == {'entries': len(expected), 'hits': cache.hits, 'misses': 0, 'hit_rate': 1.0,
+                               'evictions': 0, 'expirations': 0}
+
+def test_unacknowledged_clear_is_sent_again(emulator, monkeypatch):
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        send = reader.send_commands_pipelined
+        sent = []
+
+        def lose_first_clear_response(commands):
+            sent.append(commands)
+            responses = send(commands)
+            if len(sent) == 1:
+                responses[-1] = None
+            return responses
+
+        monkeypatch.setattr(reader, 'send_commands_pipelined', lose_first_clear_response)
+        tag = emulator.tags[0]
+        reads = list(TagMemoryCache(reader)._read_misses([tag.epc.hex().upper()], EPCMemoryBank.TID, 0, 6))
+        assert reads == [(tag.epc.hex().upper(), tag.tid[:12].hex().upper())]
+        assert sent[0][-1] == CLEAR_SELECT_COMMAND and sent[1:] == [[CLEAR_SELECT_COMMAND]]
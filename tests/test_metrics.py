@@ -0,0 +1,134 @@
+import time
+
+import pytest
+
+from fonkanfm50x.exceptions import ReaderCommandNotSupportedException, TagGenericException, UnexpectedReaderResponseException
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.metrics import Histogram, ReaderMetrics, to_prometheus
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((1, 2, 5))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1, 1.5, 2, 3, 4, 10, 10):
+        histogram.observe(value)
+    # A value on a bound goes into that bound's bucket
+    assert histogram.counts == [2, 2, 2, 2]
+    assert histogram.cumulative() == [(1, 2), (2, 4), (5, 6), (float('inf'), 8)]
+    assert (histogram.count, histogram.sum) == (8, 32.0)
+    assert [histogram.quantile(q) for q in (0, 0.25, 0.5, 0.75, 0.76, 1)] == [1, 1, 2, 5, float('inf'), float('inf')]
+    summary = histogram.summary()
+    assert summary['mean'] == 4.0 and summary['p50'] == 2 and summary['p95'] == float('inf')
+    assert summary['buckets'] == {'1': 2, '2': 4, '5': 6, '+Inf': 8}
+
+def test_discard_pending_keeps_latencies_matched():
+    clock = _Clock()
+    metrics = ReaderMetrics(clock)
+    metrics.command_sent('U', 4)
+    metrics.command_sent('R', 10)
+    clock.now = 1.0
+    metrics.frame_received(None)
+    # The line is drained: the R response will never be matched
+    metrics.discard_pending()
+    clock.now = 2.0
+    metrics.command_sent('V', 3)
+    clock.now = 2.003
+    metrics.frame_received(b'V0102')
+    assert dict(metrics.timeouts) == {'U': 1}
+    assert list(metrics.latency) == ['V']
+    assert metrics.latency['V'].sum == pytest.approx(0.003)
+    # A timeout without any command pending goes to the last command written
+    metrics.frame_received(None)
+    assert dict(metrics.timeouts) == {'U': 1, 'V': 1}
+
+def test_reader_records_commands_and_rounds(make_emulator):
+    emulator = make_emulator(collision_error_rate=0.0)
+    metrics = ReaderMetrics()
+    with FonkanUHF(serial_port=emulator.port, metrics=metrics) as reader:
+        metrics.reset()
+        reader.get_reader_id()
+        reader.get_reader_firmware()
+        for _ in range(3):
+            list(reader.read_many_tag_id(6))
+    snapshot = metrics.snapshot()
+    assert set(snapshot['commands']) == {'S', 'U', 'V'}
+    assert snapshot['commands']['S']['count'] == 1 and snapshot['commands']['V']['count'] == 1
+    assert snapshot['inventory']['rounds'] == 3
+    assert snapshot['inventory']['tags'] == metrics.round_tags > 0
+    assert snapshot['inventory']['tags_per_round_histogram']['count'] == 3
+    assert snapshot['bytes_out'] > 0 and snapshot['bytes_in'] > 0
+    assert snapshot['frames_in'] == metrics.frames_in >= 2 + metrics.round_tags
+
+def test_retry_and_timeout_counters(emulator):
+    metrics = ReaderMetrics()
+    with FonkanUHF(serial_port=emulator.port, metrics=metrics) as reader:
+        metrics.reset()
+        with pytest.raises(ReaderCommandNotSupportedException):
+            reader.send_command_and_get_response('Z')
+        assert dict(metrics.retries) == {'Z': 3}
+        # The reader ignores commands while applying a setting: V and S are lost, the line is drained
+        assert reader.send_commands_pipelined(['N1,14', 'V', 'S']) == ['N14', None, None]
+        assert dict(metrics.timeouts) == {'V': 1, 'S': 1}
+        time.sleep(emulator.setting_busy_time)
+        assert 'V' not in metrics.latency
+        # Latencies are matched again once the drained commands are no longer pending
+        reader.get_reader_firmware()
+        assert metrics.latency['V'].count == 1
+        assert not metrics._pending
+    snapshot = metrics.snapshot()
+    assert snapshot['retries'] == {'Z': 3} and snapshot['timeouts'] == {'V': 1, 'S': 1}
+    assert snapshot['commands']['V']['timeouts'] == 1
+
+def test_crc_failures(make_emulator):
+    emulator = make_emulator(collision_error_rate=0.0)
+    metrics = ReaderMetrics()
+    with FonkanUHF(serial_port=emulator.port, metrics=metrics) as reader:
+        metrics.reset()
+        # Garbled replies fail the CRC16 check of their EPC
+        emulator.byte_error_rates = {emulator.baud_rate: 0.003}
+        crc_rounds = 0
+        for _ in range(40):
+            try:
+                list(reader.read_many_tag_id(6))
+            except RuntimeWarning:
+                crc_rounds += 1
+            except (TagGenericException, UnexpectedReaderResponseException):
+                # Garbled error frames or lost replies
+                pass
+        emulator.byte_error_rates = {}
+    assert metrics.crc_failures >= crc_rounds > 0
+    assert metrics.snapshot()['crc_failures'] == metrics.crc_failures
+    assert f"fonkanfm50x_crc_failures_total {metrics.crc_failures}\n" in metrics.to_prometheus()
+
+def test_prometheus_text():
+    clock = _Clock()
+    metrics = ReaderMetrics(clock)
+    metrics.command_sent('V', 3)
+    clock.now = 0.002
+    metrics.frame_received(b'V0102')
+    metrics.retry('U')
+    metrics.tag_error('4')
+    metrics.inventory_round(3, 0.02)
+    text = metrics.to_prometheus({'reader': 'dock "1"'})
+    lines = text.splitlines()
+    assert "# TYPE fonkanfm50x_command_duration_seconds histogram" in lines
+    assert 'fonkanfm50x_command_duration_seconds_bucket{reader="dock \\"1\\"",command="V",le="0.0025"} 1' in lines
+    assert 'fonkanfm50x_command_duration_seconds_bucket{reader="dock \\"1\\"",command="V",le="+Inf"} 1' in lines
+    assert 'fonkanfm50x_command_duration_seconds_count{reader="dock \\"1\\"",command="V"} 1' in lines
+    assert 'fonkanfm50x_command_retries_total{reader="dock \\"1\\"",command="U"} 1' in lines
+    assert 'fonkanfm50x_tag_errors_total{reader="dock \\"1\\"",code="4"} 1' in lines
+    assert 'fonkanfm50x_inventory_rounds_total{reader="dock \\"1\\""} 1' in lines
+    assert 'fonkanfm50x_inventory_tags_per_round_bucket{reader="dock \\"1\\"",le="5"} 1' in lines
+    assert text.endswith('\n')
+
+    # Several readers: one HELP/TYPE per metric, the samples of both under it
+    other = ReaderMetrics(clock)
+    merged = to_prometheus([(metrics, {'reader': 'a'}), (other, {'reader': 'b'})], prefix='rfid')
+    assert merged.count("# TYPE rfid_inventory_rounds_total counter") == 1
+    assert 'rfid_inventory_rounds_total{reader="a"} 1' in merged and 'rfid_inventory_rounds_total{reader="b"} 0' in merged
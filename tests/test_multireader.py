@@ -0,0 +1,46 @@
+import time
+
+from conftest import epcs_of, random_tags
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.multireader import MultiReaderInventory
+
+def _collect(inventory: MultiReaderInventory, expected: dict[str, set[str]], timeout: float = 5.0) -> dict[str, set[str]]:
+    """
+    EPCs per reader ID, until every reader has read its expected ones
+    """
+    seen: dict[str, set[str]] = {reader_id: set() for reader_id in expected}
+    deadline = time.monotonic() + timeout
+    while seen != expected and time.monotonic() < deadline:
+        event = inventory.get(timeout=0.1)
+        if event is not None:
+            seen.setdefault(event.reader_id, set()).add(event.epc)
+    return seen
+
+def test_merges_readers(make_emulator):
+    # Different tags in each field: every event must come from the reader that saw the tag
+    emulators = [make_emulator(reader_id=f"0000000{i}", tags=random_tags(10, seed=i)) for i in range(2)]
+    expected = {emulator.reader_id: epcs_of(emulator.tags) for emulator in emulators}
+    assert not expected['00000000'] & expected['00000001']
+    readers = [FonkanUHF(serial_port=emulator.port) for emulator in emulators]
+    with MultiReaderInventory(readers, slot_q=4) as inventory:
+        assert _collect(inventory, expected) == expected
+        assert inventory.reader_ids == {emulator.port: emulator.reader_id for emulator in emulators}
+    assert not inventory.running
+
+def test_garbled_frame_reconnects(emulator):
+    reader = FonkanUHF(serial_port=emulator.port)
+    read_many_tag_id = reader.read_many_tag_id
+    failures = [ValueError("non-hexadecimal number found in fromhex() arg"), IndexError("string index out of range")]
+
+    def garbled(slot_q=None):
+        if failures:
+            raise failures.pop(0)
+        return read_many_tag_id(slot_q)
+
+    reader.read_many_tag_id = garbled
+    with MultiReaderInventory([reader], slot_q=4, reconnect_delay=0.01) as inventory:
+        expected = {emulator.reader_id: epcs_of(emulator.tags)}
+        assert _collect(inventory, expected) == expected
+        assert inventory.running
+        assert emulator.port not in inventory.errors
+    assert failures == []
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import epcs_of, random_tags
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.powersweep import PowerSweep
+
+@pytest.fixture
+def pallet():
+    """
+    Tags at increasing distances: energized from 5, 12 or 20 dB on
+    """
+    tags = random_tags(9)
+    for i, tag in enumerate(tags):
+        tag.min_power = (5, 12, 20)[i % 3]
+    return tags
+
+def test_min_power_is_the_lowest_level_reached(make_emulator, pallet):
+    emulator = make_emulator(tags=pallet, collision_error_rate=0.0)
+    levels = [25, 15, 10, 5, 0]
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        sweep = PowerSweep(reader, levels=levels, slot_q=5, patience=3)
+        reads = list(sweep.run(cycles=2))
+    expected = {tag.epc.hex().upper(): min(level for level in levels if level >= tag.min_power) for tag in pallet}
+    assert sweep.min_power == expected
+    # No tag replies below its own power
+    assert all(level >= tag.min_power for tag in pallet for epc, level in reads if epc == tag.epc.hex().upper())
+    assert sweep.stats['tags'] == len(pallet) and sweep.stats['cycles'] == 2
+
+def test_levels_are_ordered_by_yield(make_emulator, pallet):
+    emulator = make_emulator(tags=pallet, collision_error_rate=0.0)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        sweep = PowerSweep(reader, levels=[0, 3, 25], slot_q=5)
+        assert epcs_of(pallet) == {epc for epc, _ in sweep.cycle()}
+        # 0 and 3 dB reach no tag: 25 dB found them all and goes first
+        assert sweep.yields[0] == sweep.yields[3] == 0.0 < sweep.yields[25]
+        assert sweep.levels == [25, 0, 3]
+
+        fixed = PowerSweep(reader, levels=[0, 3, 25], slot_q=5, reorder=False)
+        list(fixed.cycle())
+        assert fixed.levels == [0, 3, 25]
+
+def test_patience_ends_a_level_early(make_emulator, pallet):
+    emulator = make_emulator(tags=pallet, collision_error_rate=0.0)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        sweep = PowerSweep(reader, levels=[25, 0], slot_q=5, patience=2, max_rounds=10)
+        list(sweep.run(cycles=2))
+        assert len(sweep.min_power) == len(pallet)
+
+        # Nothing to find: patience rounds, not max_rounds
+        rounds = sweep.rounds
+        assert list(sweep._sweep_level(0, set())) == []
+        assert sweep.rounds - rounds == 2
+
+        # Every tag already read in the cycle, at its lowest level: no round is productive either
+        rounds = sweep.rounds
+        assert {epc for epc, _ in sweep._sweep_level(25, set(epcs_of(pallet)))} <= epcs_of(pallet)
+        assert sweep.rounds - rounds == 2
+
+        # New tags keep the level going past patience
+        rounds = sweep.rounds
+        list(sweep._sweep_level(25, set()))
+        assert sweep.rounds - rounds > 2
@@ -0,0 +1,69 @@
+import math
+import random
+
+import pytest
+
+from fonkanfm50x.qcontrol import AdaptiveQController, MAX_GROWTH
+
+def _round(rng: random.Random, tags: int, q: int, collision_error_rate: float) -> tuple[int, int]:
+    """
+    Single replies and reported collisions of one framed ALOHA round, as the emulator reports them
+    """
+    slots = [0] * (1 << q)
+    for _ in range(tags):
+        slots[rng.randrange(len(slots))] += 1
+    replies = sum(1 for slot in slots if slot == 1)
+    collisions = sum(1 for slot in slots if slot > 1 and rng.random() < collision_error_rate)
+    return replies, collisions
+
+def _run(tags: int, rounds: int, collision_error_rate: float, seed: int) -> tuple[list[int], list[float]]:
+    """
+    Q of every round and the population estimate after it
+    """
+    rng = random.Random(seed)
+    q_control = AdaptiveQController()
+    trace, estimates = [], []
+    for _ in range(rounds):
+        trace.append(q_control.q)
+        replies, collisions = _round(rng, tags, q_control.q, collision_error_rate)
+        q_control.update(replies, 0, collisions, duration=0.1)
+        estimates.append(q_control.population_estimate)
+    return trace, estimates
+
+@pytest.mark.parametrize('collision_error_rate', [0.1, 1.0])
+@pytest.mark.parametrize('tags', [10, 50, 200, 500, 2000])
+@pytest.mark.parametrize('seed', range(3))
+def test_converges_near_population(tags, collision_error_rate, seed):
+    trace, estimates = _run(tags, 100, collision_error_rate, seed)
+    target = round(math.log2(tags)) + 1
+    settled = sorted(trace[30:])
+    # Most rounds at the target, and no runaway above it
+    assert abs(settled[len(settled) // 2] - target) <= 1, trace
+    assert settled[-1] <= target + 2, trace
+    assert max(estimate for estimate in estimates[30:] if estimate is not None) <= tags * MAX_GROWTH
+
+def test_single_tag_goes_to_smallest_frames():
+    trace, estimates = _run(1, 20, 0.1, seed=0)
+    assert trace[-1] <= 1 and estimates[-1] == pytest.approx(1, abs=0.2)
+
+def test_step_is_bounded():
+    trace, _ = _run(2000, 20, 0.1, seed=0)
+    assert trace[0] == 4
+    assert all(abs(b - a) <= 2 for a, b in zip(trace, trace[1:]))
+
+def test_throughput_does_not_steer_q():
+    # Same slot statistics, wildly different round times: same Q choices
+    rng = random.Random(0)
+    rounds = [_round(rng, 200, q, 0.1) for q in (4, 6, 8, 8, 8)]
+    traces = []
+    for durations in ([0.1] * 5, [0.01, 5.0, 0.02, 3.0, 0.001]):
+        q_control = AdaptiveQController()
+        for (replies, collisions), duration in zip(rounds, durations):
+            q_control.update(replies, 0, collisions, duration)
+        traces.append((q_control.q, q_control.population_estimate))
+    assert traces[0] == traces[1]
+
+def test_silent_round_keeps_q():
+    q_control = AdaptiveQController(initial_q=6)
+    q_control.update(0, 0, 0, 0.1)
+    assert q_control.q == 6 and q_control.population_estimate is None
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from conftest import epcs_of
+from fonkanfm50x.exceptions import UnexpectedReaderResponseException
+from fonkanfm50x.scheduler import CommandPriority, ReaderScheduler
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.01)
+
+def _blocked(scheduler: ReaderScheduler) -> threading.Event:
+    """
+    Keep the I/O thread busy until the returned event is set, so that jobs queue up behind it
+    """
+    started = threading.Event()
+    release = threading.Event()
+    def block(reader):
+        started.set()
+        release.wait(5)
+    scheduler.submit(block, CommandPriority.URGENT)
+    started.wait(5)
+    return release
+
+def test_high_priority_runs_before_queued_low_jobs(reader):
+    order = []
+    with ReaderScheduler(reader, max_wait=None) as scheduler:
+        release = _blocked(scheduler)
+        futures = [scheduler.submit(lambda reader, i=i: order.append(('low', i)), CommandPriority.LOW) for i in range(5)]
+        futures.append(scheduler.submit(lambda reader: order.append(('high', 0)), CommandPriority.HIGH))
+        release.set()
+        for future in futures:
+            future.result(5)
+    assert order == [('high', 0)] + [('low', i) for i in range(5)]
+
+def test_max_wait_lets_an_old_job_through(reader):
+    order = []
+    with ReaderScheduler(reader, max_wait=0.05) as scheduler:
+        release = _blocked(scheduler)
+        low = scheduler.submit(lambda reader: order.append('low'), CommandPriority.LOW)
+        time.sleep(0.1)
+        high = scheduler.submit(lambda reader: order.append('high'), CommandPriority.HIGH)
+        release.set()
+        low.result(5)
+        high.result(5)
+    assert order == ['low', 'high']
+
+def test_jobs_interleave_with_inventory(reader, emulator):
+    seen = set()
+    with ReaderScheduler(reader) as scheduler:
+        scheduler.start_inventory(seen.add, slot_q=4)
+        _wait_for(lambda: scheduler.rounds >= 3)
+        for _ in range(10):
+            assert scheduler.get_power_level().result(5) == reader.start_power
+        _wait_for(lambda: seen == epcs_of(emulator.tags))
+        stats = scheduler.stats
+    # A HIGH job waits for at most the round running when it was submitted
+    assert stats['high']['jobs'] == 10 and stats['high']['wait_max'] < 0.5
+
+def test_fairness_within_a_priority(reader):
+    done = {'a': 0, 'b': 0}
+    stop = threading.Event()
+    with ReaderScheduler(reader) as scheduler:
+        def flood(name: str):
+            while not stop.is_set():
+                scheduler.get_power_level(CommandPriority.NORMAL).result(5)
+                done[name] += 1
+        threads = [threading.Thread(target=flood, args=(name,)) for name in done]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert min(done.values()) > 10
+    assert abs(done['a'] - done['b']) <= 0.1 * max(done.values()) + 1
+
+def test_callback_errors_do_not_stop_the_scheduler(reader):
+    def on_tag(epc: str):
+        raise KeyError(epc)
+    with ReaderScheduler(reader) as scheduler:
+        scheduler.start_inventory(on_tag, slot_q=4)
+        _wait_for(lambda: scheduler.callback_errors >= 10)
+        assert scheduler.read_gpio_pins().result(5) is not None
+    assert scheduler.error is None and scheduler.stats['callback_errors'] == scheduler.callback_errors
+
+def test_reader_errors_only_lose_the_round(reader):
+    read_many_tag_id = reader.read_many_tag_id
+    failures = [0]
+    def failing_read_many_tag_id(slot_q):
+        if failures[0] < 3:
+            failures[0] += 1
+            raise UnexpectedReaderResponseException("garbled")
+        return read_many_tag_id(slot_q)
+    reader.read_many_tag_id = failing_read_many_tag_id
+
+    seen = set()
+    with ReaderScheduler(reader) as scheduler:
+        scheduler.start_inventory(seen.add, slot_q=4)
+        _wait_for(lambda: len(seen) > 0)
+        assert scheduler.get_power_level().result(5) is not None
+    assert scheduler.error is None and scheduler.round_errors >= 3
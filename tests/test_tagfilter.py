@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from conftest import epcs_of, inventory_until_complete
+from fonkanfm50x.exceptions import TagGenericException, UnexpectedReaderResponseException
+from fonkanfm50x.interface import FonkanUHF
+from fonkanfm50x.tagfilter import EPCPrefixIndex, SelectMask, TagFilter
+from fonkanfm50x.types import EPCMemoryBank
+
+def _epcs(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    # Few distinct leading digits, so that short prefixes match often
+    return [f"30{rng.randrange(4):X}{rng.getrandbits(84):021X}" for _ in range(n)]
+
+@pytest.mark.parametrize('select', [
+    SelectMask.epc_prefix('3014'),
+    SelectMask.epc_prefix('301', 11),
+    SelectMask.company_prefix('0614141'),
+    SelectMask(EPCMemoryBank.EPC, 0x10, 5, '30'),
+    SelectMask(EPCMemoryBank.TID, 0, 8, 'E2'),
+])
+def test_select_bytes_matcher_agrees(select):
+    matches = select.bytes_matcher()
+    epcs = _epcs(2000) + ['3014', '30', '']
+    assert [matches(bytes.fromhex(epc)) for epc in epcs] == [select.matches(epc) for epc in epcs]
+
+def test_prefix_index_matches_like_a_scan():
+    rng = random.Random(1)
+    epcs = _epcs(20_000)
+    prefixes = [f"30{rng.getrandbits(16):04X}" for _ in range(1000)] + [epc[:length] for epc, length in zip(epcs[::500], range(3, 24))]
+    index = EPCPrefixIndex(prefixes)
+    scanned = [next((prefix for prefix in sorted(prefixes, key=len) if epc.startswith(prefix)), None) for epc in epcs[:2000]]
+    assert [index.match(epc) for epc in epcs[:2000]] == scanned
+    assert [index.match_bytes(bytes.fromhex(epc)) for epc in epcs] == [index.match(epc) for epc in epcs]
+
+    index.discard(prefixes[-1])
+    index.add('3')
+    assert [index.match_bytes(bytes.fromhex(epc)) for epc in epcs[:100]] == ['3'] * 100
+
+def _filter_for(epcs: list[str]) -> TagFilter:
+    return TagFilter(SelectMask.epc_prefix(epcs[0][:8]), EPCPrefixIndex(epcs[:1]))
+
+@pytest.mark.parametrize('tag_reads', [False, True])
+def test_filtered_round_clears_its_select(make_emulator, tag_reads):
+    # Firmware applying T to inventories: a select left in force would hide the other tags from later rounds
+    emulator = make_emulator(select_gates_inventory=True, collision_error_rate=0.0)
+    expected = epcs_of(emulator.tags)
+    target = sorted(expected)[:1]
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        if tag_reads:
+            filtered = inventory_until_complete(lambda: (read.epc_hex for read in reader.read_many_tag_reads(6, tag_filter=_filter_for(target))), set(target))
+        else:
+            filtered = inventory_until_complete(lambda: reader.read_many_tag_id(6, tag_filter=_filter_for(target)), set(target))
+        assert filtered == set(target)
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), expected) == expected
+
+def test_closing_a_filtered_round_clears_its_select(make_emulator):
+    emulator = make_emulator(select_gates_inventory=True, collision_error_rate=0.0)
+    expected = epcs_of(emulator.tags)
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        tag_filter = TagFilter(SelectMask.epc_prefix(''.join(sorted(expected))[:1]))
+        for _ in range(10):
+            reads = reader.read_many_tag_id(6, tag_filter=tag_filter)
+            if next(reads, None) is not None:
+                reads.close()
+                break
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), expected) == expected
+
+@pytest.mark.parametrize('tag_reads', [False, True])
+def test_filtered_memory_round(make_emulator, tag_reads):
+    emulator = make_emulator(select_gates_inventory=True, collision_error_rate=0.0)
+    tids = {tag.epc.hex().upper(): tag.tid[:12].hex().upper() for tag in emulator.tags}
+    target = sorted(tids)[:2]
+    tag_filter = TagFilter.from_index(EPCPrefixIndex(target))
+    assert tag_filter.select is not None
+    with FonkanUHF(serial_port=emulator.port) as reader:
+        seen = {}
+        for _ in range(30):
+            try:
+                if tag_reads:
+                    seen.update((read.epc_hex, read.data.hex().upper()) for read in reader.read_multi_tag_memory_reads(EPCMemoryBank.TID, 0, 6, 6, tag_filter))
+                else:
+                    seen.update(reader.read_multi_tag_memory_multiband(EPCMemoryBank.TID, 0, 6, 6, tag_filter))
+            except TagGenericException:
+                pass
+            if len(seen) == len(target):
+                break
+        assert seen == {epc: tids[epc] for epc in target}
+        expected = epcs_of(emulator.tags)
+        assert inventory_until_complete(lambda: reader.read_many_tag_id(6), expected) == expected
+
+def test_clear_failure_keeps_the_round_error(emulator, reader, monkeypatch):
+    def failing_round():
+        yield from ()
+        raise TagGenericException("collision")
+
+    def failing_clear():
+        raise UnexpectedReaderResponseException("No response to the clear")
+
+    monkeypatch.setattr(reader, 'clear_select', failing_clear)
+    tag_filter = TagFilter(SelectMask.epc_prefix('30'))
+    with pytest.raises(TagGenericException, match="collision"):
+        list(reader._filtered_round(failing_round(), tag_filter, lambda epc: True))
+    # A round that went well reports the failed clear
+    with pytest.raises(UnexpectedReaderResponseException):
+        list(reader._filtered_round(iter(()), tag_filter, lambda epc: True))
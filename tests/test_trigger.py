@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from conftest import epcs_of
+from fonkanfm50x.interface import FonkanUHF, GPIOPin
+from fonkanfm50x.trigger import BurstResult, TriggeredInventory
+
+TRIGGER = GPIOPin.GPIO_14
+
+@pytest.fixture
+def trigger_emulator(make_emulator):
+    return make_emulator(collision_error_rate=0.0)
+
+def _pulse(emulator, duration: float) -> float:
+    """
+    Hold the trigger input high for duration seconds. Returns when it was released.
+    """
+    emulator.set_gpio_input(TRIGGER.value, True)
+    time.sleep(duration)
+    emulator.set_gpio_input(TRIGGER.value, False)
+    return time.perf_counter()
+
+def _wait_for_bursts(trigger: TriggeredInventory, n: int, timeout: float = 5.0):
+    deadline = time.perf_counter() + timeout
+    while len(trigger.bursts) < n and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert len(trigger.bursts) >= n
+
+def test_short_pulse_is_debounced(trigger_emulator):
+    with FonkanUHF(serial_port=trigger_emulator.port) as reader, \
+            TriggeredInventory(reader, TRIGGER, poll_interval=0.005, debounce=0.1, hold=0.05) as trigger:
+        _pulse(trigger_emulator, 0.03)
+        time.sleep(0.3)
+        assert trigger.bursts == [] and trigger.polls > 10
+
+        _pulse(trigger_emulator, 0.3)
+        _wait_for_bursts(trigger, 1)
+    assert len(trigger.bursts) == 1 and trigger.error is None
+    burst = trigger.bursts[0]
+    assert burst.epcs == epcs_of(trigger_emulator.tags)
+    # The edge counts from the first poll seeing it, once it held for the debounce time
+    assert burst.started - burst.triggered >= 0.1
+
+def test_hold_reads_on_after_release(trigger_emulator):
+    hold = 0.2
+    with FonkanUHF(serial_port=trigger_emulator.port) as reader, \
+            TriggeredInventory(reader, TRIGGER, poll_interval=0.005, hold=hold) as trigger:
+        released = _pulse(trigger_emulator, 0.1)
+        _wait_for_bursts(trigger, 1)
+    burst = trigger.bursts[0]
+    assert released + hold <= burst.ended < released + hold + 0.2
+    assert burst.rounds > 1 and burst.reads >= len(trigger_emulator.tags)
+
+def test_max_burst_needs_a_new_edge(trigger_emulator):
+    with FonkanUHF(serial_port=trigger_emulator.port) as reader, \
+            TriggeredInventory(reader, TRIGGER, poll_interval=0.005, hold=0.0, max_burst=0.15) as trigger:
+        trigger_emulator.set_gpio_input(TRIGGER.value, True)
+        _wait_for_bursts(trigger, 1)
+        # Still active: no new burst until the trigger was released
+        time.sleep(0.3)
+        assert len(trigger.bursts) == 1
+        burst = trigger.bursts[0]
+        assert 0.15 <= burst.ended - burst.started < 0.3
+
+        trigger_emulator.set_gpio_input(TRIGGER.value, False)
+        time.sleep(0.05)
+        _pulse(trigger_emulator, 0.05)
+        _wait_for_bursts(trigger, 2)
+    assert len(trigger.bursts) == 2
+
+def test_busy_pin_and_outputs(trigger_emulator):
+    busy_levels = []
+    results: list[BurstResult] = []
+    done = threading.Event()
+
+    def on_read(epc: str):
+        busy_levels.append(bool(trigger_emulator.gpio_levels & GPIOPin.GPIO_10.value))
+
+    def open_gate(result: BurstResult) -> dict[GPIOPin, bool] | None:
+        results.append(result)
+        return {GPIOPin.GPIO_11: True} if result.epcs else None
+
+    with FonkanUHF(serial_port=trigger_emulator.port) as reader:
+        # Output pins written by outputs() are the application's to configure
+        reader.configure_gpio({GPIOPin.GPIO_11: True})
+        with TriggeredInventory(reader, TRIGGER, poll_interval=0.005, hold=0.05, busy_pin=GPIOPin.GPIO_10,
+                                outputs=open_gate, on_read=on_read, on_burst=lambda result: done.set()) as trigger:
+            assert not trigger_emulator.gpio_levels & GPIOPin.GPIO_10.value
+            _pulse(trigger_emulator, 0.05)
+            assert done.wait(5.0)
+    assert busy_levels and all(busy_levels)
+    assert results == trigger.bursts
+    # Busy released and the gate opened at the end of the burst
+    assert not trigger_emulator.gpio_levels & GPIOPin.GPIO_10.value
+    assert trigger_emulator.gpio_levels & GPIOPin.GPIO_11.value
+    assert trigger_emulator.gpio_outputs == GPIOPin.GPIO_10.value | GPIOPin.GPIO_11.value
+
+def test_latency_and_duty_cycle_stats(trigger_emulator):
+    with FonkanUHF(serial_port=trigger_emulator.port) as reader:
+        with TriggeredInventory(reader, TRIGGER, poll_interval=0.05) as idle:
+            time.sleep(0.3)
+        with TriggeredInventory(reader, TRIGGER, poll_interval=0.005, hold=0.3) as busy:
+            _pulse(trigger_emulator, 0.05)
+            _wait_for_bursts(busy, 1)
+    # Idle, the link only carries a poll every 50 ms; bursts run rounds back to back
+    assert 0 < idle.duty_cycle < 0.5 < busy.duty_cycle <= 1
+    assert idle.stats['bursts'] == 0 and idle.stats['trigger_latency_max'] is None
+
+    stats = busy.stats
+    burst = busy.bursts[0]
+    assert 0 < burst.trigger_latency == stats['trigger_latency_max'] == stats['trigger_latency_median'] < 0.5
+    assert burst.triggered <= burst.started <= burst.first_read <= burst.ended
+    assert stats['rounds'] == burst.rounds and stats['reads'] == burst.reads
+    assert stats['duty_cycle'] == pytest.approx(busy.duty_cycle)